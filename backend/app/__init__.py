@@ -7,10 +7,11 @@ from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from werkzeug.middleware.proxy_fix import ProxyFix
 from app.config import config
+from app.json_provider import OrjsonProvider
 from app.logging_config import setup_logging
 
 db = SQLAlchemy()
-migrate = Migrate()
+migrate = Migrate(directory=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations'))
 jwt = JWTManager()
 
 def create_app(config_name=None):
@@ -19,6 +20,7 @@ def create_app(config_name=None):
     
     app = Flask(__name__)
     app.config.from_object(config[config_name])
+    app.json = OrjsonProvider(app)
     
     app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
     
@@ -28,9 +30,13 @@ def create_app(config_name=None):
     db.init_app(app)
     migrate.init_app(app, db)
     jwt.init_app(app)
-    CORS(app)
+    CORS(app, expose_headers=['X-Next-Cursor'])
     app.logger.info('Database and security extensions initialized')
     
+    from app.utils.api_fetcher import configure_cache, configure_fetching
+    configure_cache(app.config['MARKET_CACHE_BACKEND'], app.config['MARKET_CACHE_PATH'])
+    configure_fetching(app.config['MARKET_FETCH_CONCURRENT'], app.config['MARKET_PRICE_HEDGE_DELAY'])
+    
     app.logger.info('Registering blueprints')
     from app.routes import auth, miners, rentals, referrals, payments, stats, admin
     
@@ -43,6 +49,9 @@ def create_app(config_name=None):
     app.register_blueprint(admin.bp)
     app.logger.info('All blueprints registered successfully')
     
+    from app.cli import register_cli
+    register_cli(app)
+    
     @app.route('/api/health')
     def health():
         app.logger.debug('Health check endpoint called')
@@ -0,0 +1,144 @@
+import click
+from datetime import datetime
+from flask.cli import AppGroup
+
+jobs_cli = AppGroup('jobs', help='Run background maintenance jobs.')
+
+
+def _parse_day(value):
+    return datetime.strptime(value, '%Y-%m-%d').date() if value else None
+
+
+@jobs_cli.command('accrue')
+@click.option('--day', default=None,
+              help='UTC day to accrue (YYYY-MM-DD); defaults to every day missed up to yesterday.')
+@click.option('--chunk-size', default=None, type=int, help='Rentals per UPDATE chunk.')
+def accrue_command(day, chunk_size):
+    """Credit mining earnings to every rental running on the accrued days."""
+    from flask import current_app
+    from app.jobs.accrual import accrue_daily_earnings, accrue_pending_days
+    chunk_size = chunk_size or current_app.config['ACCRUAL_CHUNK_SIZE']
+    if day:
+        runs = [accrue_daily_earnings(_parse_day(day), chunk_size)]
+    else:
+        runs = accrue_pending_days(chunk_size=chunk_size, max_days=current_app.config['ACCRUAL_CATCHUP_DAYS'])
+    for run in runs:
+        click.echo(f'Accrual {run.day}: {run.status}, {run.rentals_processed} rentals credited')
+
+
+@jobs_cli.command('expire')
+@click.option('--batch-size', default=None, type=int, help='Rentals per UPDATE batch.')
+def expire_command(batch_size):
+    """Deactivate rentals whose end date has passed."""
+    from flask import current_app
+    from app.jobs.expiry import expire_rentals
+    expired = expire_rentals(batch_size=batch_size or current_app.config['EXPIRY_BATCH_SIZE'])
+    click.echo(f'Expired {expired} rentals')
+
+
+@jobs_cli.command('webhooks')
+@click.option('--batch-size', default=None, type=int, help='Inbox events per batch.')
+def webhooks_command(batch_size):
+    """Apply payment webhook events waiting in the inbox."""
+    from flask import current_app
+    from app.jobs.webhooks import process_webhook_inbox
+    processed = process_webhook_inbox(batch_size=batch_size or current_app.config['WEBHOOK_BATCH_SIZE'])
+    click.echo(f'Processed {processed} webhook events')
+
+
+@jobs_cli.command('release-reservations')
+@click.option('--batch-size', default=None, type=int, help='Reservations per UPDATE batch.')
+def release_reservations_command(batch_size):
+    """Return units held by expired checkout reservations to their miners."""
+    from app.jobs.reservations import DEFAULT_BATCH_SIZE, release_expired_reservations
+    released = release_expired_reservations(batch_size=batch_size or DEFAULT_BATCH_SIZE)
+    click.echo(f'Released {released} reservations')
+
+
+@jobs_cli.command('payouts')
+@click.option('--batch-size', default=None, type=int, help='Payouts per UPDATE chunk.')
+def payouts_command(batch_size):
+    """Mark all pending payouts as paid."""
+    from flask import current_app
+    from app.jobs.payouts import process_pending_payouts
+    count, total = process_pending_payouts(
+        batch_size=batch_size or current_app.config['PAYOUT_BATCH_SIZE'],
+        on_progress=lambda count, total: click.echo(f'  {count} payouts paid, ${total:.2f}')
+    )
+    click.echo(f'Processed {count} payouts, total ${total:.2f}')
+
+
+@jobs_cli.command('refresh-stats')
+def refresh_stats_command():
+    """Recount the admin dashboard counters from the base tables."""
+    from app.utils.stats_rollup import refresh_rollup
+    values = refresh_rollup()
+    click.echo(f'Refreshed {len(values)} dashboard counters')
+
+
+@jobs_cli.command('detach-ledger')
+@click.option('--before', required=True, help='Detach monthly ledger partitions ending before this day (YYYY-MM-DD).')
+def detach_ledger_command(before):
+    """Detach old earnings ledger partitions (PostgreSQL only)."""
+    from app.jobs.ledger import detach_ledger_partitions
+    detached = detach_ledger_partitions(_parse_day(before))
+    click.echo(f'Detached {len(detached)} ledger partitions')
+
+
+@jobs_cli.command('worker')
+@click.option('--poll-interval', default=1, type=int, help='Seconds to wait when the queue is empty.')
+def worker_command(poll_interval):
+    """Run queued jobs (rental activation, referral payouts) in the foreground."""
+    from flask import current_app
+    from app.jobs.queue import run_worker
+    run_worker(current_app._get_current_object(), poll_interval=poll_interval)
+
+
+@jobs_cli.command('scheduler')
+@click.option('--poll-interval', default=5, type=int, help='Seconds between scheduling passes.')
+def scheduler_command(poll_interval):
+    """Run all periodic jobs in the foreground."""
+    from flask import current_app
+    from app.jobs.scheduler import run_scheduler
+    run_scheduler(current_app._get_current_object(), poll_interval=poll_interval)
+
+
+@click.command('release')
+def release_command():
+    """Migrate the database to head; run once per deploy before starting the app."""
+    from app.release import migrate_database
+    fresh = migrate_database()
+    click.echo('Database created and seeded' if fresh else 'Database migrated')
+
+
+@click.command('import')
+@click.argument('entity', type=click.Choice(['users', 'rentals', 'payments']))
+@click.argument('source', type=click.File('r', encoding='utf-8'), default='-')
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'ndjson']), default=None,
+              help='Input format; guessed from the file extension when omitted.')
+@click.option('--batch-size', default=None, type=int, help='Rows per COPY/INSERT batch.')
+@click.option('--defer-indexes', is_flag=True, default=False,
+              help='Drop non-unique indexes during the load and rebuild them afterwards; '
+                   'only while nothing else uses the database.')
+def import_command(entity, source, fmt, batch_size, defer_indexes):
+    """Bulk-load users, rentals or payments from a CSV or NDJSON file (- for stdin)."""
+    import time
+    from app.utils.bulk_import import IMPORT_BATCH_SIZE, import_records, read_records
+    from app.utils.stats_rollup import refresh_rollup
+    fmt = fmt or ('ndjson' if source.name.endswith(('.ndjson', '.jsonl')) else 'csv')
+    started = time.monotonic()
+    imported, linked = import_records(
+        entity, read_records(source, fmt), batch_size=batch_size or IMPORT_BATCH_SIZE,
+        defer_indexes=defer_indexes, on_progress=lambda count: click.echo(f'  {count} rows')
+    )
+    elapsed = time.monotonic() - started
+    refresh_rollup()
+    click.echo(f'Imported {imported} {entity} in {elapsed:.1f}s ({imported / max(elapsed, 1e-9):.0f} rows/s)')
+    if entity == 'users':
+        click.echo(f'Linked {linked} users to their referrers')
+
+
+def register_cli(app):
+    app.cli.add_command(jobs_cli)
+    app.cli.add_command(release_command)
+    app.cli.add_command(import_command)
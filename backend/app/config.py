@@ -25,18 +25,67 @@ class Config:
     
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or SECRET_KEY
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
+    # Keys the referral code permutation; changing it re-maps future codes onto already issued ones
+    REFERRAL_CODE_KEY = os.environ.get('REFERRAL_CODE_KEY') or SECRET_KEY or 'cloudminer-referral-codes'
+    # How long a worker trusts its cached admin flag; bounds how late a demotion reaches other workers
+    ROLE_CACHE_TTL = float(os.environ.get('ROLE_CACHE_TTL', 30))
     
     MAINTENANCE_FEE_PERCENT = float(os.environ.get('MAINTENANCE_FEE_PERCENT', 5.0))
     REFERRAL_PERCENT = float(os.environ.get('REFERRAL_PERCENT', 3.0))
     PAYMENT_GATEWAY_API_KEY = os.environ.get('PAYMENT_GATEWAY_API_KEY', '')
     
+    # 'sqlite' shares market data between gunicorn workers on a node; 'memory' is per-process
+    MARKET_CACHE_BACKEND = os.environ.get('MARKET_CACHE_BACKEND', 'sqlite')
+    MARKET_CACHE_PATH = os.environ.get('MARKET_CACHE_PATH')
+    # Background refresh in web processes only: gunicorn workers (gunicorn.conf.py) and run.py
+    MARKET_REFRESHER_ENABLED = os.environ.get('MARKET_REFRESHER_ENABLED', 'true').lower() == 'true'
+    MARKET_REFRESH_INTERVAL = int(os.environ.get('MARKET_REFRESH_INTERVAL', 30))
+    MARKET_FETCH_CONCURRENT = os.environ.get('MARKET_FETCH_CONCURRENT', 'true').lower() == 'true'
+    MARKET_PRICE_HEDGE_DELAY = float(os.environ.get('MARKET_PRICE_HEDGE_DELAY', 0.5))
+    
+    ACCRUAL_CHUNK_SIZE = int(os.environ.get('ACCRUAL_CHUNK_SIZE', 5000))
+    ACCRUAL_CHECK_INTERVAL = int(os.environ.get('ACCRUAL_CHECK_INTERVAL', 900))
+    # Most days the scheduler back-fills after downtime
+    ACCRUAL_CATCHUP_DAYS = int(os.environ.get('ACCRUAL_CATCHUP_DAYS', 30))
+    EXPIRY_BATCH_SIZE = int(os.environ.get('EXPIRY_BATCH_SIZE', 1000))
+    EXPIRY_CHECK_INTERVAL = int(os.environ.get('EXPIRY_CHECK_INTERVAL', 60))
+    PAYOUT_BATCH_SIZE = int(os.environ.get('PAYOUT_BATCH_SIZE', 1000))
+    # How long a checkout holds a miner unit while waiting for payment
+    RESERVATION_TTL_SECONDS = int(os.environ.get('RESERVATION_TTL_SECONDS', 900))
+    RESERVATION_RELEASE_INTERVAL = int(os.environ.get('RESERVATION_RELEASE_INTERVAL', 60))
+    WEBHOOK_BATCH_SIZE = int(os.environ.get('WEBHOOK_BATCH_SIZE', 500))
+    WEBHOOK_DRAIN_INTERVAL = int(os.environ.get('WEBHOOK_DRAIN_INTERVAL', 5))
+    # Without a 'flask jobs worker' process, run queued jobs at the end of the request instead
+    JOB_QUEUE_INLINE = os.environ.get('JOB_QUEUE_INLINE', 'false').lower() == 'true'
+    JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', 5))
+    JOB_RETRY_DELAY = int(os.environ.get('JOB_RETRY_DELAY', 30))
+    JOB_BATCH_SIZE = int(os.environ.get('JOB_BATCH_SIZE', 100))
+    # Werkzeug method string, e.g. scrypt:32768:8:1 or pbkdf2:sha256:600000; stored hashes are upgraded on login
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    # Concurrent hashes allowed per host across all gunicorn workers; the rest get 503 + Retry-After
+    PASSWORD_HASH_CONCURRENCY = int(os.environ.get('PASSWORD_HASH_CONCURRENCY', max(1, (os.cpu_count() or 2) // 2)))
+    PASSWORD_HASH_QUEUE_TIMEOUT = float(os.environ.get('PASSWORD_HASH_QUEUE_TIMEOUT', 0.5))
+    PASSWORD_HASH_RETRY_AFTER = int(os.environ.get('PASSWORD_HASH_RETRY_AFTER', 2))
+    PASSWORD_HASH_SLOT_DIR = os.environ.get('PASSWORD_HASH_SLOT_DIR')
+    
+    # Upper bound on how long another worker serves a setting after an admin change
+    SETTINGS_CACHE_TTL = float(os.environ.get('SETTINGS_CACHE_TTL', 5))
+    # Full recount of the admin dashboard counters; bounds drift from untracked writes
+    STATS_ROLLUP_REFRESH_INTERVAL = int(os.environ.get('STATS_ROLLUP_REFRESH_INTERVAL', 600))
+    # Rows per dashboard counter; more shards mean fewer checkouts queueing on the same row lock
+    STATS_ROLLUP_SHARDS = int(os.environ.get('STATS_ROLLUP_SHARDS', 8))
+    
     BTC_BLOCK_REWARD = 3.125
     BLOCKS_PER_DAY = 144
     BLOCKS_PER_MONTH = 4320
+    BLOCKS_PER_EPOCH = 2016
+    HALVING_INTERVAL = 210_000
+    INITIAL_BLOCK_REWARD = 50.0
 
 
 class DevelopmentConfig(Config):
     DEBUG = True
+    JOB_QUEUE_INLINE = os.environ.get('JOB_QUEUE_INLINE', 'true').lower() == 'true'
     
 
 class ProductionConfig(Config):
@@ -47,6 +96,10 @@ class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     JWT_SECRET_KEY = 'test-secret-key'
+    MARKET_CACHE_BACKEND = 'memory'
+    MARKET_REFRESHER_ENABLED = False
+    JOB_QUEUE_INLINE = True
+    PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1000'
 
 
 config = {
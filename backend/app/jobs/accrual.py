@@ -0,0 +1,192 @@
+import logging
+from datetime import datetime, time, timedelta
+from sqlalchemy import DateTime, func, insert, literal, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.config import Config
+from app.jobs.ledger import ensure_ledger_partition
+from app.models import AccrualRun, EarningsLedger, Rental
+from app.utils.api_fetcher import get_btc_price, get_network_hashrate
+from app.utils.profit_calculator import calculate_daily_btc
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 5000
+DEFAULT_CATCHUP_DAYS = 30
+
+
+def default_accrual_day():
+    """Accrue the last complete UTC day"""
+    return datetime.utcnow().date() - timedelta(days=1)
+
+
+def _get_or_start_run(day):
+    run = AccrualRun.query.filter_by(day=day).first()
+    if run:
+        return run
+
+    # Snapshot market data once per day so a resumed run credits the same rate
+    network_hashrate = get_network_hashrate()
+    fee_multiplier = 1 - Config.MAINTENANCE_FEE_PERCENT / 100
+    run = AccrualRun(
+        day=day,
+        status='running',
+        last_rental_id=0,
+        rentals_processed=0,
+        network_hashrate_th=network_hashrate,
+        btc_price_usd=get_btc_price(),
+        net_btc_per_th=calculate_daily_btc(1.0, network_hashrate) * fee_multiplier
+    )
+    db.session.add(run)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Another worker started the same day first; continue from its checkpoint
+        db.session.rollback()
+        run = AccrualRun.query.filter_by(day=day).one()
+    return run
+
+
+def _day_bounds(day):
+    day_start = datetime.combine(day, time.min)
+    return day_start, day_start + timedelta(days=1)
+
+
+def _accrual_filter(day, now):
+    # The rental window decides, not is_active: the expiry sweep may already have deactivated
+    # a rental whose last (partial) day is being credited. A rental that is inactive while its
+    # window is still open was cancelled, and stops earning. Unpaid rentals have no start_date.
+    day_start, day_end = _day_bounds(day)
+    return (
+        Rental.start_date < day_end,
+        (Rental.end_date.is_(None)) | (Rental.end_date > day_start),
+        or_(Rental.is_active == True, Rental.end_date <= now)
+    )
+
+
+def _day_fraction(day):
+    """Share of ``day`` covered by each rental's [start_date, end_date) window, as a SQL expression"""
+    day_start, day_end = (literal(bound, DateTime) for bound in _day_bounds(day))
+    end_date = func.coalesce(Rental.end_date, day_end)
+    if db.session.get_bind().dialect.name == 'postgresql':
+        overlap = func.least(end_date, day_end) - func.greatest(Rental.start_date, day_start)
+        return func.extract('epoch', overlap) / 86400.0
+    # SQLite: two-argument min/max are scalar; julianday differences are in days
+    return func.julianday(func.min(end_date, day_end)) - func.julianday(func.max(Rental.start_date, day_start))
+
+
+def accrue_daily_earnings(day=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Credit one day of mining to every rental running that day with set-based, checkpointed UPDATEs.
+
+    Rentals are walked in primary-key order ``chunk_size`` at a time. Each
+    chunk advances ``accrual_runs.last_rental_id`` with a compare-and-set and
+    applies ``total_profit_btc += hashrate_allocated * net_btc_per_th``,
+    prorated by the part of the day inside the rental window, in the
+    same transaction, so a crashed or concurrent run never credits a rental
+    twice and a restart resumes from the last committed chunk. The same
+    transaction appends the chunk's rows to ``earnings_ledger``.
+    """
+    day = day or default_accrual_day()
+    run = _get_or_start_run(day)
+    if run.status == 'completed':
+        logger.info(f'Accrual for {day} already completed, skipping')
+        return run
+
+    run_id = run.id
+    rate = run.net_btc_per_th
+    btc_price = run.btc_price_usd
+    network_hashrate = run.network_hashrate_th
+    ensure_ledger_partition(day)
+    db.session.commit()
+    conditions = _accrual_filter(day, datetime.utcnow())
+    earned = Rental.hashrate_allocated * rate * _day_fraction(day)
+    logger.info(f'Accruing earnings for {day} from rental {run.last_rental_id} ({rate:.12f} BTC per TH/s)')
+
+    while True:
+        last_id = db.session.execute(
+            select(AccrualRun.last_rental_id).where(AccrualRun.id == run_id)
+        ).scalar_one()
+        chunk_ids = (
+            select(Rental.id)
+            .where(Rental.id > last_id, *conditions)
+            .order_by(Rental.id)
+            .limit(chunk_size)
+            .subquery()
+        )
+        upper_id = db.session.execute(select(func.max(chunk_ids.c.id))).scalar()
+        if upper_id is None:
+            break
+
+        claimed = db.session.execute(
+            update(AccrualRun)
+            .where(AccrualRun.id == run_id, AccrualRun.last_rental_id == last_id)
+            .values(last_rental_id=upper_id)
+        ).rowcount
+        if claimed != 1:
+            db.session.rollback()
+            logger.info(f'Accrual chunk after rental {last_id} claimed by another worker')
+            continue
+
+        credited = db.session.execute(
+            update(Rental)
+            .where(Rental.id > last_id, Rental.id <= upper_id, *conditions)
+            .values(total_profit_btc=func.coalesce(Rental.total_profit_btc, 0.0) + earned)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.session.execute(
+            insert(EarningsLedger).from_select(
+                ['rental_id', 'day', 'btc', 'usd_at_price', 'network_hashrate_snapshot'],
+                select(
+                    Rental.id,
+                    literal(day),
+                    earned,
+                    earned * btc_price,
+                    literal(network_hashrate)
+                ).where(Rental.id > last_id, Rental.id <= upper_id, *conditions)
+            )
+        )
+        db.session.execute(
+            update(AccrualRun)
+            .where(AccrualRun.id == run_id)
+            .values(rentals_processed=AccrualRun.rentals_processed + credited)
+        )
+        db.session.commit()
+        logger.debug(f'Accrued {credited} rentals up to ID {upper_id}')
+
+    db.session.execute(
+        update(AccrualRun)
+        .where(AccrualRun.id == run_id, AccrualRun.status != 'completed')
+        .values(status='completed', completed_at=datetime.utcnow())
+    )
+    db.session.commit()
+    run = db.session.get(AccrualRun, run_id)
+    db.session.refresh(run)
+    logger.info(f'Accrual for {day} completed: {run.rentals_processed} rentals credited')
+    return run
+
+
+def pending_accrual_days(through=None, max_days=DEFAULT_CATCHUP_DAYS):
+    """Days up to ``through`` that still need an accrual run, oldest first.
+
+    That is every day after the newest run plus any run left unfinished, so
+    scheduler downtime is caught up instead of skipped. A database with no
+    runs at all starts from ``through``, and at most ``max_days`` trailing
+    days are considered.
+    """
+    through = through or default_accrual_day()
+    oldest = through - timedelta(days=max_days - 1)
+    last_day = db.session.execute(select(func.max(AccrualRun.day))).scalar()
+    first = through if last_day is None else max(last_day + timedelta(days=1), oldest)
+    if last_day is not None and last_day + timedelta(days=1) < oldest:
+        logger.warning(f'Accrual gap since {last_day} exceeds {max_days} days; catching up from {oldest}')
+    unfinished = db.session.execute(
+        select(AccrualRun.day).where(AccrualRun.status != 'completed', AccrualRun.day >= oldest,
+                                     AccrualRun.day <= through)
+    ).scalars().all()
+    missing = {first + timedelta(days=offset) for offset in range((through - first).days + 1)}
+    return sorted(missing.union(unfinished))
+
+
+def accrue_pending_days(through=None, chunk_size=DEFAULT_CHUNK_SIZE, max_days=DEFAULT_CATCHUP_DAYS):
+    """Run accrue_daily_earnings for every pending day; missed days use the market snapshot taken when they run"""
+    return [accrue_daily_earnings(day, chunk_size) for day in pending_accrual_days(through, max_days)]
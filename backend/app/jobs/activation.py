@@ -0,0 +1,91 @@
+import logging
+from datetime import datetime, timedelta
+from flask import current_app
+from app import db
+from app.models import Miner, Payment, Payout, Referral, Rental, User
+from app.utils.inventory import claim_reservation
+from app.utils.stats_rollup import bump, payment_status_deltas, rental_activation_deltas
+
+logger = logging.getLogger(__name__)
+
+
+def _credit_referrer(rental, payment):
+    """Pay the referrer's commission for ``rental``; returns counter deltas"""
+    rental_user = db.session.get(User, rental.user_id)
+    if not rental_user or not rental_user.referred_by:
+        return {}
+    miner = db.session.get(Miner, rental.miner_id)
+    if not miner:
+        return {}
+
+    referral_percent = current_app.config.get('REFERRAL_PERCENT', 3.0)
+    base_amount = payment.amount_usd if payment else miner.price_usd
+    commission_amount = (base_amount * referral_percent) / 100
+    deltas = {}
+
+    referral = Referral.query.filter_by(
+        referrer_id=rental_user.referred_by,
+        referred_id=rental_user.id
+    ).first()
+    if not referral:
+        referral = Referral(
+            referrer_id=rental_user.referred_by,
+            referred_id=rental_user.id,
+            commission_earned_usd=0.0
+        )
+        db.session.add(referral)
+        db.session.flush()
+        deltas['referrals_total'] = 1
+        logger.info(f'Created new referral record for referrer {rental_user.referred_by}')
+
+    referral.commission_earned_usd += commission_amount
+    db.session.add(Payout(
+        user_id=rental_user.referred_by,
+        referral_id=referral.id,
+        rental_id=rental.id,
+        amount_usd=commission_amount,
+        payout_type='referral_commission',
+        status='pending'
+    ))
+    deltas.update(referrals_commission_usd=commission_amount, payouts_total=1, payouts_pending=1,
+                  payouts_pending_usd=commission_amount)
+    logger.info(f'Referral commission credited: ${commission_amount:.2f} to user {rental_user.referred_by}')
+    return deltas
+
+
+def _flag_for_refund(rental, payment):
+    """The buyer paid but no unit is left: park the payment for an admin to refund"""
+    payments = [payment] if payment else Payment.query.filter_by(rental_id=rental.id, status='confirmed').all()
+    for paid in payments:
+        bump(**payment_status_deltas(paid.status, 'refund_required', paid.amount_usd))
+        paid.status = 'refund_required'
+    logger.error(f'Miner {rental.miner_id} sold out before rental {rental.id} was paid; '
+                 f'payments {[paid.id for paid in payments]} need a refund')
+
+
+def activate_rental(rental_id, payment_id=None):
+    """Job handler: take the miner unit, start the rental window and credit the referrer.
+
+    Runs in the job's transaction. An already active rental is left alone, so
+    retries and duplicate jobs never credit twice. When the checkout's hold
+    lapsed and the miner sold out meanwhile, the rental stays inactive and
+    its payment moves to ``refund_required`` instead of the job retrying.
+    """
+    rental = db.session.get(Rental, rental_id)
+    if rental is None:
+        logger.warning(f'Activation skipped: rental {rental_id} no longer exists')
+        return
+    if rental.is_active:
+        return
+    payment = db.session.get(Payment, payment_id) if payment_id else None
+    if not claim_reservation(rental):
+        _flag_for_refund(rental, payment)
+        return
+
+    deltas = rental_activation_deltas(rental)
+    rental.is_active = True
+    rental.start_date = datetime.utcnow()
+    rental.end_date = rental.start_date + timedelta(days=rental.duration_days)
+    deltas.update(_credit_referrer(rental, payment))
+    bump(**deltas)
+    logger.info(f'Rental activated: ID={rental.id}')
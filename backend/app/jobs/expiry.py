@@ -0,0 +1,60 @@
+import logging
+from collections import Counter
+from datetime import datetime
+from sqlalchemy import select, update
+from app import db
+from app.models import Miner, Rental
+from app.utils.stats_rollup import bump
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def expire_rentals(now=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Deactivate rentals past their ``end_date`` and give their units back to the miners.
+
+    Each batch is one ``UPDATE ... WHERE is_active AND end_date < now
+    RETURNING miner_id`` over at most ``batch_size`` rows plus one
+    ``available_units`` increment per affected miner, committed together
+    with the dashboard counter deltas so locks are held only for the batch. Returns the number of rentals expired.
+    """
+    now = now or datetime.utcnow()
+    expired_total = 0
+    while True:
+        batch_ids = (
+            select(Rental.id)
+            .where(Rental.is_active == True, Rental.end_date < now)
+            .order_by(Rental.id)
+            .limit(batch_size)
+            .scalar_subquery()
+        )
+        expired = db.session.execute(
+            update(Rental)
+            .where(Rental.id.in_(batch_ids), Rental.is_active == True)
+            .values(is_active=False)
+            .returning(Rental.miner_id, Rental.hashrate_allocated)
+            .execution_options(synchronize_session=False)
+        ).all()
+        if not expired:
+            db.session.rollback()
+            break
+
+        miner_ids = [miner_id for miner_id, _ in expired]
+        for miner_id, units in sorted(Counter(miner_ids).items()):
+            db.session.execute(
+                update(Miner)
+                .where(Miner.id == miner_id)
+                .values(available_units=Miner.available_units + units)
+            )
+        bump(rentals_active=-len(expired), rentals_inactive=len(expired),
+             rentals_active_hashrate_th=-sum(hashrate for _, hashrate in expired))
+        db.session.commit()
+        expired_total += len(miner_ids)
+        logger.debug(f'Expired {len(miner_ids)} rentals across {len(set(miner_ids))} miners')
+        if len(miner_ids) < batch_size:
+            break
+
+    if expired_total:
+        logger.info(f'Expired {expired_total} rentals')
+    return expired_total
@@ -0,0 +1,63 @@
+import logging
+from datetime import date
+from sqlalchemy import text
+from app import db
+
+logger = logging.getLogger(__name__)
+
+LEDGER_TABLE = 'earnings_ledger'
+
+
+def _month_start(day):
+    return date(day.year, day.month, 1)
+
+
+def _next_month(day):
+    return date(day.year + 1, 1, 1) if day.month == 12 else date(day.year, day.month + 1, 1)
+
+
+def partition_name(day):
+    return f'{LEDGER_TABLE}_{day.year:04d}_{day.month:02d}'
+
+
+def _is_postgresql():
+    return db.engine.dialect.name == 'postgresql'
+
+
+def ensure_ledger_partition(day):
+    """Create the monthly partition holding ``day`` (PostgreSQL only, no-op elsewhere)"""
+    if not _is_postgresql():
+        return None
+    start = _month_start(day)
+    name = partition_name(start)
+    db.session.execute(text(
+        f'CREATE TABLE IF NOT EXISTS {name} PARTITION OF {LEDGER_TABLE} '
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{_next_month(start).isoformat()}')"
+    ))
+    return name
+
+
+def detach_ledger_partitions(before):
+    """Detach every monthly partition that ends on or before ``before``.
+
+    Detached partitions become ordinary tables that can be archived or
+    dropped without touching the live ledger.
+    """
+    if not _is_postgresql():
+        logger.info('Ledger partitioning is only available on PostgreSQL')
+        return []
+    rows = db.session.execute(text(
+        'SELECT c.relname FROM pg_inherits i '
+        'JOIN pg_class c ON c.oid = i.inhrelid '
+        'JOIN pg_class p ON p.oid = i.inhparent '
+        'WHERE p.relname = :parent ORDER BY c.relname'
+    ), {'parent': LEDGER_TABLE}).scalars().all()
+    cutoff = partition_name(_month_start(before))
+    detached = []
+    for name in rows:
+        if name < cutoff:
+            db.session.execute(text(f'ALTER TABLE {LEDGER_TABLE} DETACH PARTITION {name}'))
+            detached.append(name)
+    db.session.commit()
+    logger.info(f'Detached ledger partitions: {detached}')
+    return detached
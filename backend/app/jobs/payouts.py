@@ -0,0 +1,58 @@
+import logging
+from datetime import datetime
+from sqlalchemy import select, update
+from app import db
+from app.models import Payout
+from app.utils.stats_rollup import bump
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def process_pending_payouts(batch_size=DEFAULT_BATCH_SIZE, on_progress=None):
+    """Mark pending payouts paid in short, independently committed chunks.
+
+    Each chunk claims up to ``batch_size`` oldest pending rows with
+    ``SELECT ... FOR UPDATE SKIP LOCKED`` and flips them with one
+    ``UPDATE ... WHERE status = 'pending' AND id IN (...) RETURNING amount_usd``,
+    so concurrent workers split the backlog instead of waiting on each
+    other. ``on_progress(count, total_usd)`` is called after every commit.
+    Returns ``(count, total_usd)``.
+    """
+    processed = 0
+    total_amount = 0.0
+    while True:
+        claimed_ids = db.session.execute(
+            select(Payout.id)
+            .where(Payout.status == 'pending')
+            .order_by(Payout.created_at, Payout.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
+        if not claimed_ids:
+            db.session.rollback()
+            break
+
+        amounts = db.session.execute(
+            update(Payout)
+            .where(Payout.id.in_(claimed_ids), Payout.status == 'pending')
+            .values(status='paid', processed_at=datetime.utcnow())
+            .returning(Payout.amount_usd)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+        batch_amount = sum(amount or 0.0 for amount in amounts)
+        bump(payouts_pending=-len(amounts), payouts_paid=len(amounts), payouts_pending_usd=-batch_amount)
+        db.session.commit()
+
+        processed += len(amounts)
+        total_amount += batch_amount
+        logger.debug(f'Paid {len(amounts)} payouts, {processed} so far (${total_amount:.2f})')
+        if on_progress:
+            on_progress(processed, total_amount)
+        if len(claimed_ids) < batch_size:
+            break
+
+    if processed:
+        logger.info(f'Processed {processed} payouts, total ${total_amount:.2f}')
+    return processed, total_amount
@@ -0,0 +1,111 @@
+import json
+import logging
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import select
+from app import db
+from app.models import Job
+
+logger = logging.getLogger(__name__)
+
+
+def _handlers():
+    from app.jobs.activation import activate_rental
+    return {
+        'activate_rental': activate_rental
+    }
+
+
+def enqueue(kind, **payload):
+    """Add a job to the caller's transaction; it becomes visible to workers on commit"""
+    job = Job(
+        kind=kind,
+        payload=json.dumps(payload),
+        status='pending',
+        attempts=0,
+        max_attempts=current_app.config['JOB_MAX_ATTEMPTS'],
+        run_after=datetime.utcnow()
+    )
+    db.session.add(job)
+    return job
+
+
+def dispatch(job):
+    """Run a just-committed job in the request when no worker process is deployed (JOB_QUEUE_INLINE)"""
+    if current_app.config['JOB_QUEUE_INLINE']:
+        run_next_job(job_id=job.id)
+
+
+def run_next_job(job_id=None):
+    """Claim one due job with SKIP LOCKED and run it in its own transaction.
+
+    The row lock is held while the handler runs, so a crashed worker simply
+    releases the job to the next poll. Returns the job, or None when nothing is due.
+    """
+    query = (
+        select(Job)
+        .where(Job.status == 'pending', Job.run_after <= datetime.utcnow())
+        .order_by(Job.run_after, Job.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+    if job_id is not None:
+        query = query.where(Job.id == job_id)
+    job = db.session.execute(query).scalar()
+    if job is None:
+        db.session.rollback()
+        return None
+
+    job_id, kind, payload = job.id, job.kind, json.loads(job.payload)
+    try:
+        _handlers()[kind](**payload)
+        job.status = 'done'
+        job.attempts += 1
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+        logger.debug(f'Job {job_id} ({kind}) done')
+    except Exception as e:
+        db.session.rollback()
+        job = db.session.execute(select(Job).where(Job.id == job_id).with_for_update()).scalar_one()
+        job.attempts += 1
+        job.last_error = f'{type(e).__name__}: {e}'
+        if job.attempts >= job.max_attempts:
+            job.status = 'dead'
+            job.finished_at = datetime.utcnow()
+            logger.error(f'Job {job_id} ({kind}) dead after {job.attempts} attempts: {e}')
+        else:
+            delay = current_app.config['JOB_RETRY_DELAY'] * 2 ** (job.attempts - 1)
+            job.run_after = datetime.utcnow() + timedelta(seconds=delay)
+            logger.warning(f'Job {job_id} ({kind}) failed, retrying in {delay}s: {e}')
+        db.session.commit()
+    return job
+
+
+def run_jobs(max_jobs=None):
+    """Run due jobs until the queue is drained or ``max_jobs`` ran; returns how many ran"""
+    ran = 0
+    while max_jobs is None or ran < max_jobs:
+        if run_next_job() is None:
+            break
+        ran += 1
+    return ran
+
+
+def run_worker(app, poll_interval=1, max_iterations=None):
+    """Poll the job table in this process until interrupted; safe to run on several hosts."""
+    logger.info('Job worker started')
+    iterations = 0
+    while max_iterations is None or iterations < max_iterations:
+        iterations += 1
+        with app.app_context():
+            try:
+                ran = run_jobs(max_jobs=app.config['JOB_BATCH_SIZE'])
+            except Exception as e:
+                logger.error(f'Job worker poll failed: {e}', exc_info=True)
+                db.session.rollback()
+                ran = 0
+            finally:
+                db.session.remove()
+        if not ran and (max_iterations is None or iterations < max_iterations):
+            time.sleep(poll_interval)
@@ -0,0 +1,57 @@
+import logging
+from collections import Counter
+from datetime import datetime
+from sqlalchemy import select, update
+from app import db
+from app.models import InventoryReservation, Miner
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def release_expired_reservations(now=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Hand units held by abandoned checkouts back to their miners.
+
+    Each batch flips at most ``batch_size`` pending holds past ``expires_at``
+    to ``released`` with ``UPDATE ... RETURNING miner_id`` and adds the units
+    back with one increment per miner, committed together. A payment that
+    confirms later has to take a fresh unit (see app.utils.inventory).
+    Returns the number of holds released.
+    """
+    now = now or datetime.utcnow()
+    released_total = 0
+    while True:
+        batch_ids = (
+            select(InventoryReservation.rental_id)
+            .where(InventoryReservation.status == 'pending', InventoryReservation.expires_at < now)
+            .order_by(InventoryReservation.expires_at)
+            .limit(batch_size)
+            .scalar_subquery()
+        )
+        released = db.session.execute(
+            update(InventoryReservation)
+            .where(InventoryReservation.rental_id.in_(batch_ids), InventoryReservation.status == 'pending')
+            .values(status='released')
+            .returning(InventoryReservation.miner_id)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+        if not released:
+            db.session.rollback()
+            break
+
+        for miner_id, units in sorted(Counter(released).items()):
+            db.session.execute(
+                update(Miner)
+                .where(Miner.id == miner_id)
+                .values(available_units=Miner.available_units + units)
+            )
+        db.session.commit()
+        released_total += len(released)
+        logger.debug(f'Released {len(released)} expired reservations')
+        if len(released) < batch_size:
+            break
+
+    if released_total:
+        logger.info(f'Released {released_total} expired reservations')
+    return released_total
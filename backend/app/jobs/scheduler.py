@@ -0,0 +1,66 @@
+import logging
+import time
+from datetime import datetime
+from app import db
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    def __init__(self, name, interval_seconds, func):
+        self.name = name
+        self.interval_seconds = interval_seconds
+        self.func = func
+        self.last_run = None
+
+    def is_due(self, now):
+        return self.last_run is None or (now - self.last_run).total_seconds() >= self.interval_seconds
+
+
+def build_tasks(app):
+    from app.jobs.accrual import accrue_pending_days
+    from app.jobs.expiry import expire_rentals
+    from app.jobs.reservations import release_expired_reservations
+    from app.jobs.webhooks import process_webhook_inbox
+    from app.utils.stats_rollup import refresh_rollup
+
+    return [
+        PeriodicTask('process_webhook_inbox', app.config['WEBHOOK_DRAIN_INTERVAL'],
+                     lambda: process_webhook_inbox(batch_size=app.config['WEBHOOK_BATCH_SIZE'])),
+        PeriodicTask('expire_rentals', app.config['EXPIRY_CHECK_INTERVAL'],
+                     lambda: expire_rentals(batch_size=app.config['EXPIRY_BATCH_SIZE'])),
+        PeriodicTask('release_expired_reservations', app.config['RESERVATION_RELEASE_INTERVAL'],
+                     release_expired_reservations),
+        PeriodicTask('accrue_daily_earnings', app.config['ACCRUAL_CHECK_INTERVAL'],
+                     lambda: accrue_pending_days(chunk_size=app.config['ACCRUAL_CHUNK_SIZE'],
+                                                 max_days=app.config['ACCRUAL_CATCHUP_DAYS'])),
+        PeriodicTask('refresh_stats_rollup', app.config['STATS_ROLLUP_REFRESH_INTERVAL'], refresh_rollup)
+    ]
+
+
+def run_scheduler(app, tasks=None, poll_interval=5, max_iterations=None):
+    """Run periodic maintenance jobs in this process until interrupted.
+
+    Every job is idempotent, so running the scheduler on several hosts at
+    once is safe; it only wastes a little work.
+    """
+    tasks = tasks if tasks is not None else build_tasks(app)
+    logger.info(f'Scheduler started with tasks: {[t.name for t in tasks]}')
+    iterations = 0
+    while max_iterations is None or iterations < max_iterations:
+        iterations += 1
+        for task in tasks:
+            now = datetime.utcnow()
+            if not task.is_due(now):
+                continue
+            task.last_run = now
+            with app.app_context():
+                try:
+                    task.func()
+                except Exception as e:
+                    logger.error(f'Scheduled task {task.name} failed: {e}', exc_info=True)
+                    db.session.rollback()
+                finally:
+                    db.session.remove()
+        if max_iterations is None or iterations < max_iterations:
+            time.sleep(poll_interval)
@@ -0,0 +1,86 @@
+import logging
+from collections import Counter
+from datetime import datetime
+from sqlalchemy import func, select, update
+from app import db
+from app.jobs.queue import dispatch, enqueue
+from app.models import Payment, WebhookEvent
+from app.utils.stats_rollup import bump, payment_status_deltas
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def _apply_confirmations(tx_hashes):
+    """Confirm the payments behind ``tx_hashes`` and queue their rental activations.
+
+    Returns ``(counter deltas, queued jobs)``; the jobs join the caller's
+    transaction, so activation is only queued once the batch commits.
+    """
+    payments = db.session.execute(
+        select(Payment.id, Payment.status, Payment.amount_usd, Payment.rental_id)
+        .where(Payment.tx_hash.in_(tx_hashes), Payment.status != 'confirmed')
+        .with_for_update()
+    ).all()
+    if not payments:
+        return Counter(), []
+
+    deltas = Counter()
+    for payment in payments:
+        deltas.update(payment_status_deltas(payment.status, 'confirmed', payment.amount_usd))
+    db.session.execute(
+        update(Payment)
+        .where(Payment.id.in_([p.id for p in payments]))
+        .values(status='confirmed', confirmed_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
+    # Same activation as every other confirm path: unit claim, rental window and referral payout
+    jobs = [
+        enqueue('activate_rental', rental_id=payment.rental_id, payment_id=payment.id)
+        for payment in payments if payment.rental_id
+    ]
+    logger.debug(f'Confirmed {len(payments)} payments from webhooks')
+    return deltas, jobs
+
+
+def process_webhook_inbox(batch_size=DEFAULT_BATCH_SIZE):
+    """Apply stored webhook events in batches; returns the number of events consumed.
+
+    Each batch claims up to ``batch_size`` unprocessed events with
+    ``FOR UPDATE SKIP LOCKED``, confirms all of their payments with one
+    set-based UPDATE and marks the events processed in the same commit, so
+    several workers can drain the inbox side by side and a crash replays
+    at most one batch.
+    """
+    processed_total = 0
+    while True:
+        events = db.session.execute(
+            select(WebhookEvent.id, WebhookEvent.tx_hash, WebhookEvent.status)
+            .where(WebhookEvent.processed_at.is_(None))
+            .order_by(WebhookEvent.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if not events:
+            db.session.rollback()
+            break
+
+        confirmed = {event.tx_hash for event in events if event.status == 'confirmed'}
+        deltas, jobs = _apply_confirmations(confirmed) if confirmed else (Counter(), [])
+        db.session.execute(
+            update(WebhookEvent)
+            .where(WebhookEvent.id.in_([event.id for event in events]))
+            .values(processed_at=datetime.utcnow())
+        )
+        bump(**deltas)
+        db.session.commit()
+        for job in jobs:
+            dispatch(job)
+        processed_total += len(events)
+        if len(events) < batch_size:
+            break
+
+    if processed_total:
+        logger.info(f'Processed {processed_total} webhook events')
+    return processed_total
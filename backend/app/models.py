@@ -1,11 +1,14 @@
 from datetime import datetime
 from app import db
-from werkzeug.security import generate_password_hash, check_password_hash
-import secrets
-import string
+from app.utils.password_hasher import hash_password, verify_password
 
 class User(db.Model):
     __tablename__ = 'users'
+    __table_args__ = (
+        db.Index('ix_users_created_at_id', 'created_at', 'id'),
+        db.Index('ix_users_referred_by', 'referred_by'),
+        db.Index('ix_users_is_admin', 'is_admin'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(120), unique=True, nullable=False, index=True)
@@ -13,7 +16,7 @@ class User(db.Model):
     referral_code = db.Column(db.String(20), unique=True, nullable=False, index=True)
     referred_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
     is_admin = db.Column(db.Boolean, default=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     
     rentals = db.relationship('Rental', backref='user', lazy='dynamic')
     payments = db.relationship('Payment', backref='user', lazy='dynamic')
@@ -21,18 +24,14 @@ class User(db.Model):
     referrals_received = db.relationship('Referral', foreign_keys='Referral.referred_id', backref='referred', lazy='dynamic')
     
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
     
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
-    
-    @staticmethod
-    def generate_referral_code():
-        chars = string.ascii_uppercase + string.digits
-        while True:
-            code = ''.join(secrets.choice(chars) for _ in range(8))
-            if not User.query.filter_by(referral_code=code).first():
-                return code
+        """Also upgrades ``password_hash`` in place when the KDF parameters changed; the caller commits"""
+        valid, new_hash = verify_password(self.password_hash, password)
+        if new_hash:
+            self.password_hash = new_hash
+        return valid
     
     def to_dict(self):
         return {
@@ -45,6 +44,9 @@ class User(db.Model):
 
 class Miner(db.Model):
     __tablename__ = 'miners'
+    __table_args__ = (
+        db.Index('ix_miners_created_at', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -76,6 +78,14 @@ class Miner(db.Model):
 
 class Rental(db.Model):
     __tablename__ = 'rentals'
+    __table_args__ = (
+        db.Index('ix_rentals_user_id_created_at_id', 'user_id', 'created_at', 'id'),
+        db.Index('ix_rentals_miner_id_is_active', 'miner_id', 'is_active'),
+        # Expiry sweep (active, end_date < now) and cleanup (inactive, end_date < cutoff)
+        db.Index('ix_rentals_is_active_end_date', 'is_active', 'end_date'),
+        db.Index('ix_rentals_is_active_created_at_id', 'is_active', 'created_at', 'id'),
+        db.Index('ix_rentals_created_at_id', 'created_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -87,7 +97,7 @@ class Rental(db.Model):
     is_active = db.Column(db.Boolean, default=False)
     total_profit_btc = db.Column(db.Float, default=0.0)
     monthly_fee_usd = db.Column(db.Float, nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     
     payments = db.relationship('Payment', backref='rental', lazy='dynamic')
     
@@ -109,6 +119,10 @@ class Rental(db.Model):
 
 class Referral(db.Model):
     __tablename__ = 'referrals'
+    __table_args__ = (
+        db.Index('ix_referrals_referrer_id_referred_id', 'referrer_id', 'referred_id'),
+        db.Index('ix_referrals_referred_id', 'referred_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     referrer_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -127,6 +141,14 @@ class Referral(db.Model):
 
 class Payment(db.Model):
     __tablename__ = 'payments'
+    __table_args__ = (
+        # Webhook lookup; NULLs (unconfirmed payments) do not collide
+        db.Index('ix_payments_tx_hash', 'tx_hash', unique=True),
+        db.Index('ix_payments_user_id_created_at_id', 'user_id', 'created_at', 'id'),
+        db.Index('ix_payments_status_created_at_id', 'status', 'created_at', 'id'),
+        db.Index('ix_payments_created_at_id', 'created_at', 'id'),
+        db.Index('ix_payments_rental_id', 'rental_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -136,7 +158,7 @@ class Payment(db.Model):
     tx_hash = db.Column(db.String(256), nullable=True)
     status = db.Column(db.String(20), default='pending')
     confirmed_at = db.Column(db.DateTime, nullable=True)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     
     def to_dict(self):
         return {
@@ -154,6 +176,14 @@ class Payment(db.Model):
 
 class Payout(db.Model):
     __tablename__ = 'payouts'
+    __table_args__ = (
+        db.Index('ix_payouts_user_id_status', 'user_id', 'status'),
+        db.Index('ix_payouts_status_created_at_id', 'status', 'created_at', 'id'),
+        db.Index('ix_payouts_created_at_id', 'created_at', 'id'),
+        db.Index('ix_payouts_user_id_created_at_id', 'user_id', 'created_at', 'id'),
+        db.Index('ix_payouts_referral_id', 'referral_id'),
+        db.Index('ix_payouts_rental_id', 'rental_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -163,7 +193,7 @@ class Payout(db.Model):
     payout_type = db.Column(db.String(20), default='referral_commission')
     status = db.Column(db.String(20), default='pending')
     processed_at = db.Column(db.DateTime, nullable=True)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     
     user = db.relationship('User', backref=db.backref('payouts', lazy='dynamic'))
     
@@ -192,11 +222,13 @@ class SystemSettings(db.Model):
     
     @staticmethod
     def get_setting(key, default=None):
-        setting = SystemSettings.query.filter_by(key=key).first()
-        return setting.value if setting else default
+        from app.utils.settings_cache import get_settings_cache
+        entry = get_settings_cache().entries().get(key)
+        return entry['value'] if entry else default
     
     @staticmethod
     def set_setting(key, value, description=None):
+        from app.utils.settings_cache import bump_settings_version, get_settings_cache
         setting = SystemSettings.query.filter_by(key=key).first()
         if setting:
             setting.value = str(value)
@@ -205,16 +237,19 @@ class SystemSettings(db.Model):
         else:
             setting = SystemSettings(key=key, value=str(value), description=description)
             db.session.add(setting)
+        bump_settings_version()
         db.session.commit()
+        get_settings_cache().invalidate()
         return setting
     
     @staticmethod
     def get_all_settings():
-        settings = SystemSettings.query.all()
-        return {s.key: {'value': s.value, 'description': s.description, 'updated_at': s.updated_at.isoformat() if s.updated_at else None} for s in settings}
+        from app.utils.settings_cache import get_settings_cache
+        return {key: dict(entry) for key, entry in get_settings_cache().entries().items()}
     
     @staticmethod
     def initialize_defaults():
+        from app.utils.settings_cache import bump_settings_version
         defaults = {
             'referral_percentage': ('5.0', 'Referral commission percentage (e.g., 5.0 means 5%)'),
             'profit_percentage': ('10.0', 'Daily profit percentage for mining rentals'),
@@ -226,6 +261,7 @@ class SystemSettings(db.Model):
             if not SystemSettings.query.filter_by(key=key).first():
                 setting = SystemSettings(key=key, value=value, description=description)
                 db.session.add(setting)
+        bump_settings_version()
         db.session.commit()
     
     def to_dict(self):
@@ -236,3 +272,171 @@ class SystemSettings(db.Model):
             'description': self.description,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
+
+
+class SettingsVersion(db.Model):
+    """Single-row counter bumped on every settings write so each worker knows when to reload its cache."""
+    __tablename__ = 'settings_version'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class StatsRollup(db.Model):
+    """Dashboard counters kept current by incremental deltas (see app.utils.stats_rollup).
+
+    Each counter is split over ``STATS_ROLLUP_SHARDS`` rows whose sum is the
+    value, so concurrent writers rarely wait on the same row lock.
+    """
+    __tablename__ = 'stats_rollup'
+    
+    key = db.Column(db.String(64), primary_key=True)
+    shard = db.Column(db.Integer, primary_key=True, default=0)
+    value = db.Column(db.Float, nullable=False, default=0.0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class EarningsLedger(db.Model):
+    """Append-only daily earnings per rental, written by the accrual job.
+
+    The composite primary key doubles as the (rental_id, day) unique index.
+    On PostgreSQL the table is range-partitioned by month on ``day`` so old
+    months can be detached cheaply (see app.jobs.ledger).
+    """
+    __tablename__ = 'earnings_ledger'
+    __table_args__ = (
+        # Network-wide daily rollups for admin reporting
+        db.Index('ix_earnings_ledger_day', 'day'),
+        {'postgresql_partition_by': 'RANGE (day)'},
+    )
+    
+    rental_id = db.Column(db.Integer, db.ForeignKey('rentals.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    btc = db.Column(db.Float, nullable=False)
+    usd_at_price = db.Column(db.Float, nullable=False)
+    network_hashrate_snapshot = db.Column(db.Float, nullable=False)
+    
+    def to_dict(self):
+        return {
+            'rental_id': self.rental_id,
+            'day': self.day.isoformat(),
+            'btc': self.btc,
+            'usd_at_price': self.usd_at_price,
+            'network_hashrate_snapshot': self.network_hashrate_snapshot
+        }
+
+
+class AccrualRun(db.Model):
+    __tablename__ = 'accrual_runs'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, unique=True, nullable=False)
+    status = db.Column(db.String(20), default='running', nullable=False)
+    last_rental_id = db.Column(db.Integer, default=0, nullable=False)
+    rentals_processed = db.Column(db.Integer, default=0, nullable=False)
+    network_hashrate_th = db.Column(db.Float, nullable=False)
+    btc_price_usd = db.Column(db.Float, nullable=False)
+    net_btc_per_th = db.Column(db.Float, nullable=False)
+    started_at = db.Column(db.DateTime, default=datetime.utcnow)
+    completed_at = db.Column(db.DateTime, nullable=True)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'day': self.day.isoformat(),
+            'status': self.status,
+            'last_rental_id': self.last_rental_id,
+            'rentals_processed': self.rentals_processed,
+            'network_hashrate_th': self.network_hashrate_th,
+            'btc_price_usd': self.btc_price_usd,
+            'net_btc_per_th': self.net_btc_per_th,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None
+        }
+
+
+class InventoryReservation(db.Model):
+    """One miner unit held for a checkout until its payment confirms or the hold expires.
+
+    See app.utils.inventory; expired holds are handed back by app.jobs.reservations.
+    """
+    __tablename__ = 'inventory_reservations'
+    __table_args__ = (
+        # Reaper scan: pending holds past their expiry
+        db.Index('ix_inventory_reservations_status_expires_at', 'status', 'expires_at'),
+    )
+    
+    rental_id = db.Column(db.Integer, db.ForeignKey('rentals.id'), primary_key=True)
+    miner_id = db.Column(db.Integer, db.ForeignKey('miners.id'), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='pending')
+    expires_at = db.Column(db.DateTime, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'rental_id': self.rental_id,
+            'miner_id': self.miner_id,
+            'status': self.status,
+            'expires_at': self.expires_at.isoformat(),
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+
+class WebhookEvent(db.Model):
+    """Raw payment provider callback, stored on receipt and applied later by app.jobs.webhooks.
+
+    The unique ``event_id`` makes provider retries a no-op.
+    """
+    __tablename__ = 'webhook_inbox'
+    __table_args__ = (
+        db.Index('ix_webhook_inbox_event_id', 'event_id', unique=True),
+        # Drain order: unprocessed events oldest first
+        db.Index('ix_webhook_inbox_processed_at_id', 'processed_at', 'id'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    event_id = db.Column(db.String(300), nullable=False)
+    tx_hash = db.Column(db.String(256), nullable=False)
+    status = db.Column(db.String(20), nullable=False)
+    payload = db.Column(db.Text)
+    received_at = db.Column(db.DateTime, default=datetime.utcnow)
+    processed_at = db.Column(db.DateTime, nullable=True)
+
+
+class Job(db.Model):
+    """Durable background job, written in the same transaction as the change that needs it.
+
+    Polled with SKIP LOCKED by the worker in app.jobs.queue; failed jobs are
+    retried with backoff until ``max_attempts`` and then left ``dead``.
+    """
+    __tablename__ = 'jobs'
+    __table_args__ = (
+        # Worker poll: due pending jobs in order
+        db.Index('ix_jobs_status_run_after_id', 'status', 'run_after', 'id'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(64), nullable=False)
+    payload = db.Column(db.Text, nullable=False, default='{}')
+    status = db.Column(db.String(20), nullable=False, default='pending')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    run_after = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'payload': self.payload,
+            'status': self.status,
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'run_after': self.run_after.isoformat() if self.run_after else None,
+            'last_error': self.last_error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
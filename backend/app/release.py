@@ -0,0 +1,45 @@
+import logging
+from contextlib import contextmanager
+from flask_migrate import stamp, upgrade
+from sqlalchemy import inspect, text
+from app import db
+
+logger = logging.getLogger(__name__)
+
+# Schema of databases created by db.create_all() before migrations were introduced
+BASELINE_REVISION = '0001'
+# Arbitrary application-wide key for pg_advisory_lock
+MIGRATION_LOCK_KEY = 727_104_001
+
+
+@contextmanager
+def migration_lock():
+    """Serialise migrations across processes on PostgreSQL; a no-op elsewhere"""
+    if db.engine.dialect.name != 'postgresql':
+        yield
+        return
+    with db.engine.connect() as conn:
+        conn.execute(text('SELECT pg_advisory_lock(:key)'), {'key': MIGRATION_LOCK_KEY})
+        try:
+            yield
+        finally:
+            conn.execute(text('SELECT pg_advisory_unlock(:key)'), {'key': MIGRATION_LOCK_KEY})
+
+
+def migrate_database():
+    """Release step: bring the schema to head and seed defaults on a brand-new database.
+
+    Run once per deploy (``flask --app run release``) before the web and job
+    processes start, never from app import, so workers do not race each other.
+    """
+    from app.models import SystemSettings
+    with migration_lock():
+        inspector = inspect(db.engine)
+        fresh_database = not inspector.has_table('users')
+        if not fresh_database and not inspector.has_table('alembic_version'):
+            logger.info(f'Stamping pre-migration database at revision {BASELINE_REVISION}')
+            stamp(revision=BASELINE_REVISION)
+        upgrade()
+        if fresh_database:
+            SystemSettings.initialize_defaults()
+    return fresh_database
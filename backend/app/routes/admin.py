@@ -1,11 +1,26 @@
 import logging
 from functools import wraps
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from sqlalchemy import func
+from sqlalchemy import func, case
 from app import db
 from datetime import datetime
-from app.models import User, Miner, Rental, Payment, Referral, Payout, SystemSettings
+from app.models import (
+    User, Miner, Rental, Payment, Referral, Payout, SystemSettings, EarningsLedger, InventoryReservation, WebhookEvent
+)
+from app.utils.api_fetcher import get_circuit_breaker_status
+from app.utils.http_client import get_pool_stats
+from app.utils.earnings_history import parse_day_range, report_day_range, daily_totals, monthly_rollup
+from app.utils.stats_rollup import (
+    TRACKED_PAYMENT_STATUSES, TRACKED_PAYOUT_STATUSES,
+    bump, get_rollup, invalidate_rollup, payment_status_deltas
+)
+from app.utils.pagination import keyset_page, wants_total, approximate_total
+from app.jobs.payouts import process_pending_payouts
+from app.jobs.queue import dispatch, enqueue
+from app.utils.roles import current_user_is_admin, invalidate_role
+from app.utils.export import EXPORTS, FORMATS, build_export_query, generate_export
+from app.utils.serializers import ADMIN_PAYOUT_SCHEMA, PAYMENT_SCHEMA, REFERRAL_SCHEMA, RENTAL_SCHEMA, USER_SCHEMA
 
 bp = Blueprint('admin', __name__, url_prefix='/api/admin')
 
@@ -14,8 +29,7 @@ def admin_required(fn):
     @jwt_required()
     def wrapper(*args, **kwargs):
         user_id = int(get_jwt_identity())
-        user = User.query.get(user_id)
-        if not user or not user.is_admin:
+        if not current_user_is_admin():
             current_app.logger.warning(f'Admin access denied for user ID: {user_id}')
             return jsonify({'error': 'Admin access required'}), 403
         return fn(*args, **kwargs)
@@ -26,46 +40,34 @@ def admin_required(fn):
 def get_dashboard_stats():
     current_app.logger.info('=== Admin Dashboard Stats Request ===')
     
-    total_users = User.query.count()
-    total_miners = Miner.query.count()
-    total_rentals = Rental.query.count()
-    active_rentals = Rental.query.filter_by(is_active=True).count()
+    rollup = get_rollup()
+    total_users = int(rollup['users_total'])
+    total_rentals = int(rollup['rentals_total'])
+    total_revenue = rollup['payments_confirmed_usd']
     
-    total_revenue = db.session.query(func.sum(Payment.amount_usd)).filter(
-        Payment.status == 'confirmed'
-    ).scalar() or 0
-    
-    pending_payments = Payment.query.filter_by(status='pending').count()
-    
-    total_hashrate = db.session.query(func.sum(Rental.hashrate_allocated)).filter(
-        Rental.is_active == True
-    ).scalar() or 0
-    
-    total_referral_commission = db.session.query(func.sum(Referral.commission_earned_usd)).scalar() or 0
-    
-    recent_users = User.query.order_by(User.created_at.desc()).limit(5).all()
-    recent_rentals = Rental.query.order_by(Rental.created_at.desc()).limit(5).all()
+    recent_users = USER_SCHEMA.query().order_by(User.created_at.desc()).limit(5).all()
+    recent_rentals = RENTAL_SCHEMA.query().order_by(Rental.created_at.desc()).limit(5).all()
     
     stats = {
         'users': {
             'total': total_users,
-            'recent': [u.to_dict() for u in recent_users]
+            'recent': USER_SCHEMA.encode(recent_users)
         },
         'miners': {
-            'total': total_miners
+            'total': int(rollup['miners_total'])
         },
         'rentals': {
             'total': total_rentals,
-            'active': active_rentals,
-            'recent': [r.to_dict() for r in recent_rentals]
+            'active': int(rollup['rentals_active']),
+            'recent': RENTAL_SCHEMA.encode(recent_rentals)
         },
         'revenue': {
             'total_usd': round(total_revenue, 2),
-            'pending_payments': pending_payments,
-            'referral_commissions': round(total_referral_commission, 2)
+            'pending_payments': int(rollup['payments_pending']),
+            'referral_commissions': round(rollup['referrals_commission_usd'], 2)
         },
         'hashrate': {
-            'total_active_th': round(total_hashrate, 2)
+            'total_active_th': round(rollup['rentals_active_hashrate_th'], 2)
         }
     }
     
@@ -77,26 +79,25 @@ def get_dashboard_stats():
 def get_all_users():
     current_app.logger.info('=== Admin Get All Users Request ===')
     
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 20, type=int)
     search = request.args.get('search', '')
     
-    query = User.query
+    query = USER_SCHEMA.query()
     if search:
         query = query.filter(User.email.ilike(f'%{search}%'))
     
-    users = query.order_by(User.created_at.desc()).paginate(
-        page=page, per_page=per_page, error_out=False
-    )
+    try:
+        users, next_cursor = keyset_page(query, User, request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
     result = {
-        'users': [u.to_dict() for u in users.items],
-        'total': users.total,
-        'pages': users.pages,
-        'current_page': page
+        'users': USER_SCHEMA.encode(users),
+        'next_cursor': next_cursor
     }
+    if wants_total(request.args):
+        result['total'] = approximate_total(query, None if search else 'users_total')
     
-    current_app.logger.info(f'Admin retrieved {len(users.items)} users (page {page})')
+    current_app.logger.info(f'Admin retrieved {len(users)} users')
     return jsonify(result), 200
 
 @bp.route('/users/<int:user_id>', methods=['GET'])
@@ -108,15 +109,15 @@ def get_user_details(user_id):
     if not user:
         return jsonify({'error': 'User not found'}), 404
     
-    user_rentals = Rental.query.filter_by(user_id=user_id).all()
-    user_payments = Payment.query.filter_by(user_id=user_id).all()
-    user_referrals = Referral.query.filter_by(referrer_id=user_id).all()
+    user_rentals = RENTAL_SCHEMA.query().filter(Rental.user_id == user_id).all()
+    user_payments = PAYMENT_SCHEMA.query().filter(Payment.user_id == user_id).all()
+    user_referrals = REFERRAL_SCHEMA.query().filter(Referral.referrer_id == user_id).all()
     
     result = {
         'user': user.to_dict(),
-        'rentals': [r.to_dict() for r in user_rentals],
-        'payments': [p.to_dict() for p in user_payments],
-        'referrals': [ref.to_dict() for ref in user_referrals],
+        'rentals': RENTAL_SCHEMA.encode(user_rentals),
+        'payments': PAYMENT_SCHEMA.encode(user_payments),
+        'referrals': REFERRAL_SCHEMA.encode(user_referrals),
         'stats': {
             'total_rentals': len(user_rentals),
             'active_rentals': len([r for r in user_rentals if r.is_active]),
@@ -143,7 +144,9 @@ def toggle_user_admin(user_id):
         return jsonify({'error': 'User not found'}), 404
     
     user.is_admin = not user.is_admin
+    bump(users_admins=1 if user.is_admin else -1)
     db.session.commit()
+    invalidate_role(user_id)
     
     current_app.logger.info(f'Admin status toggled for user {user.email}: is_admin={user.is_admin}')
     return jsonify({
@@ -156,12 +159,19 @@ def toggle_user_admin(user_id):
 def get_all_miners_admin():
     current_app.logger.info('=== Admin Get All Miners Request ===')
     miners = Miner.query.order_by(Miner.created_at.desc()).all()
+    rental_counts = {
+        miner_id: (total, active or 0)
+        for miner_id, total, active in db.session.query(
+            Rental.miner_id,
+            func.count(Rental.id),
+            func.sum(case((Rental.is_active == True, 1), else_=0))
+        ).group_by(Rental.miner_id)
+    }
     
     result = []
     for miner in miners:
         miner_data = miner.to_dict()
-        miner_data['rental_count'] = Rental.query.filter_by(miner_id=miner.id).count()
-        miner_data['active_rentals'] = Rental.query.filter_by(miner_id=miner.id, is_active=True).count()
+        miner_data['rental_count'], miner_data['active_rentals'] = rental_counts.get(miner.id, (0, 0))
         result.append(miner_data)
     
     current_app.logger.info(f'Admin retrieved {len(miners)} miners')
@@ -191,6 +201,7 @@ def create_miner():
     )
     
     db.session.add(miner)
+    bump(miners_total=1)
     db.session.commit()
     
     current_app.logger.info(f'Admin created miner: {miner.name} (ID: {miner.id})')
@@ -251,6 +262,7 @@ def delete_miner(miner_id):
         return jsonify({'error': f'Cannot delete miner with {active_rentals} active rentals'}), 400
     
     db.session.delete(miner)
+    bump(miners_total=-1)
     db.session.commit()
     
     current_app.logger.info(f'Admin deleted miner ID: {miner_id}')
@@ -261,28 +273,27 @@ def delete_miner(miner_id):
 def get_all_rentals_admin():
     current_app.logger.info('=== Admin Get All Rentals Request ===')
     
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 20, type=int)
     status = request.args.get('status', '')
     
-    query = Rental.query
+    query = RENTAL_SCHEMA.query()
     if status == 'active':
-        query = query.filter_by(is_active=True)
+        query = query.filter(Rental.is_active == True)
     elif status == 'inactive':
-        query = query.filter_by(is_active=False)
+        query = query.filter(Rental.is_active == False)
     
-    rentals = query.order_by(Rental.created_at.desc()).paginate(
-        page=page, per_page=per_page, error_out=False
-    )
+    try:
+        rentals, next_cursor = keyset_page(query, Rental, request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
     result = {
-        'rentals': [r.to_dict() for r in rentals.items],
-        'total': rentals.total,
-        'pages': rentals.pages,
-        'current_page': page
+        'rentals': RENTAL_SCHEMA.encode(rentals),
+        'next_cursor': next_cursor
     }
+    if wants_total(request.args):
+        result['total'] = approximate_total(query, f'rentals_{status}' if status in ('active', 'inactive') else 'rentals_total')
     
-    current_app.logger.info(f'Admin retrieved {len(rentals.items)} rentals (page {page})')
+    current_app.logger.info(f'Admin retrieved {len(rentals)} rentals')
     return jsonify(result), 200
 
 @bp.route('/payments', methods=['GET'])
@@ -290,26 +301,31 @@ def get_all_rentals_admin():
 def get_all_payments_admin():
     current_app.logger.info('=== Admin Get All Payments Request ===')
     
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 20, type=int)
     status = request.args.get('status', '')
     
-    query = Payment.query
+    query = PAYMENT_SCHEMA.query()
     if status:
-        query = query.filter_by(status=status)
+        query = query.filter(Payment.status == status)
     
-    payments = query.order_by(Payment.created_at.desc()).paginate(
-        page=page, per_page=per_page, error_out=False
-    )
+    try:
+        payments, next_cursor = keyset_page(query, Payment, request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
     result = {
-        'payments': [p.to_dict() for p in payments.items],
-        'total': payments.total,
-        'pages': payments.pages,
-        'current_page': page
+        'payments': PAYMENT_SCHEMA.encode(payments),
+        'next_cursor': next_cursor
     }
+    if wants_total(request.args):
+        if not status:
+            rollup_key = 'payments_total'
+        elif status in TRACKED_PAYMENT_STATUSES:
+            rollup_key = f'payments_{status}'
+        else:
+            rollup_key = None
+        result['total'] = approximate_total(query, rollup_key)
     
-    current_app.logger.info(f'Admin retrieved {len(payments.items)} payments (page {page})')
+    current_app.logger.info(f'Admin retrieved {len(payments)} payments')
     return jsonify(result), 200
 
 
@@ -318,36 +334,33 @@ def get_all_payments_admin():
 def get_all_payouts_admin():
     current_app.logger.info('=== Admin Get All Payouts Request ===')
     
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 20, type=int)
     status = request.args.get('status', '')
     
-    query = Payout.query
+    query = ADMIN_PAYOUT_SCHEMA.query()
     if status:
-        query = query.filter_by(status=status)
+        query = query.filter(Payout.status == status)
     
-    payouts = query.order_by(Payout.created_at.desc()).paginate(
-        page=page, per_page=per_page, error_out=False
-    )
-    
-    result = []
-    for payout in payouts.items:
-        payout_data = payout.to_dict()
-        user = User.query.get(payout.user_id)
-        payout_data['user_email'] = user.email if user else None
-        result.append(payout_data)
+    try:
+        payouts, next_cursor = keyset_page(query, Payout, request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
     response = {
-        'payouts': result,
-        'total': payouts.total,
-        'pages': payouts.pages,
-        'current_page': page,
-        'pending_total': db.session.query(func.sum(Payout.amount_usd)).filter(
-            Payout.status == 'pending'
-        ).scalar() or 0
+        'payouts': ADMIN_PAYOUT_SCHEMA.encode(payouts),
+        'next_cursor': next_cursor,
+        # From the rollup: a SUM over every pending payout on each page grows with the table
+        'pending_total': get_rollup()['payouts_pending_usd']
     }
+    if wants_total(request.args):
+        if not status:
+            rollup_key = 'payouts_total'
+        elif status in TRACKED_PAYOUT_STATUSES:
+            rollup_key = f'payouts_{status}'
+        else:
+            rollup_key = None
+        response['total'] = approximate_total(query, rollup_key)
     
-    current_app.logger.info(f'Admin retrieved {len(payouts.items)} payouts (page {page})')
+    current_app.logger.info(f'Admin retrieved {len(payouts)} payouts')
     return jsonify(response), 200
 
 
@@ -366,6 +379,7 @@ def process_payout(payout_id):
     payout.status = 'paid'
     payout.processed_at = datetime.utcnow()
     
+    bump(payouts_pending=-1, payouts_paid=1, payouts_pending_usd=-(payout.amount_usd or 0.0))
     db.session.commit()
     
     current_app.logger.info(f'Admin processed payout ID: {payout_id}, Amount: ${payout.amount_usd}')
@@ -380,24 +394,16 @@ def process_payout(payout_id):
 def process_all_pending_payouts():
     current_app.logger.info('=== Admin Process All Pending Payouts ===')
     
-    pending_payouts = Payout.query.filter_by(status='pending').all()
+    count, total_amount = process_pending_payouts(batch_size=current_app.config['PAYOUT_BATCH_SIZE'])
     
-    if not pending_payouts:
+    if not count:
         return jsonify({'message': 'No pending payouts to process'}), 200
     
-    total_amount = 0
-    for payout in pending_payouts:
-        payout.status = 'paid'
-        payout.processed_at = datetime.utcnow()
-        total_amount += payout.amount_usd
-    
-    db.session.commit()
-    
-    current_app.logger.info(f'Admin processed {len(pending_payouts)} payouts, Total: ${total_amount}')
+    current_app.logger.info(f'Admin processed {count} payouts, Total: ${total_amount}')
     return jsonify({
-        'message': f'Processed {len(pending_payouts)} payouts',
+        'message': f'Processed {count} payouts',
         'total_amount_usd': round(total_amount, 2),
-        'count': len(pending_payouts)
+        'count': count
     }), 200
 
 
@@ -468,10 +474,18 @@ def delete_user(user_id):
     Referral.query.filter_by(referrer_id=user_id).delete()
     Referral.query.filter_by(referred_id=user_id).delete()
     Payment.query.filter_by(user_id=user_id).delete()
+    EarningsLedger.query.filter(
+        EarningsLedger.rental_id.in_(db.session.query(Rental.id).filter_by(user_id=user_id))
+    ).delete(synchronize_session=False)
+    InventoryReservation.query.filter(
+        InventoryReservation.rental_id.in_(db.session.query(Rental.id).filter_by(user_id=user_id))
+    ).delete(synchronize_session=False)
     Rental.query.filter_by(user_id=user_id).delete()
     
     db.session.delete(user)
+    invalidate_rollup()
     db.session.commit()
+    invalidate_role(user_id)
     
     current_app.logger.info(f'Admin deleted user ID: {user_id}')
     return jsonify({'message': 'User and all related data deleted successfully'}), 200
@@ -488,8 +502,11 @@ def delete_rental(rental_id):
     
     Payment.query.filter_by(rental_id=rental_id).delete()
     Payout.query.filter_by(rental_id=rental_id).delete()
+    EarningsLedger.query.filter_by(rental_id=rental_id).delete()
+    InventoryReservation.query.filter_by(rental_id=rental_id).delete()
     
     db.session.delete(rental)
+    invalidate_rollup()
     db.session.commit()
     
     current_app.logger.info(f'Admin deleted rental ID: {rental_id}')
@@ -506,6 +523,7 @@ def delete_payment(payment_id):
         return jsonify({'error': 'Payment not found'}), 404
     
     db.session.delete(payment)
+    invalidate_rollup()
     db.session.commit()
     
     current_app.logger.info(f'Admin deleted payment ID: {payment_id}')
@@ -527,14 +545,19 @@ def update_payment_status(payment_id):
     if new_status not in ['pending', 'confirmed', 'failed', 'refunded']:
         return jsonify({'error': 'Invalid status'}), 400
     
-    payment.status = new_status
-    if new_status == 'confirmed':
+    deltas = payment_status_deltas(payment.status, new_status, payment.amount_usd)
+    job = None
+    if new_status == 'confirmed' and payment.status != 'confirmed':
         payment.confirmed_at = datetime.utcnow()
-        if payment.rental:
-            payment.rental.is_active = True
-            payment.rental.start_date = datetime.utcnow()
+        # Same activation as the user-facing confirm: claims the unit hold and sets the rental window
+        if payment.rental_id:
+            job = enqueue('activate_rental', rental_id=payment.rental_id, payment_id=payment.id)
+    payment.status = new_status
     
+    bump(**deltas)
     db.session.commit()
+    if job:
+        dispatch(job)
     
     current_app.logger.info(f'Admin updated payment {payment_id} status to {new_status}')
     return jsonify({
@@ -555,6 +578,7 @@ def delete_referral(referral_id):
     Payout.query.filter_by(referral_id=referral_id).delete()
     
     db.session.delete(referral)
+    invalidate_rollup()
     db.session.commit()
     
     current_app.logger.info(f'Admin deleted referral ID: {referral_id}')
@@ -577,6 +601,13 @@ def cleanup_database():
     if cleanup_type in ['all', 'old_inactive_rentals']:
         from datetime import timedelta
         cutoff = datetime.utcnow() - timedelta(days=365)
+        old_rental_ids = db.session.query(Rental.id).filter(Rental.is_active == False, Rental.end_date < cutoff)
+        EarningsLedger.query.filter(
+            EarningsLedger.rental_id.in_(old_rental_ids)
+        ).delete(synchronize_session=False)
+        InventoryReservation.query.filter(
+            InventoryReservation.rental_id.in_(old_rental_ids)
+        ).delete(synchronize_session=False)
         count = Rental.query.filter(
             Rental.is_active == False,
             Rental.end_date < cutoff
@@ -589,6 +620,13 @@ def cleanup_database():
         ).delete(synchronize_session='fetch')
         results['orphan_payouts_deleted'] = orphans
     
+    if cleanup_type in ['all', 'webhook_events']:
+        from datetime import timedelta
+        cutoff = datetime.utcnow() - timedelta(days=30)
+        count = WebhookEvent.query.filter(WebhookEvent.processed_at < cutoff).delete()
+        results['webhook_events_deleted'] = count
+    
+    invalidate_rollup()
     db.session.commit()
     
     current_app.logger.info(f'Admin cleanup completed: {results}')
@@ -603,38 +641,95 @@ def cleanup_database():
 def get_database_stats():
     current_app.logger.info('=== Admin Get Database Stats ===')
     
+    rollup = {key: int(value) for key, value in get_rollup().items()}
     stats = {
         'users': {
-            'total': User.query.count(),
-            'admins': User.query.filter_by(is_admin=True).count()
+            'total': rollup['users_total'],
+            'admins': rollup['users_admins']
         },
         'miners': {
-            'total': Miner.query.count()
+            'total': rollup['miners_total']
         },
         'rentals': {
-            'total': Rental.query.count(),
-            'active': Rental.query.filter_by(is_active=True).count(),
-            'inactive': Rental.query.filter_by(is_active=False).count()
+            'total': rollup['rentals_total'],
+            'active': rollup['rentals_active'],
+            'inactive': rollup['rentals_inactive']
         },
         'payments': {
-            'total': Payment.query.count(),
-            'pending': Payment.query.filter_by(status='pending').count(),
-            'confirmed': Payment.query.filter_by(status='confirmed').count(),
-            'failed': Payment.query.filter_by(status='failed').count()
+            'total': rollup['payments_total'],
+            'pending': rollup['payments_pending'],
+            'confirmed': rollup['payments_confirmed'],
+            'failed': rollup['payments_failed'],
+            'refund_required': rollup['payments_refund_required']
         },
         'referrals': {
-            'total': Referral.query.count()
+            'total': rollup['referrals_total']
         },
         'payouts': {
-            'total': Payout.query.count(),
-            'pending': Payout.query.filter_by(status='pending').count(),
-            'paid': Payout.query.filter_by(status='paid').count()
+            'total': rollup['payouts_total'],
+            'pending': rollup['payouts_pending'],
+            'paid': rollup['payouts_paid']
         }
     }
     
     return jsonify(stats), 200
 
 
+@bp.route('/system/upstream', methods=['GET'])
+@admin_required
+def get_upstream_status():
+    current_app.logger.info('=== Admin Get Upstream Status ===')
+    return jsonify({
+        'circuit_breakers': get_circuit_breaker_status(),
+        'http_pool': get_pool_stats()
+    }), 200
+
+
+@bp.route('/earnings', methods=['GET'])
+@admin_required
+def get_earnings_report():
+    current_app.logger.info('=== Admin Get Earnings Report ===')
+    try:
+        start, end = report_day_range(*parse_day_range(request.args))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    days = daily_totals(None, start, end)
+    return jsonify({
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'daily': days,
+        'monthly': monthly_rollup(days),
+        'total_btc': sum(d['btc'] for d in days),
+        'total_usd': sum(d['usd'] for d in days)
+    }), 200
+
+
+@bp.route('/export/<string:entity>', methods=['GET'])
+@admin_required
+def export_entity(entity):
+    current_app.logger.info(f'=== Admin Export: {entity} ===')
+    if entity not in EXPORTS:
+        return jsonify({'error': f'Unknown export: {entity}'}), 404
+    
+    fmt = request.args.get('format', 'csv')
+    if fmt not in FORMATS:
+        return jsonify({'error': 'Format must be csv or ndjson'}), 400
+    
+    try:
+        start, end = parse_day_range(request.args)
+        stmt = build_export_query(entity, start, end, request.args.get('status'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    filename = f'{entity}-{datetime.utcnow():%Y%m%d%H%M%S}.{fmt}'
+    return Response(
+        stream_with_context(generate_export(db.session, entity, fmt, stmt)),
+        mimetype=FORMATS[fmt],
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
+
 @bp.route('/users/<int:user_id>/balance', methods=['PUT'])
 @admin_required
 def update_user_balance(user_id):
@@ -651,6 +746,7 @@ def update_user_balance(user_id):
         for referral in referrals:
             referral.commission_earned_usd = float(data['commission_earned_usd']) / len(referrals) if referrals else 0
     
+    invalidate_rollup()
     db.session.commit()
     
     current_app.logger.info(f'Admin updated balance for user {user_id}')
@@ -672,6 +768,10 @@ def update_rental(rental_id):
     data = request.get_json()
     
     if 'is_active' in data:
+        now = datetime.utcnow()
+        if rental.is_active and not data['is_active'] and rental.end_date and rental.end_date > now:
+            # Cancelled early: close the rental window so accrual stops at the cancellation
+            rental.end_date = now
         rental.is_active = data['is_active']
     if 'total_profit_btc' in data:
         rental.total_profit_btc = float(data['total_profit_btc'])
@@ -682,6 +782,7 @@ def update_rental(rental_id):
     if 'monthly_fee_usd' in data:
         rental.monthly_fee_usd = float(data['monthly_fee_usd'])
     
+    invalidate_rollup()
     db.session.commit()
     
     current_app.logger.info(f'Admin updated rental {rental_id}')
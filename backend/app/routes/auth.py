@@ -1,13 +1,25 @@
 import logging
 import os
 from flask import Blueprint, request, jsonify, current_app
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
 from app.models import User, Referral
+from app.utils.password_hasher import HasherBusy
+from app.utils.referral_codes import assign_referral_codes
+from app.utils.roles import access_token_for, invalidate_role
+from app.utils.stats_rollup import bump
 
 bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 
 
+@bp.errorhandler(HasherBusy)
+def hasher_busy(e):
+    db.session.rollback()
+    current_app.logger.warning(f'Password hashing saturated, rejecting {request.path}')
+    retry_after = current_app.config['PASSWORD_HASH_RETRY_AFTER']
+    return jsonify({'error': 'Too many sign-in attempts right now, please retry shortly'}), 503, {'Retry-After': str(retry_after)}
+
+
 def get_or_create_admin_user(email, password):
     """
     Check if admin user exists, if not create one using environment variables.
@@ -26,21 +38,20 @@ def get_or_create_admin_user(email, password):
     
     if not user:
         current_app.logger.info(f'Creating admin user from environment variables: {admin_email}')
-        user = User(
-            email=admin_email,
-            referral_code=User.generate_referral_code(),
-            is_admin=True
-        )
+        user = User(email=admin_email, is_admin=True)
         user.set_password(admin_password)
-        db.session.add(user)
+        assign_referral_codes([user])
+        bump(users_total=1, users_admins=1)
         db.session.commit()
         current_app.logger.info(f'Admin user created successfully with ID: {user.id}')
     
     if user.check_password(password):
         if not user.is_admin:
             user.is_admin = True
-            db.session.commit()
+            bump(users_admins=1)
             current_app.logger.info(f'Updated user {user.email} to admin status')
+        db.session.commit()
+        invalidate_role(user.id)
         return user
     
     return None
@@ -60,10 +71,7 @@ def register():
         current_app.logger.warning(f'Registration failed: Email {data["email"]} already registered')
         return jsonify({'error': 'Email already registered'}), 400
     
-    user = User(
-        email=data['email'],
-        referral_code=User.generate_referral_code()
-    )
+    user = User(email=data['email'])
     user.set_password(data['password'])
     current_app.logger.info(f'New user created: {user.email}')
     
@@ -73,17 +81,19 @@ def register():
             user.referred_by = referrer.id
             current_app.logger.info(f'User referred by: {referrer.email} (code: {data["referral_code"]})')
     
-    db.session.add(user)
+    assign_referral_codes([user])
+    bump(users_total=1)
     db.session.commit()
     current_app.logger.info(f'User {user.email} saved to database with ID: {user.id}')
     
     if user.referred_by:
         referral = Referral(referrer_id=user.referred_by, referred_id=user.id)
         db.session.add(referral)
+        bump(referrals_total=1)
         db.session.commit()
         current_app.logger.info(f'Referral record created for user ID: {user.id}')
     
-    access_token = create_access_token(identity=str(user.id))
+    access_token = access_token_for(user)
     current_app.logger.info(f'Access token generated for user: {user.email}')
     
     return jsonify({
@@ -104,7 +114,7 @@ def login():
     
     admin_user = get_or_create_admin_user(data['email'], data['password'])
     if admin_user:
-        access_token = create_access_token(identity=str(admin_user.id))
+        access_token = access_token_for(admin_user)
         current_app.logger.info(f'Admin user {admin_user.email} logged in successfully (ID: {admin_user.id})')
         return jsonify({
             'access_token': access_token,
@@ -117,7 +127,9 @@ def login():
         current_app.logger.warning(f'Login failed: Invalid credentials for {data["email"]}')
         return jsonify({'error': 'Invalid email or password'}), 401
     
-    access_token = create_access_token(identity=str(user.id))
+    # Persists a hash upgraded by check_password
+    db.session.commit()
+    access_token = access_token_for(user)
     current_app.logger.info(f'User {user.email} logged in successfully (ID: {user.id})')
     
     return jsonify({
@@ -1,19 +1,32 @@
 import logging
+import math
 from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
-from app.models import Miner, User
-from app.utils.profit_calculator import calculate_monthly_profit, calculate_daily_btc
-from app.utils.api_fetcher import get_btc_price, get_network_hashrate
+from app.models import Miner
+from app.utils.profit_calculator import (
+    calculate_monthly_profit, calculate_roi_days, estimate_earnings, estimate_earnings_batch
+)
+from app.utils.earnings_projection import project_earnings
+from app.utils.monte_carlo import simulate_profitability_cached
+from app.utils.api_fetcher import get_market_snapshot
+from app.utils.roles import current_user_is_admin
+from app.utils.stats_rollup import bump
+from app.utils.serializers import MINER_SCHEMA
 
 bp = Blueprint('miners', __name__, url_prefix='/api/miners')
 
+MAX_BATCH_SCENARIOS = 1000
+MAX_SIMULATION_PATHS = 20_000
+# Simulated path-days per request; the simulation runs inline, so this bounds its CPU time
+MAX_SIMULATION_CELLS = 2_000_000
+
 @bp.route('/', methods=['GET'])
 def get_miners():
     current_app.logger.debug('Fetching all miners')
-    miners = Miner.query.all()
+    miners = MINER_SCHEMA.query().all()
     current_app.logger.info(f'Retrieved {len(miners)} miners from database')
-    return jsonify([miner.to_dict() for miner in miners]), 200
+    return jsonify(MINER_SCHEMA.encode(miners)), 200
 
 @bp.route('/<int:miner_id>', methods=['GET'])
 def get_miner(miner_id):
@@ -36,50 +49,214 @@ def estimate_profit(miner_id):
         current_app.logger.warning(f'Profit estimation failed: Miner ID {miner_id} not found')
         return jsonify({'error': 'Miner not found'}), 404
     
-    data = request.get_json()
-    hashrate = data.get('hashrate', miner.hashrate_th)
+    data = request.get_json(silent=True) or {}
     duration_days = data.get('duration_days', 30)
+    if not isinstance(duration_days, int) or duration_days < 1 or duration_days > 3650:
+        return jsonify({'error': 'Duration must be between 1 and 3650 days'}), 400
+    try:
+        hashrate = float(data.get('hashrate', miner.hashrate_th))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'hashrate must be a number'}), 400
+    if not math.isfinite(hashrate) or hashrate <= 0:
+        return jsonify({'error': 'hashrate must be positive'}), 400
     current_app.logger.debug(f'Estimation params: hashrate={hashrate} TH/s, duration={duration_days} days')
     
     try:
         current_app.logger.debug('Fetching BTC price and network stats')
-        btc_price = get_btc_price()
-        network_hashrate = get_network_hashrate()
-        current_app.logger.info(f'Market data: BTC=${btc_price:,.2f}, Network={network_hashrate:,.0f} TH/s')
+        market = get_market_snapshot()
+        btc_price = market['btc_price']
+        network_hashrate = market['network_hashrate_th']
+        market_age = max(market['age_seconds']['btc_price'], market['age_seconds']['network_hashrate'])
+        current_app.logger.info(f'Market data: BTC=${btc_price:,.2f}, Network={network_hashrate:,.0f} TH/s (age: {market_age:.0f}s)')
         
-        daily_btc = calculate_daily_btc(hashrate, network_hashrate)
+        # Net of the maintenance fee, like the batch estimate
+        estimate = estimate_earnings(hashrate, duration_days, network_hashrate, btc_price)
         monthly_profit = calculate_monthly_profit(hashrate, network_hashrate, btc_price)
         
-        total_days = duration_days
-        total_btc = daily_btc * total_days
-        total_usd = total_btc * btc_price
-        
-        current_app.logger.info(f'Calculation results: Daily BTC={daily_btc:.8f}, Monthly USD=${monthly_profit:.2f}')
+        current_app.logger.info(f'Calculation results: Daily BTC={estimate["daily_btc"]:.8f}, Monthly USD=${monthly_profit:.2f}')
         
         return jsonify({
             'hashrate_th': hashrate,
             'duration_days': duration_days,
             'btc_price': btc_price,
             'network_hashrate_th': network_hashrate,
-            'daily_btc': daily_btc,
-            'monthly_btc': daily_btc * 30,
+            'daily_btc': estimate['daily_btc'],
+            'monthly_btc': estimate['monthly_btc'],
             'monthly_usd': monthly_profit,
-            'total_btc': total_btc,
-            'total_usd': total_usd,
-            'roi_days': int(miner.price_usd / (daily_btc * btc_price)) if daily_btc > 0 else 0
+            'total_btc': estimate['total_btc'],
+            'total_usd': estimate['total_usd'],
+            'roi_days': calculate_roi_days(miner.price_usd, hashrate, network_hashrate, btc_price),
+            'maintenance_fee_percent': estimate['maintenance_fee_percent'],
+            'market_data_age_seconds': market_age
         }), 200
     except Exception as e:
         current_app.logger.error(f'Error estimating profit: {str(e)}', exc_info=True)
         return jsonify({'error': str(e)}), 500
 
+@bp.route('/<int:miner_id>/projection', methods=['POST'])
+def project_profit(miner_id):
+    current_app.logger.info(f'=== Earnings Projection Request for Miner ID: {miner_id} ===')
+    miner = Miner.query.get(miner_id)
+    
+    if not miner:
+        current_app.logger.warning(f'Projection failed: Miner ID {miner_id} not found')
+        return jsonify({'error': 'Miner not found'}), 404
+    
+    data = request.get_json(silent=True) or {}
+    duration_days = data.get('duration_days', 30)
+    if not isinstance(duration_days, int) or duration_days < 1 or duration_days > 3650:
+        return jsonify({'error': 'Duration must be between 1 and 3650 days'}), 400
+    try:
+        hashrate = float(data.get('hashrate', miner.hashrate_th))
+        growth = data.get('difficulty_growth_percent')
+        growth = None if growth is None else float(growth)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'hashrate and difficulty_growth_percent must be numbers'}), 400
+    if not math.isfinite(hashrate) or hashrate <= 0:
+        return jsonify({'error': 'hashrate must be positive'}), 400
+    if growth is not None and (not math.isfinite(growth) or growth <= -100):
+        return jsonify({'error': 'difficulty_growth_percent must be greater than -100'}), 400
+    
+    try:
+        market = get_market_snapshot()
+        if growth is None:
+            growth = float(market['difficulty'].get('adjustment', 0))
+        
+        projection = project_earnings(
+            hashrate, duration_days, market['network_hashrate_th'], market['btc_price'],
+            market['block_height'], growth
+        )
+        projection['btc_price'] = market['btc_price']
+        projection['network_hashrate_th'] = market['network_hashrate_th']
+        
+        current_app.logger.info(f'Projection computed: {duration_days} days, Total USD=${projection["total_usd"]:.2f}')
+        return jsonify(projection), 200
+    except Exception as e:
+        current_app.logger.error(f'Error projecting earnings: {str(e)}', exc_info=True)
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/<int:miner_id>/simulate', methods=['POST'])
+def simulate_profit(miner_id):
+    current_app.logger.info(f'=== Monte Carlo Simulation Request for Miner ID: {miner_id} ===')
+    miner = Miner.query.get(miner_id)
+    
+    if not miner:
+        current_app.logger.warning(f'Simulation failed: Miner ID {miner_id} not found')
+        return jsonify({'error': 'Miner not found'}), 404
+    
+    data = request.get_json(silent=True) or {}
+    duration_days = data.get('duration_days', 30)
+    paths = data.get('paths', 10_000)
+    if not isinstance(duration_days, int) or duration_days < 1 or duration_days > 3650:
+        return jsonify({'error': 'Duration must be between 1 and 3650 days'}), 400
+    if not isinstance(paths, int) or paths < 100 or paths > MAX_SIMULATION_PATHS:
+        return jsonify({'error': f'Paths must be between 100 and {MAX_SIMULATION_PATHS}'}), 400
+    if paths * duration_days > MAX_SIMULATION_CELLS:
+        return jsonify({'error': f'Paths x duration_days must not exceed {MAX_SIMULATION_CELLS}'}), 400
+    try:
+        price_volatility = float(data.get('price_volatility', 0.6))
+        growth = data.get('hashrate_growth_percent')
+        growth = None if growth is None else float(growth)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'price_volatility and hashrate_growth_percent must be numbers'}), 400
+    if not math.isfinite(price_volatility) or price_volatility < 0:
+        return jsonify({'error': 'price_volatility must not be negative'}), 400
+    if growth is not None and (not math.isfinite(growth) or growth <= -100):
+        return jsonify({'error': 'hashrate_growth_percent must be greater than -100'}), 400
+    
+    try:
+        market = get_market_snapshot()
+        hashrate = float(data.get('hashrate', miner.hashrate_th))
+        investment = float(data.get('investment_usd', miner.price_usd))
+        if growth is None:
+            growth = float(market['difficulty'].get('adjustment', 0))
+        snapshot = (market['btc_price'], market['network_hashrate_th'], market['block_height'])
+        
+        result = simulate_profitability_cached(
+            miner.id, hashrate, duration_days, investment, snapshot, paths, price_volatility, growth
+        )
+        
+        current_app.logger.info(f'Simulation computed: {paths} paths, p50 USD=${result["total_usd"]["p50"]:.2f}')
+        return jsonify({
+            **result,
+            'miner_id': miner.id,
+            'hashrate_th': hashrate,
+            'investment_usd': investment,
+            'btc_price': market['btc_price'],
+            'network_hashrate_th': market['network_hashrate_th']
+        }), 200
+    except Exception as e:
+        current_app.logger.error(f'Error running simulation: {str(e)}', exc_info=True)
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/estimate/batch', methods=['POST'])
+def estimate_profit_batch():
+    current_app.logger.info('=== Batch Profit Estimation Request ===')
+    data = request.get_json(silent=True) or {}
+    default_duration = data.get('duration_days', 30)
+    scenarios = data.get('scenarios')
+    
+    if scenarios is None:
+        miners = Miner.query.order_by(Miner.id).all()
+        scenarios = [{'miner_id': m.id, 'duration_days': default_duration} for m in miners]
+        miners_by_id = {m.id: m for m in miners}
+    else:
+        if not isinstance(scenarios, list):
+            return jsonify({'error': 'scenarios must be a list'}), 400
+        if len(scenarios) > MAX_BATCH_SCENARIOS:
+            return jsonify({'error': f'At most {MAX_BATCH_SCENARIOS} scenarios per request'}), 400
+        try:
+            miner_ids = {int(s['miner_id']) for s in scenarios}
+        except (KeyError, TypeError, ValueError):
+            return jsonify({'error': 'Every scenario needs a numeric miner_id'}), 400
+        miners_by_id = {m.id: m for m in Miner.query.filter(Miner.id.in_(miner_ids)).all()}
+        missing = sorted(miner_ids - miners_by_id.keys())
+        if missing:
+            return jsonify({'error': f'Miners not found: {missing}'}), 404
+    
+    try:
+        hashrates = []
+        durations = []
+        investments = []
+        for scenario in scenarios:
+            miner = miners_by_id[int(scenario['miner_id'])]
+            hashrates.append(float(scenario.get('hashrate', miner.hashrate_th)))
+            durations.append(int(scenario.get('duration_days', default_duration)))
+            investments.append(float(scenario.get('investment_usd', miner.price_usd)))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'hashrate, duration_days and investment_usd must be numeric'}), 400
+    if any(duration < 1 or duration > 3650 for duration in durations):
+        return jsonify({'error': 'Duration must be between 1 and 3650 days'}), 400
+    if any(not math.isfinite(hashrate) or hashrate <= 0 for hashrate in hashrates):
+        return jsonify({'error': 'hashrate must be positive'}), 400
+    
+    try:
+        market = get_market_snapshot()
+        btc_price = market['btc_price']
+        network_hashrate = market['network_hashrate_th']
+        market_age = max(market['age_seconds']['btc_price'], market['age_seconds']['network_hashrate'])
+        
+        estimates = estimate_earnings_batch(hashrates, durations, investments, network_hashrate, btc_price)
+        for scenario, estimate in zip(scenarios, estimates):
+            estimate['miner_id'] = int(scenario['miner_id'])
+        
+        current_app.logger.info(f'Batch estimation computed for {len(estimates)} scenarios')
+        return jsonify({
+            'btc_price': btc_price,
+            'network_hashrate_th': network_hashrate,
+            'market_data_age_seconds': market_age,
+            'estimates': estimates
+        }), 200
+    except Exception as e:
+        current_app.logger.error(f'Error estimating batch profit: {str(e)}', exc_info=True)
+        return jsonify({'error': str(e)}), 500
+
 @bp.route('/', methods=['POST'])
 @jwt_required()
 def create_miner():
     user_id = int(get_jwt_identity())
     current_app.logger.info(f'=== Create Miner Request by User ID: {user_id} ===')
-    user = User.query.get(user_id)
-    
-    if not user or not user.is_admin:
+    if not current_user_is_admin():
         current_app.logger.warning(f'Create miner denied: User {user_id} lacks admin privileges')
         return jsonify({'error': 'Admin access required'}), 403
     
@@ -99,6 +276,7 @@ def create_miner():
     )
     
     db.session.add(miner)
+    bump(miners_total=1)
     db.session.commit()
     current_app.logger.info(f'Miner created: {miner.name} (ID: {miner.id})')
     
@@ -109,9 +287,7 @@ def create_miner():
 def update_miner(miner_id):
     user_id = int(get_jwt_identity())
     current_app.logger.info(f'=== Update Miner Request (ID: {miner_id}) by User: {user_id} ===')
-    user = User.query.get(user_id)
-    
-    if not user or not user.is_admin:
+    if not current_user_is_admin():
         current_app.logger.warning(f'Update miner denied: User {user_id} lacks admin privileges')
         return jsonify({'error': 'Admin access required'}), 403
     
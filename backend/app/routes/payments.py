@@ -1,10 +1,16 @@
 import logging
 import secrets
-from datetime import datetime, timedelta
+from datetime import datetime
 from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy.exc import IntegrityError
 from app import db
-from app.models import Payment, Rental, Miner, User, Referral, Payout
+from app.models import Payment, Rental, Miner, WebhookEvent
+from app.jobs.queue import dispatch, enqueue
+from app.utils.inventory import reserve_unit
+from app.utils.pagination import USER_MAX_PAGE_SIZE, USER_PAGE_SIZE, cursor_headers, keyset_page
+from app.utils.stats_rollup import bump, payment_status_deltas
+from app.utils.serializers import PAYMENT_SCHEMA
 
 bp = Blueprint('payments', __name__, url_prefix='/api/payments')
 
@@ -31,6 +37,7 @@ def checkout():
     if not miner:
         return jsonify({'error': 'Miner not found'}), 404
     
+    # Cheap early exit; the conditional UPDATE in reserve_unit is what prevents overselling
     if miner.available_units <= 0:
         return jsonify({'error': 'No units available for this miner'}), 400
     
@@ -58,6 +65,11 @@ def checkout():
     db.session.add(rental)
     db.session.flush()
     
+    if not reserve_unit(miner.id, rental.id, current_app.config['RESERVATION_TTL_SECONDS']):
+        db.session.rollback()
+        current_app.logger.info(f'Checkout rejected: miner {miner_id} sold out')
+        return jsonify({'error': 'No units available for this miner'}), 400
+    
     payment = Payment(
         user_id=user_id,
         rental_id=rental.id,
@@ -66,6 +78,7 @@ def checkout():
         status='pending'
     )
     db.session.add(payment)
+    bump(rentals_total=1, rentals_inactive=1, payments_total=1, payments_pending=1)
     db.session.commit()
     
     current_app.logger.info(f'Checkout completed: Rental ID={rental.id}, Payment ID={payment.id}, Amount=${total_price:.2f}')
@@ -95,61 +108,20 @@ def simulate_payment_confirm(payment_id):
     if payment.status == 'confirmed':
         return jsonify({'error': 'Payment already confirmed'}), 400
     
+    deltas = payment_status_deltas(payment.status, 'confirmed', payment.amount_usd)
     payment.status = 'confirmed'
     payment.confirmed_at = datetime.utcnow()
     payment.tx_hash = f'sim_{secrets.token_hex(32)}'
     
-    if payment.rental_id:
-        rental = Rental.query.get(payment.rental_id)
-        if rental:
-            rental.is_active = True
-            rental.start_date = datetime.utcnow()
-            rental.end_date = rental.start_date + timedelta(days=rental.duration_days)
-            
-            miner = Miner.query.get(rental.miner_id)
-            if miner and miner.available_units > 0:
-                miner.available_units -= 1
-            
-            rental_user = User.query.get(rental.user_id)
-            if rental_user and rental_user.referred_by:
-                referral_percent = current_app.config.get('REFERRAL_PERCENT', 3.0)
-                if miner:
-                    commission_amount = (payment.amount_usd * referral_percent) / 100
-                    
-                    referral = Referral.query.filter_by(
-                        referrer_id=rental_user.referred_by,
-                        referred_id=rental_user.id
-                    ).first()
-                    
-                    if not referral:
-                        referral = Referral(
-                            referrer_id=rental_user.referred_by,
-                            referred_id=rental_user.id,
-                            commission_earned_usd=0.0
-                        )
-                        db.session.add(referral)
-                        db.session.flush()
-                        current_app.logger.info(f'Created new referral record for referrer {rental_user.referred_by}')
-                    
-                    referral.commission_earned_usd += commission_amount
-                    
-                    payout = Payout(
-                        user_id=rental_user.referred_by,
-                        referral_id=referral.id,
-                        rental_id=rental.id,
-                        amount_usd=commission_amount,
-                        payout_type='referral_commission',
-                        status='pending'
-                    )
-                    db.session.add(payout)
-                    current_app.logger.info(f'Referral commission credited: ${commission_amount:.2f} to user {rental_user.referred_by}')
-            
-            current_app.logger.info(f'Rental activated: ID={rental.id}')
-    
+    # Activation, the unit hold and the referral payout run on the job queue
+    job = enqueue('activate_rental', rental_id=payment.rental_id, payment_id=payment.id) if payment.rental_id else None
+    bump(**deltas)
     db.session.commit()
+    if job:
+        dispatch(job)
     
     return jsonify({
-        'message': 'Payment confirmed and rental activated',
+        'message': 'Payment confirmed, rental activation queued',
         'payment': payment.to_dict()
     }), 200
 
@@ -170,6 +142,7 @@ def create_payment():
     )
     
     db.session.add(payment)
+    bump(payments_total=1, payments_pending=1)
     db.session.commit()
     current_app.logger.info(f'Payment created: ID={payment.id}, Amount=${payment.amount_usd}, Type={payment.crypto_type}')
     
@@ -180,10 +153,14 @@ def create_payment():
 def get_user_payments():
     user_id = int(get_jwt_identity())
     current_app.logger.debug(f'Fetching payments for user ID: {user_id}')
-    payments = Payment.query.filter_by(user_id=user_id).all()
+    query = PAYMENT_SCHEMA.query().filter(Payment.user_id == user_id)
+    try:
+        payments, next_cursor = keyset_page(query, Payment, request.args, USER_PAGE_SIZE, USER_MAX_PAGE_SIZE)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     current_app.logger.info(f'Retrieved {len(payments)} payments for user {user_id}')
     
-    return jsonify([payment.to_dict() for payment in payments]), 200
+    return jsonify(PAYMENT_SCHEMA.encode(payments)), 200, cursor_headers(next_cursor)
 
 @bp.route('/<int:payment_id>', methods=['GET'])
 @jwt_required()
@@ -206,27 +183,28 @@ def get_payment(payment_id):
 @bp.route('/webhook', methods=['POST'])
 def payment_webhook():
     current_app.logger.info('=== Payment Webhook Received ===')
-    data = request.get_json()
+    data = request.get_json(silent=True) or {}
     
     tx_hash = data.get('tx_hash')
     status = data.get('status')
     current_app.logger.debug(f'Webhook data: tx_hash={tx_hash}, status={status}')
     
-    payment = Payment.query.filter_by(tx_hash=tx_hash).first()
-    
-    if payment and status == 'confirmed':
-        current_app.logger.info(f'Payment confirmed: ID={payment.id}, tx_hash={tx_hash}')
-        payment.status = 'confirmed'
-        payment.confirmed_at = db.func.now()
-        
-        if payment.rental_id:
-            rental = Rental.query.get(payment.rental_id)
-            if rental:
-                rental.is_active = True
-                current_app.logger.info(f'Rental activated via webhook: Rental ID={rental.id}')
-        
+    if not isinstance(tx_hash, str) or not isinstance(status, str) or not tx_hash or len(tx_hash) > 256 or len(status) > 20:
+        return jsonify({'error': 'tx_hash and status are required'}), 400
+    
+    # Providers that do not send an event id retry with the same body, so (tx_hash, status) dedupes those
+    event_id = str(data.get('event_id') or request.headers.get('X-Webhook-Event-Id') or f'{tx_hash}:{status}')[:300]
+    db.session.add(WebhookEvent(
+        event_id=event_id,
+        tx_hash=tx_hash,
+        status=status,
+        payload=request.get_data(as_text=True)
+    ))
+    try:
         db.session.commit()
-    else:
-        current_app.logger.warning(f'Webhook ignored: Payment not found or status is {status}')
+    except IntegrityError:
+        db.session.rollback()
+        current_app.logger.info(f'Duplicate webhook event ignored: {event_id}')
+        return jsonify({'message': 'Webhook received', 'duplicate': True}), 200
     
     return jsonify({'message': 'Webhook received'}), 200
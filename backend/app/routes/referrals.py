@@ -2,8 +2,11 @@ import logging
 from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
+from sqlalchemy.orm import joinedload
 from app import db
 from app.models import User, Referral, Payout
+from app.utils.pagination import USER_MAX_PAGE_SIZE, USER_PAGE_SIZE, cursor_headers, keyset_page
+from app.utils.serializers import PAYOUT_SCHEMA
 
 bp = Blueprint('referrals', __name__, url_prefix='/api/referrals')
 
@@ -12,11 +15,11 @@ bp = Blueprint('referrals', __name__, url_prefix='/api/referrals')
 def get_referrals():
     user_id = int(get_jwt_identity())
     current_app.logger.debug(f'Fetching referrals for user ID: {user_id}')
-    referrals = Referral.query.filter_by(referrer_id=user_id).all()
+    referrals = Referral.query.options(joinedload(Referral.referred)).filter_by(referrer_id=user_id).all()
     
     result = []
     for ref in referrals:
-        referred_user = User.query.get(ref.referred_id)
+        referred_user = ref.referred
         result.append({
             **ref.to_dict(),
             'referred_email': referred_user.email if referred_user else None
@@ -61,7 +64,11 @@ def get_user_payouts():
     user_id = int(get_jwt_identity())
     current_app.logger.debug(f'Fetching payouts for user ID: {user_id}')
     
-    payouts = Payout.query.filter_by(user_id=user_id).order_by(Payout.created_at.desc()).all()
+    query = PAYOUT_SCHEMA.query().filter(Payout.user_id == user_id)
+    try:
+        payouts, next_cursor = keyset_page(query, Payout, request.args, USER_PAGE_SIZE, USER_MAX_PAGE_SIZE)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
     current_app.logger.info(f'Retrieved {len(payouts)} payouts for user {user_id}')
-    return jsonify([payout.to_dict() for payout in payouts]), 200
+    return jsonify(PAYOUT_SCHEMA.encode(payouts)), 200, cursor_headers(next_cursor)
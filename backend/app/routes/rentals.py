@@ -1,9 +1,14 @@
 import logging
 from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from datetime import datetime, timedelta
 from app import db
-from app.models import Rental, Miner, User, Referral, Payout
+from app.models import Rental, Miner
+from app.jobs.queue import dispatch, enqueue
+from app.utils.roles import current_user_is_admin
+from app.utils.pagination import USER_MAX_PAGE_SIZE, USER_PAGE_SIZE, cursor_headers, keyset_page
+from app.utils.stats_rollup import bump
+from app.utils.serializers import RENTAL_SCHEMA
+from app.utils.earnings_history import parse_day_range, rental_earnings, daily_totals, monthly_rollup
 
 bp = Blueprint('rentals', __name__, url_prefix='/api/rentals')
 
@@ -33,6 +38,7 @@ def create_rental():
     )
     
     db.session.add(rental)
+    bump(rentals_total=1, rentals_inactive=1)
     db.session.commit()
     current_app.logger.info(f'Rental created (ID: {rental.id}) for user {user_id}')
     
@@ -43,10 +49,58 @@ def create_rental():
 def get_user_rentals():
     user_id = int(get_jwt_identity())
     current_app.logger.debug(f'Fetching rentals for user ID: {user_id}')
-    rentals = Rental.query.filter_by(user_id=user_id).all()
+    query = RENTAL_SCHEMA.query().filter(Rental.user_id == user_id)
+    try:
+        rentals, next_cursor = keyset_page(query, Rental, request.args, USER_PAGE_SIZE, USER_MAX_PAGE_SIZE)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     current_app.logger.info(f'Retrieved {len(rentals)} rentals for user {user_id}')
     
-    return jsonify([rental.to_dict() for rental in rentals]), 200
+    return jsonify(RENTAL_SCHEMA.encode(rentals)), 200, cursor_headers(next_cursor)
+
+@bp.route('/earnings/history', methods=['GET'])
+@jwt_required()
+def get_earnings_history():
+    user_id = int(get_jwt_identity())
+    current_app.logger.debug(f'Fetching earnings history for user ID: {user_id}')
+    try:
+        start, end = parse_day_range(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    days = daily_totals(user_id, start, end)
+    return jsonify({
+        'daily': days,
+        'monthly': monthly_rollup(days),
+        'total_btc': sum(d['btc'] for d in days),
+        'total_usd': sum(d['usd'] for d in days)
+    }), 200
+
+@bp.route('/<int:rental_id>/earnings', methods=['GET'])
+@jwt_required()
+def get_rental_earnings(rental_id):
+    user_id = int(get_jwt_identity())
+    rental = Rental.query.get(rental_id)
+    
+    if not rental:
+        return jsonify({'error': 'Rental not found'}), 404
+    
+    if rental.user_id != user_id:
+        current_app.logger.warning(f'Unauthorized earnings access attempt: User {user_id} tried to access rental {rental_id}')
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    try:
+        start, end = parse_day_range(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    entries = rental_earnings(rental_id, start, end)
+    return jsonify({
+        'rental_id': rental_id,
+        'entries': [entry.to_dict() for entry in entries],
+        'total_btc': sum(entry.btc for entry in entries),
+        'total_usd': sum(entry.usd_at_price for entry in entries)
+    }), 200
 
 @bp.route('/<int:rental_id>', methods=['GET'])
 @jwt_required()
@@ -71,49 +125,23 @@ def get_rental(rental_id):
 def activate_rental(rental_id):
     user_id = int(get_jwt_identity())
     current_app.logger.info(f'=== Activate Rental Request: ID {rental_id} by User {user_id} ===')
-    user = User.query.get(user_id)
-    
     rental = Rental.query.get(rental_id)
     
     if not rental:
         current_app.logger.warning(f'Activation failed: Rental ID {rental_id} not found')
         return jsonify({'error': 'Rental not found'}), 404
     
-    if rental.user_id != user_id and not user.is_admin:
+    if rental.user_id != user_id and not current_user_is_admin():
         current_app.logger.warning(f'Unauthorized activation attempt: User {user_id} tried to activate rental {rental_id}')
         return jsonify({'error': 'Unauthorized'}), 403
     
-    rental.is_active = True
-    rental.start_date = datetime.utcnow()
-    rental.end_date = rental.start_date + timedelta(days=rental.duration_days)
-    
-    rental_user = User.query.get(rental.user_id)
-    if rental_user and rental_user.referred_by:
-        referral_percent = current_app.config.get('REFERRAL_PERCENT', 3.0)
-        miner = Miner.query.get(rental.miner_id)
-        if miner:
-            commission_amount = (miner.price_usd * referral_percent) / 100
-            
-            referral = Referral.query.filter_by(
-                referrer_id=rental_user.referred_by,
-                referred_id=rental_user.id
-            ).first()
-            
-            if referral:
-                referral.commission_earned_usd += commission_amount
-                
-                payout = Payout(
-                    user_id=rental_user.referred_by,
-                    referral_id=referral.id,
-                    rental_id=rental.id,
-                    amount_usd=commission_amount,
-                    payout_type='referral_commission',
-                    status='pending'
-                )
-                db.session.add(payout)
-                current_app.logger.info(f'Referral commission credited: ${commission_amount:.2f} to user {rental_user.referred_by}')
-    
+    job = enqueue('activate_rental', rental_id=rental.id)
     db.session.commit()
-    current_app.logger.info(f'Rental activated: ID {rental_id}, Start: {rental.start_date}, End: {rental.end_date}')
-    
-    return jsonify(rental.to_dict()), 200
+    dispatch(job)
+    current_app.logger.info(f'Rental activation queued: ID {rental_id}, Job {job.id}')
+    
+    return jsonify({
+        'message': 'Rental activation queued',
+        'job_id': job.id,
+        'rental': rental.to_dict()
+    }), 202
@@ -1,12 +1,47 @@
-import requests
 import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
-from threading import Lock
+from threading import Lock, Thread
+from app.utils.http_client import http_get
+from app.utils.market_cache import MarketDataCache, create_cache_backend
 
 logger = logging.getLogger(__name__)
 
-cache = {}
+cache = MarketDataCache()
 CACHE_DURATION = timedelta(minutes=10)
+SINGLE_FLIGHT_WAIT = 12
+SINGLE_FLIGHT_POLL_INTERVAL = 0.1
+REFRESH_AHEAD = timedelta(minutes=2)
+CONCURRENT_FETCH = True
+PRICE_HEDGE_DELAY = 0.5
+
+_inflight_refreshes = set()
+_inflight_lock = Lock()
+_executors = {}
+_executors_lock = Lock()
+
+
+def configure_cache(backend_name, path=None):
+    """Swap the backend behind the shared ``cache`` facade (called from create_app)"""
+    cache.backend = create_cache_backend(backend_name, path)
+    logger.info(f'Market data cache backend: {backend_name}')
+
+def configure_fetching(concurrent=True, hedge_delay=0.5):
+    global CONCURRENT_FETCH, PRICE_HEDGE_DELAY
+    CONCURRENT_FETCH = concurrent
+    PRICE_HEDGE_DELAY = hedge_delay
+
+def _get_executor(name, max_workers):
+    """Per-process pools; metrics and price sources get separate pools so nested waits cannot deadlock"""
+    key = (name, os.getpid())
+    with _executors_lock:
+        executor = _executors.get(key)
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f'market-{name}')
+            _executors[key] = executor
+        return executor
 
 class CircuitBreaker:
     def __init__(self, name, failure_threshold=5, recovery_timeout=60, half_open_max_calls=3):
@@ -82,23 +117,74 @@ circuit_breakers = {
 FALLBACK_VALUES = {
     'btc_price': 50000.0,
     'network_hashrate': 500_000_000.0,
-    'difficulty': {'difficulty': 50_000_000_000_000, 'adjustment': 0}
+    'difficulty': {'difficulty': 50_000_000_000_000, 'adjustment': 0},
+    'block_height': 870_000
 }
 
-def get_cached_or_fetch(key, fetch_func):
-    now = datetime.utcnow()
+def _entry_age(entry):
+    return (datetime.utcnow() - entry[1]).total_seconds()
+
+def refresh_key(key, fetch_func, max_age=None):
+    """Refresh ``key`` if this caller wins the single-flight lock; returns True if it did"""
+    with cache.single_flight(key) as leader:
+        if not leader:
+            return False
+        # Another worker may have refreshed the key just before we got the lock
+        entry = cache.get(key)
+        if max_age is not None and entry is not None and _entry_age(entry) < max_age:
+            return False
+        data = fetch_func()
+        cache[key] = (data, datetime.utcnow())
+        return True
+
+def _refresh_in_background(key, fetch_func):
+    with _inflight_lock:
+        if key in _inflight_refreshes:
+            return
+        _inflight_refreshes.add(key)
+    
+    def run():
+        try:
+            refresh_key(key, fetch_func)
+        except Exception as e:
+            logger.error(f'Background refresh of {key} failed: {e}', exc_info=True)
+        finally:
+            with _inflight_lock:
+                _inflight_refreshes.discard(key)
     
-    if key in cache:
-        cached_data, cached_time = cache[key]
-        if now - cached_time < CACHE_DURATION:
-            age_seconds = (now - cached_time).total_seconds()
+    Thread(target=run, name=f'market-refresh-{key}', daemon=True).start()
+
+def get_cached_with_age(key, fetch_func):
+    """Return ``(data, age_seconds)``, serving stale entries while they revalidate"""
+    entry = cache.get(key)
+    if entry is not None:
+        age_seconds = _entry_age(entry)
+        if age_seconds < CACHE_DURATION.total_seconds():
             logger.debug(f'Cache hit for {key} (age: {age_seconds:.1f}s)')
-            return cached_data
+        else:
+            logger.debug(f'Stale cache hit for {key} (age: {age_seconds:.1f}s), revalidating in background')
+            _refresh_in_background(key, fetch_func)
+        return entry[0], age_seconds
     
     logger.debug(f'Cache miss for {key}, fetching fresh data')
+    if refresh_key(key, fetch_func):
+        return cache[key][0], 0.0
+    
+    # Another worker holds the lock for this cold key, give it a chance to finish
+    deadline = time.monotonic() + SINGLE_FLIGHT_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(SINGLE_FLIGHT_POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry[0], _entry_age(entry)
+    
+    logger.warning(f'Timed out waiting for concurrent refresh of {key}, fetching directly')
     data = fetch_func()
-    cache[key] = (data, now)
-    return data
+    cache[key] = (data, datetime.utcnow())
+    return data, 0.0
+
+def get_cached_or_fetch(key, fetch_func):
+    return get_cached_with_age(key, fetch_func)[0]
 
 def _fetch_from_binance():
     """Fetch BTC price from Binance API (primary source - very high rate limits)"""
@@ -110,7 +196,7 @@ def _fetch_from_binance():
     
     try:
         logger.info('Fetching BTC price from Binance API')
-        response = requests.get(
+        response = http_get(
             'https://api.binance.com/api/v3/ticker/price?symbol=BTCUSDT',
             timeout=10
         )
@@ -141,7 +227,7 @@ def _fetch_from_coinbase():
     
     try:
         logger.info('Fetching BTC price from Coinbase API')
-        response = requests.get(
+        response = http_get(
             'https://api.coinbase.com/v2/prices/BTC-USD/spot',
             timeout=10
         )
@@ -172,7 +258,7 @@ def _fetch_from_coingecko():
     
     try:
         logger.info('Fetching BTC price from CoinGecko API')
-        response = requests.get(
+        response = http_get(
             'https://api.coingecko.com/api/v3/simple/price?ids=bitcoin&vs_currencies=usd',
             timeout=10
         )
@@ -193,116 +279,208 @@ def _fetch_from_coingecko():
         cb.record_failure()
         return None
 
-def get_btc_price():
-    def fetch():
-        price = _fetch_from_coinbase()
-        if price is not None:
-            return price
-        
-        logger.info('Coinbase unavailable, trying Binance...')
-        price = _fetch_from_binance()
-        if price is not None:
-            return price
-        
-        logger.info('Binance unavailable, trying CoinGecko...')
-        price = _fetch_from_coingecko()
+PRICE_SOURCES = [
+    ('Coinbase', _fetch_from_coinbase),
+    ('Binance', _fetch_from_binance),
+    ('CoinGecko', _fetch_from_coingecko)
+]
+
+def _fetch_price_sequential():
+    for name, fetch in PRICE_SOURCES:
+        price = fetch()
         if price is not None:
             return price
-        
-        if 'btc_price' in cache:
-            logger.warning('All APIs failed, using cached BTC price')
-            return cache['btc_price'][0]
-        
-        logger.warning(f'Using fallback BTC price: ${FALLBACK_VALUES["btc_price"]:,.0f}')
-        return FALLBACK_VALUES['btc_price']
+        logger.info(f'{name} unavailable, trying next price source...')
+    return None
+
+def _fetch_price_hedged():
+    """Start the next price source whenever the current one fails or is slower than PRICE_HEDGE_DELAY.
+
+    The first valid answer wins; slower requests are left to finish in the
+    background so their circuit breakers still see the outcome.
+    """
+    executor = _get_executor('sources', max_workers=6)
+    remaining = list(PRICE_SOURCES)
+    pending = set()
+    while remaining or pending:
+        if remaining:
+            name, fetch = remaining.pop(0)
+            logger.debug(f'Requesting BTC price from {name}')
+            pending.add(executor.submit(fetch))
+        done, pending = wait(pending, timeout=PRICE_HEDGE_DELAY if remaining else None, return_when=FIRST_COMPLETED)
+        for future in done:
+            price = future.result()
+            if price is not None:
+                return price
+    return None
+
+def _fetch_btc_price():
+    price = _fetch_price_hedged() if CONCURRENT_FETCH else _fetch_price_sequential()
+    if price is not None:
+        return price
+    
+    if 'btc_price' in cache:
+        logger.warning('All APIs failed, using cached BTC price')
+        return cache['btc_price'][0]
     
-    return get_cached_or_fetch('btc_price', fetch)
+    logger.warning(f'Using fallback BTC price: ${FALLBACK_VALUES["btc_price"]:,.0f}')
+    return FALLBACK_VALUES['btc_price']
 
-def get_network_hashrate():
-    def fetch():
-        cb = circuit_breakers['blockchain_info']
-        
-        if not cb.can_execute():
-            logger.warning(f'Circuit breaker OPEN for Blockchain.info API, using cached/fallback value')
-            if 'network_hashrate' in cache:
-                return cache['network_hashrate'][0]
-            return FALLBACK_VALUES['network_hashrate']
+def _fetch_network_hashrate():
+    cb = circuit_breakers['blockchain_info']
+    
+    if not cb.can_execute():
+        logger.warning(f'Circuit breaker OPEN for Blockchain.info API, using cached/fallback value')
+        if 'network_hashrate' in cache:
+            return cache['network_hashrate'][0]
+        return FALLBACK_VALUES['network_hashrate']
+    
+    try:
+        logger.info('Fetching network hashrate from Blockchain.info')
+        response = http_get('https://blockchain.info/q/hashrate', timeout=10)
         
-        try:
-            logger.info('Fetching network hashrate from Blockchain.info')
-            response = requests.get('https://blockchain.info/q/hashrate', timeout=10)
-            
-            if response.status_code == 429:
-                logger.warning('Blockchain.info API rate limited (429)')
-                cb.record_failure()
-                if 'network_hashrate' in cache:
-                    return cache['network_hashrate'][0]
-                return FALLBACK_VALUES['network_hashrate']
-            
-            response.raise_for_status()
-            hashrate_gh = float(response.text)
-            hashrate_th = hashrate_gh / 1_000
-            logger.info(f'Network hashrate fetched: {hashrate_th:,.0f} TH/s')
-            cb.record_success()
-            return hashrate_th
-        except Exception as e:
-            logger.error(f"Error fetching network hashrate: {e}", exc_info=True)
+        if response.status_code == 429:
+            logger.warning('Blockchain.info API rate limited (429)')
             cb.record_failure()
             if 'network_hashrate' in cache:
-                logger.warning('Using cached network hashrate due to API error')
                 return cache['network_hashrate'][0]
-            logger.warning(f'Using fallback network hashrate: {FALLBACK_VALUES["network_hashrate"]:,.0f} TH/s')
             return FALLBACK_VALUES['network_hashrate']
-    
-    return get_cached_or_fetch('network_hashrate', fetch)
-
-def get_mining_difficulty():
-    def fetch():
-        cb = circuit_breakers['mempool']
         
-        if not cb.can_execute():
-            logger.warning(f'Circuit breaker OPEN for Mempool.space API, using cached/fallback value')
-            if 'difficulty' in cache:
-                return cache['difficulty'][0]
-            return FALLBACK_VALUES['difficulty']
+        response.raise_for_status()
+        hashrate_gh = float(response.text)
+        hashrate_th = hashrate_gh / 1_000
+        logger.info(f'Network hashrate fetched: {hashrate_th:,.0f} TH/s')
+        cb.record_success()
+        return hashrate_th
+    except Exception as e:
+        logger.error(f"Error fetching network hashrate: {e}", exc_info=True)
+        cb.record_failure()
+        if 'network_hashrate' in cache:
+            logger.warning('Using cached network hashrate due to API error')
+            return cache['network_hashrate'][0]
+        logger.warning(f'Using fallback network hashrate: {FALLBACK_VALUES["network_hashrate"]:,.0f} TH/s')
+        return FALLBACK_VALUES['network_hashrate']
+
+def _fetch_mining_difficulty():
+    cb = circuit_breakers['mempool']
+    
+    if not cb.can_execute():
+        logger.warning(f'Circuit breaker OPEN for Mempool.space API, using cached/fallback value')
+        if 'difficulty' in cache:
+            return cache['difficulty'][0]
+        return FALLBACK_VALUES['difficulty']
+    
+    try:
+        logger.info('Fetching mining difficulty from Mempool.space')
+        response = http_get('https://mempool.space/api/v1/mining/hashrate/difficulty', timeout=10)
         
-        try:
-            logger.info('Fetching mining difficulty from Mempool.space')
-            response = requests.get('https://mempool.space/api/v1/mining/hashrate/difficulty', timeout=10)
-            
-            if response.status_code == 429:
-                logger.warning('Mempool.space API rate limited (429)')
-                cb.record_failure()
-                if 'difficulty' in cache:
-                    return cache['difficulty'][0]
-                return FALLBACK_VALUES['difficulty']
-            
-            response.raise_for_status()
-            data = response.json()
-            difficulty_data = {
-                'difficulty': data.get('currentDifficulty', 50_000_000_000_000),
-                'adjustment': data.get('difficultyChange', 0)
-            }
-            logger.info(f'Difficulty fetched: {difficulty_data["difficulty"]:,.0f}, Adjustment: {difficulty_data["adjustment"]}%')
-            cb.record_success()
-            return difficulty_data
-        except Exception as e:
-            logger.error(f"Error fetching difficulty: {e}", exc_info=True)
+        if response.status_code == 429:
+            logger.warning('Mempool.space API rate limited (429)')
             cb.record_failure()
             if 'difficulty' in cache:
-                logger.warning('Using cached difficulty due to API error')
                 return cache['difficulty'][0]
-            logger.warning('Using fallback difficulty values')
             return FALLBACK_VALUES['difficulty']
+        
+        response.raise_for_status()
+        data = response.json()
+        difficulty_data = {
+            'difficulty': data.get('currentDifficulty', 50_000_000_000_000),
+            'adjustment': data.get('difficultyChange', 0)
+        }
+        logger.info(f'Difficulty fetched: {difficulty_data["difficulty"]:,.0f}, Adjustment: {difficulty_data["adjustment"]}%')
+        cb.record_success()
+        return difficulty_data
+    except Exception as e:
+        logger.error(f"Error fetching difficulty: {e}", exc_info=True)
+        cb.record_failure()
+        if 'difficulty' in cache:
+            logger.warning('Using cached difficulty due to API error')
+            return cache['difficulty'][0]
+        logger.warning('Using fallback difficulty values')
+        return FALLBACK_VALUES['difficulty']
+
+def _fetch_block_height():
+    cb = circuit_breakers['mempool']
     
-    return get_cached_or_fetch('difficulty', fetch)
+    if not cb.can_execute():
+        logger.warning('Circuit breaker OPEN for Mempool.space API, using cached/fallback block height')
+        if 'block_height' in cache:
+            return cache['block_height'][0]
+        return FALLBACK_VALUES['block_height']
+    
+    try:
+        logger.info('Fetching block height from Mempool.space')
+        response = http_get('https://mempool.space/api/blocks/tip/height', timeout=10)
+        
+        if response.status_code == 429:
+            logger.warning('Mempool.space API rate limited (429)')
+            cb.record_failure()
+            if 'block_height' in cache:
+                return cache['block_height'][0]
+            return FALLBACK_VALUES['block_height']
+        
+        response.raise_for_status()
+        height = int(response.text)
+        logger.info(f'Block height fetched: {height:,}')
+        cb.record_success()
+        return height
+    except Exception as e:
+        logger.error(f"Error fetching block height: {e}", exc_info=True)
+        cb.record_failure()
+        if 'block_height' in cache:
+            logger.warning('Using cached block height due to API error')
+            return cache['block_height'][0]
+        logger.warning(f'Using fallback block height: {FALLBACK_VALUES["block_height"]:,}')
+        return FALLBACK_VALUES['block_height']
 
-def get_network_stats():
+MARKET_DATA_SOURCES = {
+    'btc_price': _fetch_btc_price,
+    'network_hashrate': _fetch_network_hashrate,
+    'difficulty': _fetch_mining_difficulty,
+    'block_height': _fetch_block_height
+}
+
+def get_btc_price():
+    return get_cached_or_fetch('btc_price', _fetch_btc_price)
+
+def get_network_hashrate():
+    return get_cached_or_fetch('network_hashrate', _fetch_network_hashrate)
+
+def get_mining_difficulty():
+    return get_cached_or_fetch('difficulty', _fetch_mining_difficulty)
+
+def get_block_height():
+    return get_cached_or_fetch('block_height', _fetch_block_height)
+
+def get_market_snapshot():
+    """Last good value of every market metric plus how old each one is"""
+    snapshot = {}
+    ages = {}
+    misses = []
+    for key, fetch_func in MARKET_DATA_SOURCES.items():
+        if key in cache:
+            snapshot[key], ages[key] = get_cached_with_age(key, fetch_func)
+        else:
+            misses.append(key)
+    
+    if len(misses) > 1 and CONCURRENT_FETCH:
+        executor = _get_executor('metrics', max_workers=len(MARKET_DATA_SOURCES))
+        futures = {key: executor.submit(get_cached_with_age, key, MARKET_DATA_SOURCES[key]) for key in misses}
+        for key, future in futures.items():
+            snapshot[key], ages[key] = future.result()
+    else:
+        for key in misses:
+            snapshot[key], ages[key] = get_cached_with_age(key, MARKET_DATA_SOURCES[key])
     return {
-        'btc_price': get_btc_price(),
-        'network_hashrate_th': get_network_hashrate(),
-        'difficulty': get_mining_difficulty()
+        'btc_price': snapshot['btc_price'],
+        'network_hashrate_th': snapshot['network_hashrate'],
+        'difficulty': snapshot['difficulty'],
+        'block_height': snapshot.get('block_height'),
+        'age_seconds': {key: round(age, 1) for key, age in ages.items()}
     }
 
+def get_network_stats():
+    return get_market_snapshot()
+
 def get_circuit_breaker_status():
     return {name: cb.get_state() for name, cb in circuit_breakers.items()}
@@ -0,0 +1,245 @@
+import csv
+import json
+import logging
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import islice
+from sqlalchemy import (Boolean, Column, Date, DateTime, Float, Integer, MetaData, String, Table, func, insert,
+                        literal, select, update)
+from app import db
+from app.models import Payment, Referral, Rental, User
+from app.utils.referral_codes import encode_referral_codes, reserve_user_ids
+
+logger = logging.getLogger(__name__)
+
+IMPORT_BATCH_SIZE = 10000
+
+# Columns read from the input; rentals and payments may give ``user_email`` instead of ``user_id``
+IMPORTS = {
+    'users': (User, ('email', 'password_hash', 'referral_code', 'is_admin', 'created_at')),
+    'rentals': (Rental, ('user_id', 'miner_id', 'hashrate_allocated', 'duration_days', 'start_date', 'end_date',
+                         'is_active', 'total_profit_btc', 'monthly_fee_usd', 'created_at')),
+    'payments': (Payment, ('user_id', 'rental_id', 'amount_usd', 'crypto_type', 'tx_hash', 'status',
+                           'confirmed_at', 'created_at'))
+}
+
+TRUE_VALUES = {'1', 'true', 't', 'yes', 'y'}
+
+
+def _converter(column):
+    kind = column.type
+    if isinstance(kind, Boolean):
+        return lambda value: value if isinstance(value, bool) else str(value).strip().lower() in TRUE_VALUES
+    if isinstance(kind, DateTime):
+        return lambda value: value if isinstance(value, datetime) else datetime.fromisoformat(value)
+    if isinstance(kind, Date):
+        return lambda value: datetime.fromisoformat(value).date()
+    if isinstance(kind, Integer):
+        return int
+    if isinstance(kind, Float):
+        return float
+    return str
+
+
+def _default(column, now):
+    if column.default is None:
+        return None
+    return now if column.default.is_callable else column.default.arg
+
+
+def read_records(stream, fmt):
+    """Yield one dict per input record; CSV values are strings, NDJSON values keep their JSON types"""
+    if fmt == 'csv':
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+def _batches(records, batch_size):
+    records = iter(records)
+    while batch := list(islice(records, batch_size)):
+        yield batch
+
+
+class _RowBuilder:
+    """Turns raw records into tuples in the order of ``columns``, applying column defaults"""
+
+    def __init__(self, table, columns):
+        self.columns = columns
+        self.table_columns = [table.c[name] for name in columns]
+        self.converters = [_converter(column) for column in self.table_columns]
+
+    def build(self, records):
+        now = datetime.utcnow()
+        defaults = [_default(column, now) for column in self.table_columns]
+        rows = []
+        for record in records:
+            row = []
+            for name, convert, default in zip(self.columns, self.converters, defaults):
+                value = record.get(name)
+                row.append(default if value is None or value == '' else convert(value))
+            rows.append(row)
+        return rows
+
+
+def _write_rows(conn, table, columns, rows):
+    """COPY FROM STDIN on PostgreSQL, one executemany INSERT on SQLite"""
+    if not rows:
+        return
+    if conn.dialect.name == 'postgresql':
+        cursor = conn.connection.driver_connection.cursor()
+        with cursor.copy(f'COPY {table.name} ({", ".join(columns)}) FROM STDIN') as copy:
+            for row in rows:
+                copy.write_row(row)
+        return
+    # Straight to the driver's executemany: skips building and re-binding a dict per row
+    processors = [table.c[name].type.bind_processor(conn.dialect) for name in columns]
+    for position, process in enumerate(processors):
+        if process:
+            for row in rows:
+                row[position] = process(row[position])
+    placeholders = ', '.join('?' * len(columns))
+    conn.exec_driver_sql(f'INSERT INTO {table.name} ({", ".join(columns)}) VALUES ({placeholders})', list(map(tuple, rows)))
+
+
+@contextmanager
+def deferred_indexes(conn, table, enabled=True):
+    """Drop the table's non-unique indexes for the duration of a load and rebuild them afterwards.
+
+    Unique indexes stay in place so duplicates are still rejected row by row.
+    Only use this while nothing else is querying the table.
+    """
+    indexes = [index for index in table.indexes if not index.unique] if enabled else []
+    for index in indexes:
+        index.drop(conn)
+    conn.commit()
+    try:
+        yield
+    finally:
+        conn.rollback()
+        for index in indexes:
+            index.create(conn)
+        conn.commit()
+        if indexes:
+            logger.info(f'Rebuilt {len(indexes)} indexes on {table.name}')
+
+
+def _user_ids_by_email(conn, records):
+    emails = {record['user_email'] for record in records if not record.get('user_id') and record.get('user_email')}
+    if not emails:
+        return {}
+    users = User.__table__
+    return dict(conn.execute(select(users.c.email, users.c.id).where(users.c.email.in_(emails))).all())
+
+
+def _resolve_users(conn, records):
+    """Fill ``user_id`` from ``user_email`` with one lookup per batch"""
+    ids = _user_ids_by_email(conn, records)
+    for record in records:
+        if not record.get('user_id'):
+            email = record.get('user_email')
+            if email not in ids:
+                raise ValueError(f'Unknown user {email!r}')
+            record['user_id'] = ids[email]
+
+
+def _next_user_ids(conn, count):
+    ids = reserve_user_ids(count, bind=conn)
+    if ids is not None:
+        return ids
+    # No sequence to draw from: continue after the current maximum (the import must be the only writer)
+    start = conn.execute(select(func.coalesce(func.max(User.__table__.c.id), 0))).scalar_one() + 1
+    return range(start, start + count)
+
+
+def _write_users(conn, builder, staging, records):
+    rows = builder.build(records)
+    ids = list(_next_user_ids(conn, len(rows)))
+    code_index = builder.columns.index('referral_code')
+    missing = [position for position, row in enumerate(rows) if row[code_index] is None]
+    for position, code in zip(missing, encode_referral_codes([ids[position] for position in missing])):
+        rows[position][code_index] = code
+    _write_rows(conn, User.__table__, ('id',) + builder.columns,
+                [[user_id] + row for user_id, row in zip(ids, rows)])
+    _write_rows(conn, staging, ('user_id', 'referrer_code'), [
+        [user_id, record['referrer_code']] for user_id, record in zip(ids, records) if record.get('referrer_code')
+    ])
+
+
+def _referrer_staging(conn):
+    staging = Table(
+        'import_referrer_codes', MetaData(),
+        Column('user_id', Integer, primary_key=True),
+        Column('referrer_code', String(20), nullable=False),
+        prefixes=['TEMPORARY']
+    )
+    staging.create(conn)
+    return staging
+
+
+def _link_referrers(conn, staging):
+    """Second, set-based pass: resolve staged referrer codes to ``referred_by`` and referral rows"""
+    users = User.__table__
+    referrer = users.alias('referrer')
+    resolved = (
+        select(referrer.c.id)
+        .select_from(staging.join(referrer, referrer.c.referral_code == staging.c.referrer_code))
+        .where(staging.c.user_id == users.c.id, referrer.c.id != users.c.id)
+        .scalar_subquery()
+    )
+    staged = conn.execute(
+        update(users).where(users.c.id.in_(select(staging.c.user_id))).values(referred_by=resolved)
+    ).rowcount
+    linked = conn.execute(
+        insert(Referral.__table__).from_select(
+            ['referrer_id', 'referred_id', 'commission_earned_usd', 'created_at'],
+            select(users.c.referred_by, users.c.id, literal(0.0), users.c.created_at)
+            .select_from(users.join(staging, staging.c.user_id == users.c.id))
+            .where(users.c.referred_by.is_not(None))
+        )
+    ).rowcount
+    logger.info(f'Linked {linked} of {staged} imported users to their referrers')
+    return linked
+
+
+def import_records(entity, records, batch_size=IMPORT_BATCH_SIZE, defer_indexes=False, on_progress=None):
+    """Load ``records`` into ``entity``'s table in batches, committing once per batch.
+
+    Users get ids up front (from the sequence on PostgreSQL) so referral
+    codes are written with the row; a supplied ``referral_code`` is kept
+    as-is. ``referrer_code`` values are staged and resolved in one pass once
+    every batch is in, so referrers may appear anywhere in the input.
+    ``defer_indexes`` drops the table's non-unique indexes for the load;
+    only for a database nothing else is using. Returns ``(rows imported, referrers linked)``.
+    """
+    model, columns = IMPORTS[entity]
+    table = model.__table__
+    builder = _RowBuilder(table, columns)
+    imported = linked = 0
+    with db.engine.connect() as conn:
+        staging = _referrer_staging(conn) if entity == 'users' else None
+        try:
+            with deferred_indexes(conn, table, defer_indexes):
+                for batch in _batches(records, batch_size):
+                    if entity == 'users':
+                        _write_users(conn, builder, staging, batch)
+                    else:
+                        _resolve_users(conn, batch)
+                        _write_rows(conn, table, columns, builder.build(batch))
+                    conn.commit()
+                    imported += len(batch)
+                    if on_progress:
+                        on_progress(imported)
+                if staging is not None:
+                    linked = _link_referrers(conn, staging)
+                    conn.commit()
+        finally:
+            # Temporary tables live as long as the pooled connection, not the checkout
+            if staging is not None:
+                conn.rollback()
+                staging.drop(conn)
+                conn.commit()
+    logger.info(f'Imported {imported} {entity} rows')
+    return imported, linked
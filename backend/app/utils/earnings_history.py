@@ -0,0 +1,81 @@
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy import func, select
+from app import db
+from app.models import EarningsLedger, Rental
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REPORT_DAYS = 90
+MAX_REPORT_DAYS = 366
+
+
+def parse_day_range(args):
+    """Read optional ``from``/``to`` (YYYY-MM-DD) query args; raises ValueError on bad input"""
+    start = args.get('from')
+    end = args.get('to')
+    start = datetime.strptime(start, '%Y-%m-%d').date() if start else None
+    end = datetime.strptime(end, '%Y-%m-%d').date() if end else None
+    if start and end and start > end:
+        raise ValueError('from must not be after to')
+    return start, end
+
+
+def report_day_range(start, end, default_days=DEFAULT_REPORT_DAYS, max_days=MAX_REPORT_DAYS):
+    """Bound a network-wide report: ``to`` defaults to today, ``from`` to ``default_days`` before it.
+
+    Raises ValueError for a range longer than ``max_days`` so one request never sums the whole ledger.
+    """
+    end = end or datetime.utcnow().date()
+    start = start or end - timedelta(days=default_days - 1)
+    if start > end:
+        raise ValueError('from must not be after to')
+    if (end - start).days + 1 > max_days:
+        raise ValueError(f'Date range must not exceed {max_days} days')
+    return start, end
+
+
+def _bounded(stmt, start, end):
+    if start:
+        stmt = stmt.where(EarningsLedger.day >= start)
+    if end:
+        stmt = stmt.where(EarningsLedger.day <= end)
+    return stmt
+
+
+def rental_earnings(rental_id, start=None, end=None):
+    """Ledger rows for one rental, served straight off the (rental_id, day) primary key"""
+    stmt = _bounded(
+        select(EarningsLedger).where(EarningsLedger.rental_id == rental_id),
+        start, end
+    ).order_by(EarningsLedger.day)
+    return db.session.execute(stmt).scalars().all()
+
+
+def daily_totals(user_id=None, start=None, end=None):
+    """Per-day sums across a user's rentals (or all rentals when ``user_id`` is None)"""
+    stmt = select(
+        EarningsLedger.day,
+        func.sum(EarningsLedger.btc),
+        func.sum(EarningsLedger.usd_at_price),
+        func.count()
+    )
+    if user_id is not None:
+        stmt = stmt.join(Rental, Rental.id == EarningsLedger.rental_id).where(Rental.user_id == user_id)
+    stmt = _bounded(stmt, start, end).group_by(EarningsLedger.day).order_by(EarningsLedger.day)
+    return [
+        {'day': day.isoformat(), 'btc': btc, 'usd': usd, 'rentals': rentals}
+        for day, btc, usd, rentals in db.session.execute(stmt)
+    ]
+
+
+def monthly_rollup(days):
+    """Fold daily totals (already ordered by day) into calendar months"""
+    months = []
+    for entry in days:
+        month = entry['day'][:7]
+        if not months or months[-1]['month'] != month:
+            months.append({'month': month, 'btc': 0.0, 'usd': 0.0})
+        months[-1]['btc'] += entry['btc']
+        months[-1]['usd'] += entry['usd']
+    return months
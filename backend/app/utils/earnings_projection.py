@@ -0,0 +1,118 @@
+import logging
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+def block_reward_at(height):
+    return Config.INITIAL_BLOCK_REWARD / (2 ** (height // Config.HALVING_INTERVAL))
+
+
+def _segments(block_height, total_blocks, difficulty_growth):
+    """Split the horizon into runs of blocks where both the subsidy and difficulty are constant.
+
+    Yields ``(end_offset, reward, difficulty_multiplier)``; a new run starts
+    at every retarget (every BLOCKS_PER_EPOCH blocks) and at every halving.
+    """
+    height = block_height
+    end_height = block_height + total_blocks
+    multiplier = 1.0
+    while height < end_height:
+        next_retarget = (height // Config.BLOCKS_PER_EPOCH + 1) * Config.BLOCKS_PER_EPOCH
+        next_halving = (height // Config.HALVING_INTERVAL + 1) * Config.HALVING_INTERVAL
+        segment_end = min(next_retarget, next_halving, end_height)
+        yield segment_end - block_height, block_reward_at(height), multiplier
+        if segment_end == next_retarget:
+            multiplier *= 1 + difficulty_growth
+        height = segment_end
+
+
+def build_yield_curve(days, network_hashrate_th, block_height, difficulty_growth_percent=0.0):
+    """Cumulative gross BTC mined per TH/s at the end of each day.
+
+    Within a segment the per-block yield is constant, so each day's
+    cumulative value is a closed-form step from the previous one and the
+    whole curve costs O(days + segments).
+    """
+    if days <= 0 or network_hashrate_th <= 0:
+        return [0.0] * max(days, 0)
+
+    blocks_per_day = Config.BLOCKS_PER_DAY
+    growth = difficulty_growth_percent / 100
+    segments = _segments(block_height, days * blocks_per_day, growth)
+    seg_end, reward, multiplier = next(segments)
+
+    curve = []
+    cumulative = 0.0
+    position = 0
+    for day in range(1, days + 1):
+        day_end = day * blocks_per_day
+        while position < day_end:
+            if position >= seg_end:
+                seg_end, reward, multiplier = next(segments)
+            step_end = min(seg_end, day_end)
+            cumulative += (step_end - position) * reward / (network_hashrate_th * multiplier)
+            position = step_end
+        curve.append(cumulative)
+    return curve
+
+
+def next_halving_day(block_height):
+    next_halving = (block_height // Config.HALVING_INTERVAL + 1) * Config.HALVING_INTERVAL
+    return -(-(next_halving - block_height) // Config.BLOCKS_PER_DAY)
+
+
+def project_earnings_batch(hashrates_th, durations_days, network_hashrate_th, btc_price_usd,
+                           block_height, difficulty_growth_percent=0.0):
+    """Project totals for many rentals off one shared per-TH/s curve.
+
+    Rentals only differ by hashrate and horizon, so each one is a scalar
+    multiple of a single curve lookup.
+    """
+    if len(hashrates_th) != len(durations_days):
+        raise ValueError('hashrates_th and durations_days must have the same length')
+
+    horizon = max(durations_days, default=0)
+    curve = build_yield_curve(horizon, network_hashrate_th, block_height, difficulty_growth_percent)
+    net_multiplier = 1 - Config.MAINTENANCE_FEE_PERCENT / 100
+
+    results = []
+    for hashrate, duration in zip(hashrates_th, durations_days):
+        total_btc = hashrate * curve[duration - 1] * net_multiplier if duration > 0 else 0.0
+        results.append({
+            'hashrate_th': hashrate,
+            'duration_days': duration,
+            'total_btc': total_btc,
+            'total_usd': total_btc * btc_price_usd
+        })
+    return results
+
+
+def project_earnings(hashrate_th, duration_days, network_hashrate_th, btc_price_usd,
+                     block_height, difficulty_growth_percent=0.0):
+    curve = build_yield_curve(duration_days, network_hashrate_th, block_height, difficulty_growth_percent)
+    net_multiplier = 1 - Config.MAINTENANCE_FEE_PERCENT / 100
+
+    cumulative = [
+        {
+            'day': day,
+            'btc': per_th * hashrate_th * net_multiplier,
+            'usd': per_th * hashrate_th * net_multiplier * btc_price_usd
+        }
+        for day, per_th in enumerate(curve, start=1)
+    ]
+    total_btc = cumulative[-1]['btc'] if cumulative else 0.0
+    halving_day = next_halving_day(block_height)
+
+    logger.debug(f'Projection: {duration_days} days, {total_btc:.8f} BTC net, growth {difficulty_growth_percent}%/epoch')
+    return {
+        'hashrate_th': hashrate_th,
+        'duration_days': duration_days,
+        'block_height': block_height,
+        'difficulty_growth_percent': difficulty_growth_percent,
+        'halving_day': halving_day if halving_day <= duration_days else None,
+        'maintenance_fee_percent': Config.MAINTENANCE_FEE_PERCENT,
+        'total_btc': total_btc,
+        'total_usd': total_btc * btc_price_usd,
+        'curve': cumulative
+    }
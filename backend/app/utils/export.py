@@ -0,0 +1,87 @@
+import csv
+import io
+import json
+import logging
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import select
+from app.models import Payment, Payout, Rental, User
+
+logger = logging.getLogger(__name__)
+
+EXPORT_BATCH_SIZE = 1000
+
+EXPORTS = {
+    'users': (User, ('id', 'email', 'referral_code', 'referred_by', 'is_admin', 'created_at')),
+    'rentals': (Rental, ('id', 'user_id', 'miner_id', 'hashrate_allocated', 'duration_days', 'start_date',
+                         'end_date', 'is_active', 'total_profit_btc', 'monthly_fee_usd', 'created_at')),
+    'payments': (Payment, ('id', 'user_id', 'rental_id', 'amount_usd', 'crypto_type', 'tx_hash', 'status',
+                           'confirmed_at', 'created_at')),
+    'payouts': (Payout, ('id', 'user_id', 'referral_id', 'rental_id', 'amount_usd', 'payout_type', 'status',
+                         'processed_at', 'created_at'))
+}
+
+FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson'
+}
+
+
+def _status_condition(model, status):
+    if model is Rental:
+        if status not in ('active', 'inactive'):
+            raise ValueError('Rental status must be active or inactive')
+        return Rental.is_active == (status == 'active')
+    if not hasattr(model, 'status'):
+        raise ValueError('This export has no status filter')
+    return model.status == status
+
+
+def build_export_query(entity, start=None, end=None, status=None):
+    """Column-projected SELECT in (created_at, id) order, matching the keyset indexes"""
+    model, columns = EXPORTS[entity]
+    stmt = select(*(getattr(model, name) for name in columns))
+    if status:
+        stmt = stmt.where(_status_condition(model, status))
+    if start:
+        stmt = stmt.where(model.created_at >= datetime.combine(start, time.min))
+    if end:
+        stmt = stmt.where(model.created_at < datetime.combine(end + timedelta(days=1), time.min))
+    return stmt.order_by(model.created_at, model.id)
+
+
+def _plain(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def stream_rows(session, stmt, batch_size=EXPORT_BATCH_SIZE):
+    """Yield row batches through a server-side cursor so memory stays flat"""
+    result = session.execute(stmt.execution_options(stream_results=True, yield_per=batch_size))
+    for partition in result.partitions():
+        yield partition
+
+
+def generate_export(session, entity, fmt, stmt, batch_size=EXPORT_BATCH_SIZE):
+    """Encode the export one batch at a time; yields str chunks for a streamed response"""
+    columns = EXPORTS[entity][1]
+    exported = 0
+    if fmt == 'csv':
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        for batch in stream_rows(session, stmt, batch_size):
+            writer.writerows([_plain(value) for value in row] for row in batch)
+            exported += len(batch)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+    else:
+        for batch in stream_rows(session, stmt, batch_size):
+            yield ''.join(
+                json.dumps(dict(zip(columns, map(_plain, row)))) + '\n' for row in batch
+            )
+            exported += len(batch)
+    logger.info(f'Exported {exported} {entity} rows as {fmt}')
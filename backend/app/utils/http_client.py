@@ -0,0 +1,142 @@
+import logging
+import os
+from threading import Lock
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import EmptyPoolError
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 10
+POOL_CONNECTIONS = 8
+POOL_MAXSIZE = 4
+# Seconds a caller waits for a free pooled connection before failing like a connect error
+POOL_TIMEOUT = 2
+RETRY_TOTAL = 2
+RETRY_BACKOFF_FACTOR = 0.3
+# 429 is deliberately absent: rate limits are handled by the circuit breakers
+RETRY_STATUS_FORCELIST = (500, 502, 503, 504)
+
+_sessions = {}
+_sessions_lock = Lock()
+
+
+def _bounded_pool_class(pool_class, pool_timeout):
+    class BoundedPool(pool_class):
+        def urlopen(self, method, url, *args, pool_timeout=pool_timeout, **kwargs):
+            return super().urlopen(method, url, *args, pool_timeout=pool_timeout, **kwargs)
+
+    BoundedPool.__name__ = f'Bounded{pool_class.__name__}'
+    return BoundedPool
+
+
+class BoundedPoolAdapter(HTTPAdapter):
+    """Blocking HTTPAdapter whose callers wait at most ``pool_timeout`` seconds for a connection.
+
+    requests never passes urllib3's ``pool_timeout``, so with ``pool_block``
+    a caller would otherwise wait forever behind a stuck upstream.
+    """
+
+    __attrs__ = HTTPAdapter.__attrs__ + ['pool_timeout']
+
+    def __init__(self, pool_timeout=POOL_TIMEOUT, **kwargs):
+        self.pool_timeout = pool_timeout
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            scheme: _bounded_pool_class(pool_class, self.pool_timeout)
+            for scheme, pool_class in self.poolmanager.pool_classes_by_scheme.items()
+        }
+
+    def send(self, request, **kwargs):
+        try:
+            return super().send(request, **kwargs)
+        except EmptyPoolError as e:
+            raise requests.exceptions.ConnectionError(e, request=request)
+
+
+def build_session(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, retries=RETRY_TOTAL,
+                  pool_timeout=POOL_TIMEOUT):
+    """Session with keep-alive pools and idempotent retry/backoff for upstream GETs.
+
+    ``pool_connections`` is how many hosts keep a pool, ``pool_maxsize`` caps
+    connections per host; ``pool_block`` makes extra callers wait, up to
+    ``pool_timeout``, for a free connection instead of opening throwaway ones.
+    Only connect errors and 5xx responses are retried: a read timeout is
+    raised at once so the price hedge can move on to the next source.
+    """
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=False,
+        status=retries,
+        other=0,
+        backoff_factor=RETRY_BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUS_FORCELIST,
+        allowed_methods=frozenset(['GET']),
+        raise_on_status=False,
+        respect_retry_after_header=True
+    )
+    adapter = BoundedPoolAdapter(
+        pool_timeout=pool_timeout,
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=retry,
+        pool_block=True
+    )
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({'User-Agent': 'CloudMiner/1.0', 'Accept': 'application/json'})
+    return session
+
+
+def get_session():
+    """One session per process; pooled sockets must never be shared across a fork"""
+    pid = os.getpid()
+    with _sessions_lock:
+        session = _sessions.get(pid)
+        if session is None:
+            session = build_session()
+            _sessions[pid] = session
+            logger.info(f'Created pooled HTTP session for process {pid}')
+        return session
+
+
+def http_get(url, timeout=DEFAULT_TIMEOUT, **kwargs):
+    return get_session().get(url, timeout=timeout, **kwargs)
+
+
+def get_pool_stats():
+    session = _sessions.get(os.getpid())
+    if session is None:
+        return {'session_active': False, 'pools': []}
+    
+    pools = []
+    for prefix, adapter in session.adapters.items():
+        manager = getattr(adapter, 'poolmanager', None)
+        if manager is None:
+            continue
+        for key in list(manager.pools.keys()):
+            pool = manager.pools.get(key)
+            if pool is None:
+                continue
+            pools.append({
+                'scheme': pool.scheme,
+                'host': pool.host,
+                'port': pool.port,
+                'connections_opened': pool.num_connections,
+                'requests_sent': pool.num_requests,
+                'idle_connections': pool.pool.qsize() if pool.pool else 0,
+                'max_connections': pool.pool.maxsize if pool.pool else 0
+            })
+    return {
+        'session_active': True,
+        'pool_connections': POOL_CONNECTIONS,
+        'pool_maxsize': POOL_MAXSIZE,
+        'pool_timeout': POOL_TIMEOUT,
+        'pools': pools
+    }
@@ -0,0 +1,66 @@
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy import select, update
+from app import db
+from app.models import InventoryReservation, Miner
+
+logger = logging.getLogger(__name__)
+
+
+def take_unit(miner_id):
+    """Decrement ``available_units`` only if a unit is left; the check and the write are one statement"""
+    taken = db.session.execute(
+        update(Miner)
+        .where(Miner.id == miner_id, Miner.available_units > 0)
+        .values(available_units=Miner.available_units - 1)
+    ).rowcount
+    return taken == 1
+
+
+def reserve_unit(miner_id, rental_id, ttl_seconds):
+    """Hold one unit for a checkout inside the caller's transaction; None when sold out"""
+    if not take_unit(miner_id):
+        return None
+    reservation = InventoryReservation(
+        rental_id=rental_id,
+        miner_id=miner_id,
+        status='pending',
+        expires_at=datetime.utcnow() + timedelta(seconds=ttl_seconds)
+    )
+    db.session.add(reservation)
+    return reservation
+
+
+def claim_reservation(rental):
+    """Turn the rental's hold into a sale inside the caller's transaction.
+
+    A hold that already lapsed (or a rental created without one) has to take
+    a fresh unit; returns False when none is left.
+    """
+    claimed = db.session.execute(
+        update(InventoryReservation)
+        .where(InventoryReservation.rental_id == rental.id, InventoryReservation.status == 'pending')
+        .values(status='committed')
+    ).rowcount
+    if claimed:
+        return True
+
+    status = db.session.execute(
+        select(InventoryReservation.status).where(InventoryReservation.rental_id == rental.id)
+    ).scalar()
+    if status == 'committed':
+        return True
+    if not take_unit(rental.miner_id):
+        logger.warning(f'No unit left for rental {rental.id} on miner {rental.miner_id}')
+        return False
+    if status is None:
+        db.session.add(InventoryReservation(
+            rental_id=rental.id, miner_id=rental.miner_id, status='committed', expires_at=datetime.utcnow()
+        ))
+    else:
+        db.session.execute(
+            update(InventoryReservation)
+            .where(InventoryReservation.rental_id == rental.id)
+            .values(status='committed')
+        )
+    return True
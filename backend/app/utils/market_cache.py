@@ -0,0 +1,192 @@
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOCK_TTL = 30
+
+
+def default_cache_path():
+    """Prefer tmpfs so the shared cache lives in memory on Linux hosts"""
+    base_dir = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+    return os.path.join(base_dir, 'cloudminer_market_cache.sqlite3')
+
+
+class MemoryCacheBackend:
+    """Process-local backend; every gunicorn worker keeps its own copy"""
+
+    def __init__(self):
+        self._entries = {}
+        self._locks = {}
+        self._guard = threading.Lock()
+
+    def get(self, key):
+        return self._entries.get(key)
+
+    def set(self, key, data, fetched_at):
+        self._entries[key] = (data, fetched_at)
+
+    def delete(self, key):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def keys(self):
+        return list(self._entries.keys())
+
+    def acquire(self, key, ttl=None):
+        with self._guard:
+            lock = self._locks.setdefault(key, threading.Lock())
+        if lock.acquire(blocking=False):
+            return lock
+        return None
+
+    def release(self, key, token):
+        token.release()
+
+
+class SQLiteCacheBackend:
+    """File-backed backend shared by every worker process on the node"""
+
+    def __init__(self, path=None, lock_ttl=DEFAULT_LOCK_TTL):
+        self.path = path or default_cache_path()
+        self.lock_ttl = lock_ttl
+        self._local = threading.local()
+        self._init_schema()
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        # Connections must not cross a fork, so key them on the owning pid
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _init_schema(self):
+        conn = self._connect()
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS market_cache ('
+            'key TEXT PRIMARY KEY, value TEXT NOT NULL, fetched_at REAL NOT NULL)'
+        )
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS market_cache_locks ('
+            'key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)'
+        )
+
+    def get(self, key):
+        row = self._connect().execute(
+            'SELECT value, fetched_at FROM market_cache WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), datetime.utcfromtimestamp(row[1])
+
+    def set(self, key, data, fetched_at):
+        timestamp = (fetched_at - datetime(1970, 1, 1)).total_seconds()
+        self._connect().execute(
+            'INSERT INTO market_cache (key, value, fetched_at) VALUES (?, ?, ?) '
+            'ON CONFLICT(key) DO UPDATE SET value = excluded.value, fetched_at = excluded.fetched_at',
+            (key, json.dumps(data), timestamp)
+        )
+
+    def delete(self, key):
+        self._connect().execute('DELETE FROM market_cache WHERE key = ?', (key,))
+
+    def clear(self):
+        conn = self._connect()
+        conn.execute('DELETE FROM market_cache')
+        conn.execute('DELETE FROM market_cache_locks')
+
+    def keys(self):
+        return [row[0] for row in self._connect().execute('SELECT key FROM market_cache')]
+
+    def acquire(self, key, ttl=None):
+        owner = uuid.uuid4().hex
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute('DELETE FROM market_cache_locks WHERE key = ? AND expires_at < ?', (key, now))
+            cursor = conn.execute(
+                'INSERT OR IGNORE INTO market_cache_locks (key, owner, expires_at) VALUES (?, ?, ?)',
+                (key, owner, now + (ttl or self.lock_ttl))
+            )
+            conn.execute('COMMIT')
+        except sqlite3.OperationalError as e:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            logger.warning(f'Could not acquire cache lock for {key}: {e}')
+            return None
+        return owner if cursor.rowcount == 1 else None
+
+    def release(self, key, token):
+        self._connect().execute(
+            'DELETE FROM market_cache_locks WHERE key = ? AND owner = ?', (key, token)
+        )
+
+
+class MarketDataCache:
+    """Dict-like facade over a swappable backend.
+
+    Entries are ``(data, fetched_at)`` tuples, matching the original
+    module-level dict so existing ``cache[key][0]`` lookups keep working.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend or MemoryCacheBackend()
+
+    def get(self, key, default=None):
+        entry = self.backend.get(key)
+        return entry if entry is not None else default
+
+    def __contains__(self, key):
+        return self.backend.get(key) is not None
+
+    def __getitem__(self, key):
+        entry = self.backend.get(key)
+        if entry is None:
+            raise KeyError(key)
+        return entry
+
+    def __setitem__(self, key, entry):
+        data, fetched_at = entry
+        self.backend.set(key, data, fetched_at)
+
+    def __delitem__(self, key):
+        self.backend.delete(key)
+
+    def keys(self):
+        return self.backend.keys()
+
+    def clear(self):
+        self.backend.clear()
+
+    @contextmanager
+    def single_flight(self, key, ttl=None):
+        """Yield True if this caller won the right to refresh ``key``"""
+        token = self.backend.acquire(key, ttl)
+        try:
+            yield token is not None
+        finally:
+            if token is not None:
+                self.backend.release(key, token)
+
+
+def create_cache_backend(name, path=None):
+    if name == 'sqlite':
+        return SQLiteCacheBackend(path)
+    if name == 'memory':
+        return MemoryCacheBackend()
+    raise ValueError(f'Unknown market cache backend: {name}')
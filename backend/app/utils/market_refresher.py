@@ -0,0 +1,73 @@
+import logging
+from threading import Event, Thread
+from app.utils import api_fetcher
+
+logger = logging.getLogger(__name__)
+
+
+class MarketDataRefresher:
+    """Keeps market data warm so request handlers never wait on upstream APIs.
+
+    Every ``interval`` seconds each key whose age is within ``refresh_ahead``
+    of ``CACHE_DURATION`` is refreshed. The cache's single-flight lock means
+    only one worker on the node actually calls the upstream API.
+    """
+
+    def __init__(self, interval=30, refresh_ahead=None, sources=None):
+        self.interval = interval
+        self.refresh_ahead = refresh_ahead or api_fetcher.REFRESH_AHEAD
+        self.sources = sources or api_fetcher.MARKET_DATA_SOURCES
+        self._stop = Event()
+        self._thread = None
+
+    @property
+    def refresh_after_seconds(self):
+        return max((api_fetcher.CACHE_DURATION - self.refresh_ahead).total_seconds(), 0)
+
+    def due_keys(self):
+        due = []
+        for key in self.sources:
+            entry = api_fetcher.cache.get(key)
+            if entry is None or api_fetcher._entry_age(entry) >= self.refresh_after_seconds:
+                due.append(key)
+        return due
+
+    def run_once(self):
+        refreshed = []
+        for key in self.due_keys():
+            try:
+                if api_fetcher.refresh_key(key, self.sources[key], max_age=self.refresh_after_seconds):
+                    refreshed.append(key)
+            except Exception as e:
+                logger.error(f'Market data refresh failed for {key}: {e}', exc_info=True)
+        if refreshed:
+            logger.info(f'Market data refreshed: {refreshed}')
+        return refreshed
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.run_once()
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = Thread(target=self._run, name='market-data-refresher', daemon=True)
+        self._thread.start()
+        logger.info(f'Market data refresher started (interval: {self.interval}s)')
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+
+_refresher = None
+
+def start_market_refresher(app):
+    global _refresher
+    if _refresher is None:
+        _refresher = MarketDataRefresher(interval=app.config['MARKET_REFRESH_INTERVAL'])
+    _refresher.start()
+    return _refresher
@@ -0,0 +1,108 @@
+import logging
+from functools import lru_cache
+import numpy as np
+from app.config import Config
+from app.utils.earnings_projection import build_yield_curve
+
+logger = logging.getLogger(__name__)
+
+DAYS_PER_YEAR = 365
+DAYS_PER_EPOCH = Config.BLOCKS_PER_EPOCH / Config.BLOCKS_PER_DAY
+PATH_CHUNK = 2000
+PERCENTILES = (5, 50, 95)
+
+
+def _daily_subsidy(duration_days, block_height):
+    """BTC issued per day by the whole network, following the halving schedule"""
+    curve = np.asarray(build_yield_curve(duration_days, 1.0, block_height, 0.0))
+    return np.diff(curve, prepend=0.0)
+
+
+def _gbm_paths(rng, start, drift, volatility, paths, days):
+    """Geometric Brownian motion sampled once per day; drift/volatility are per day"""
+    shocks = rng.standard_normal((paths, days), dtype=np.float32)
+    shocks *= volatility
+    shocks += drift - 0.5 * volatility ** 2
+    np.cumsum(shocks, axis=1, out=shocks)
+    np.exp(shocks, out=shocks)
+    shocks *= start
+    return shocks
+
+
+def _bands(values):
+    finite = values[np.isfinite(values)]
+    if finite.size == 0:
+        return {f'p{p}': None for p in PERCENTILES}
+    return {f'p{p}': float(v) for p, v in zip(PERCENTILES, np.percentile(finite, PERCENTILES))}
+
+
+def simulate_profitability(hashrate_th, duration_days, investment_usd, btc_price_usd, network_hashrate_th,
+                           block_height, paths=10_000, price_volatility=0.6, price_drift=0.0,
+                           hashrate_growth_percent=0.0, hashrate_volatility=0.15, seed=None):
+    """Sample BTC price and network hashrate paths and summarise the outcome distribution.
+
+    Price follows GBM with annualised ``price_drift``/``price_volatility``.
+    Network hashrate follows GBM whose drift is ``hashrate_growth_percent``
+    per difficulty epoch. Work is vectorised over paths x days, in chunks of
+    PATH_CHUNK paths so memory stays bounded.
+    """
+    rng = np.random.default_rng(seed)
+    subsidy = _daily_subsidy(duration_days, block_height).astype(np.float32)
+    net_multiplier = 1 - Config.MAINTENANCE_FEE_PERCENT / 100
+    # hashrate * subsidy / network: the miner's share of each day's issuance
+    btc_numerator = subsidy * np.float32(hashrate_th * net_multiplier)
+
+    price_mu = price_drift / DAYS_PER_YEAR
+    price_sigma = price_volatility / np.sqrt(DAYS_PER_YEAR)
+    hash_mu = np.log1p(hashrate_growth_percent / 100) / DAYS_PER_EPOCH
+    hash_sigma = hashrate_volatility / np.sqrt(DAYS_PER_YEAR)
+
+    total_usd = np.empty(paths)
+    total_btc = np.empty(paths)
+    roi_days = np.empty(paths)
+    for start in range(0, paths, PATH_CHUNK):
+        count = min(PATH_CHUNK, paths - start)
+        network = _gbm_paths(rng, network_hashrate_th, hash_mu, hash_sigma, count, duration_days)
+        daily_btc = np.divide(btc_numerator, network, out=network)
+        total_btc[start:start + count] = daily_btc.sum(axis=1)
+
+        price = _gbm_paths(rng, btc_price_usd, price_mu, price_sigma, count, duration_days)
+        cumulative_usd = np.cumsum(np.multiply(daily_btc, price, out=price), axis=1, out=price)
+        total_usd[start:start + count] = cumulative_usd[:, -1]
+
+        reached = cumulative_usd >= investment_usd
+        first_day = reached.argmax(axis=1) + 1.0
+        first_day[~reached[:, -1]] = np.inf
+        roi_days[start:start + count] = first_day
+
+    roi_probability = float(np.isfinite(roi_days).mean())
+    logger.debug(f'Monte Carlo: {paths} paths x {duration_days} days, ROI probability {roi_probability:.2%}')
+    return {
+        'paths': paths,
+        'duration_days': duration_days,
+        'total_usd': _bands(total_usd),
+        'total_btc': _bands(total_btc),
+        'roi_days': _bands(roi_days),
+        'roi_probability': roi_probability,
+        'assumptions': {
+            'price_volatility': price_volatility,
+            'price_drift': price_drift,
+            'hashrate_growth_percent': hashrate_growth_percent,
+            'hashrate_volatility': hashrate_volatility,
+            'maintenance_fee_percent': Config.MAINTENANCE_FEE_PERCENT
+        }
+    }
+
+
+@lru_cache(maxsize=256)
+def simulate_profitability_cached(miner_id, hashrate_th, duration_days, investment_usd, market_snapshot,
+                                  paths, price_volatility, hashrate_growth_percent):
+    """Memoised per (miner, duration, market snapshot); ``market_snapshot`` is a hashable tuple
+    of ``(btc_price, network_hashrate_th, block_height)`` so results roll over with the market cache.
+    """
+    btc_price, network_hashrate, block_height = market_snapshot
+    return simulate_profitability(
+        hashrate_th, duration_days, investment_usd, btc_price, network_hashrate, block_height,
+        paths=paths, price_volatility=price_volatility, hashrate_growth_percent=hashrate_growth_percent,
+        seed=hash((miner_id, hashrate_th, duration_days, market_snapshot)) & 0xFFFFFFFF
+    )
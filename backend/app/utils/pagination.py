@@ -0,0 +1,74 @@
+import base64
+import logging
+from datetime import datetime
+from sqlalchemy import tuple_
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+# User-facing lists return bare JSON arrays, so they get larger pages
+USER_PAGE_SIZE = 100
+USER_MAX_PAGE_SIZE = 500
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+
+
+def encode_cursor(row):
+    raw = f'{row.created_at.isoformat()}|{row.id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor; raises ValueError for anything malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.rsplit('|', 1)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError('Invalid cursor') from e
+
+
+def page_size(args, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """``limit`` (or the older ``per_page``) clamped to 1..maximum"""
+    size = args.get('limit', type=int) or args.get('per_page', type=int) or default
+    return max(1, min(size, maximum))
+
+
+def keyset_page(query, model, args, default_size=DEFAULT_PAGE_SIZE, max_size=MAX_PAGE_SIZE):
+    """Fetch one page newest-first, keyed on ``(created_at, id)``.
+
+    The cursor is the key of the last row already returned, so every page is
+    a single index range scan of ``limit + 1`` rows regardless of depth. Returns
+    ``(rows, next_cursor)``; ``next_cursor`` is None on the last page.
+    """
+    limit = page_size(args, default_size, max_size)
+    cursor = args.get('cursor')
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.filter(tuple_(model.created_at, model.id) < tuple_(created_at, row_id))
+    rows = query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1])
+
+
+def cursor_headers(next_cursor):
+    """Response headers for list endpoints whose body is a bare JSON array"""
+    return {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+
+
+def wants_total(args):
+    return args.get('include_total', '').lower() in ('1', 'true', 'yes')
+
+
+def approximate_total(query, rollup_key=None):
+    """Total for an opt-in ``include_total`` request.
+
+    Served from the dashboard rollup when the listing maps onto one of its
+    counters (O(1), may lag briefly); otherwise falls back to an exact COUNT.
+    """
+    if rollup_key:
+        from app.utils.stats_rollup import get_rollup
+        return int(get_rollup()[rollup_key])
+    return query.order_by(None).count()
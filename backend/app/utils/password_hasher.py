@@ -0,0 +1,109 @@
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+from app.utils.market_cache import default_cache_path
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX hosts fall back to a per-process bound
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+SLOT_POLL_INTERVAL = 0.01
+
+
+class HasherBusy(Exception):
+    """Every hashing slot stayed taken for the whole queue timeout"""
+
+
+class HashSlots:
+    """Host-wide cap on concurrent password hashes.
+
+    Each slot is an flock'd file, so every gunicorn worker (and every thread
+    in it) competes for the same ``count`` slots; requests beyond that are
+    turned away instead of pinning all workers on the KDF.
+    """
+
+    def __init__(self, directory, count):
+        self.paths = [os.path.join(directory, f'cloudminer_hash_slot_{i}.lock') for i in range(count)]
+        self._local = threading.BoundedSemaphore(count)
+
+    def _try_slot(self, path):
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return None
+        return fd
+
+    @contextmanager
+    def acquire(self, timeout):
+        if fcntl is None:
+            if not self._local.acquire(timeout=timeout):
+                raise HasherBusy()
+            try:
+                yield
+            finally:
+                self._local.release()
+            return
+
+        deadline = time.monotonic() + timeout
+        while True:
+            for path in self.paths:
+                fd = self._try_slot(path)
+                if fd is None:
+                    continue
+                try:
+                    yield
+                finally:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+                    os.close(fd)
+                return
+            if time.monotonic() >= deadline:
+                raise HasherBusy()
+            time.sleep(SLOT_POLL_INTERVAL)
+
+
+@lru_cache(maxsize=8)
+def _slots(directory, count):
+    return HashSlots(directory, count)
+
+
+@lru_cache(maxsize=8)
+def _method_prefix(method):
+    """Normalised ``method`` as Werkzeug writes it in front of the first ``$`` (e.g. scrypt -> scrypt:32768:8:1)"""
+    return generate_password_hash('', method=method).split('$', 1)[0]
+
+
+def _acquire_slot():
+    config = current_app.config
+    directory = config['PASSWORD_HASH_SLOT_DIR'] or os.path.dirname(default_cache_path())
+    return _slots(directory, config['PASSWORD_HASH_CONCURRENCY']).acquire(config['PASSWORD_HASH_QUEUE_TIMEOUT'])
+
+
+def needs_rehash(password_hash):
+    return password_hash.split('$', 1)[0] != _method_prefix(current_app.config['PASSWORD_HASH_METHOD'])
+
+
+def hash_password(password):
+    """Hash with the configured KDF parameters; raises HasherBusy when saturated"""
+    with _acquire_slot():
+        return generate_password_hash(password, method=current_app.config['PASSWORD_HASH_METHOD'])
+
+
+def verify_password(password_hash, password):
+    """Returns ``(valid, new_hash)``; ``new_hash`` is set when a correct password was stored with outdated parameters"""
+    with _acquire_slot():
+        if not check_password_hash(password_hash, password):
+            return False, None
+        if not needs_rehash(password_hash):
+            return True, None
+        logger.info('Upgrading password hash to the configured parameters')
+        return True, generate_password_hash(password, method=current_app.config['PASSWORD_HASH_METHOD'])
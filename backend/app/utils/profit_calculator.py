@@ -65,3 +65,39 @@ def estimate_earnings(hashrate_th, duration_days, network_hashrate_th, btc_price
         'total_usd': total_usd,
         'maintenance_fee_percent': Config.MAINTENANCE_FEE_PERCENT
     }
+
+def estimate_earnings_batch(hashrates_th, durations_days, investments_usd, network_hashrate_th, btc_price_usd):
+    """Price many (hashrate, duration, investment) scenarios in a single pass.
+
+    The per-TH/s yield and fee multiplier are computed once and shared by
+    every scenario, and nothing is logged per row. Every figure is net of
+    the maintenance fee, as in ``estimate_earnings`` and ``calculate_roi_days``.
+    """
+    if not (len(hashrates_th) == len(durations_days) == len(investments_usd)):
+        raise ValueError('hashrates_th, durations_days and investments_usd must have the same length')
+    
+    if network_hashrate_th == 0:
+        logger.warning('Network hashrate is 0, returning 0 daily BTC for batch')
+        btc_per_th = 0.0
+    else:
+        btc_per_th = Config.BLOCKS_PER_DAY * Config.BTC_BLOCK_REWARD / network_hashrate_th
+    net_btc_per_th = btc_per_th * (1 - Config.MAINTENANCE_FEE_PERCENT / 100)
+    
+    results = []
+    for hashrate, duration, investment in zip(hashrates_th, durations_days, investments_usd):
+        daily_btc = hashrate * net_btc_per_th
+        daily_usd = daily_btc * btc_price_usd
+        results.append({
+            'hashrate_th': hashrate,
+            'duration_days': duration,
+            'daily_btc': daily_btc,
+            'monthly_btc': daily_btc * 30,
+            'monthly_usd': daily_usd * 30,
+            'total_btc': daily_btc * duration,
+            'total_usd': daily_usd * duration,
+            'roi_days': int(investment / daily_usd) if daily_usd > 0 else 0,
+            'maintenance_fee_percent': Config.MAINTENANCE_FEE_PERCENT
+        })
+    
+    logger.debug(f'Batch estimate computed for {len(results)} scenarios')
+    return results
@@ -0,0 +1,126 @@
+import hashlib
+import logging
+import secrets
+import string
+from flask import current_app
+from sqlalchemy import func, select
+from app import db
+
+logger = logging.getLogger(__name__)
+
+ALPHABET = string.ascii_uppercase + string.digits
+CODE_LENGTH = 8
+DOMAIN = len(ALPHABET) ** CODE_LENGTH
+HALF_BITS = 21  # 2**42 is the smallest even power of two above 36**8
+HALF_MASK = (1 << HALF_BITS) - 1
+# Four rounds of a keyed PRF already give a strong pseudorandom permutation (Luby-Rackoff)
+ROUNDS = 4
+
+
+def _round_functions(key):
+    """One keyed BLAKE2b state per key; each round copies it instead of re-keying"""
+    keyed = hashlib.blake2b(digest_size=4, key=key)
+    from_bytes = int.from_bytes
+
+    def round_function(prefix, value):
+        state = keyed.copy()
+        state.update(prefix + value.to_bytes(3, 'big'))
+        return from_bytes(state.digest(), 'big') & HALF_MASK
+
+    return round_function, [bytes((index,)) for index in range(ROUNDS)]
+
+
+def _key():
+    # BLAKE2b keys are at most 64 bytes
+    return hashlib.blake2b(current_app.config['REFERRAL_CODE_KEY'].encode(), digest_size=32).digest()
+
+
+def _encoder(key):
+    round_function, prefixes = _round_functions(key)
+
+    def encode(user_id):
+        if not 0 <= user_id < DOMAIN:
+            raise ValueError(f'User ID {user_id} is outside the referral code space')
+        value = user_id
+        while True:
+            left, right = value >> HALF_BITS, value & HALF_MASK
+            for prefix in prefixes:
+                left, right = right, left ^ round_function(prefix, right)
+            value = (left << HALF_BITS) | right
+            if value < DOMAIN:
+                break
+        chars = []
+        for _ in range(CODE_LENGTH):
+            value, digit = divmod(value, len(ALPHABET))
+            chars.append(ALPHABET[digit])
+        return ''.join(reversed(chars))
+
+    return encode
+
+
+def encode_referral_code(user_id, key=None):
+    """Keyed permutation of ``user_id`` onto the 8-character code space.
+
+    A balanced Feistel network over 42 bits with a keyed BLAKE2b round
+    function, cycle-walked back into [0, 36**8), so distinct ids always give
+    distinct codes. Codes only stay unique while REFERRAL_CODE_KEY stays the
+    same.
+    """
+    return _encoder(key or _key())(user_id)
+
+
+def encode_referral_codes(user_ids, key=None):
+    """Codes for many ids, sharing one keyed round state"""
+    encode = _encoder(key or _key())
+    return [encode(user_id) for user_id in user_ids]
+
+
+def decode_referral_code(code, key=None):
+    """Inverse of encode_referral_code; raises ValueError for strings outside the code alphabet"""
+    if len(code) != CODE_LENGTH or any(c not in ALPHABET for c in code):
+        raise ValueError('Invalid referral code')
+    round_function, prefixes = _round_functions(key or _key())
+    value = 0
+    for char in code:
+        value = value * len(ALPHABET) + ALPHABET.index(char)
+    while True:
+        left, right = value >> HALF_BITS, value & HALF_MASK
+        for prefix in reversed(prefixes):
+            left, right = right ^ round_function(prefix, left), left
+        value = (left << HALF_BITS) | right
+        if value < DOMAIN:
+            return value
+
+
+def reserve_user_ids(count, bind=None):
+    """Draw ``count`` ids from the users sequence in one statement; None where there is no sequence (SQLite)"""
+    if db.engine.dialect.name != 'postgresql' or count <= 0:
+        return None
+    return (bind or db.session).execute(
+        select(func.nextval(func.pg_get_serial_sequence('users', 'id')))
+        .select_from(func.generate_series(1, count))
+    ).scalars().all()
+
+
+def assign_referral_codes(users):
+    """Add new ``users`` to the session with ids and derived referral codes, in one pass.
+
+    On PostgreSQL the ids come from the sequence up front, so the INSERTs
+    already carry the final codes. Elsewhere the users are flushed with
+    throwaway placeholders and the codes are written once the ids exist.
+    """
+    ids = reserve_user_ids(len(users))
+    if ids is not None:
+        for user, user_id, code in zip(users, ids, encode_referral_codes(ids)):
+            user.id = user_id
+            user.referral_code = code
+        db.session.add_all(users)
+        return users
+
+    for user in users:
+        user.referral_code = secrets.token_hex(10)
+    db.session.add_all(users)
+    db.session.flush()
+    for user, code in zip(users, encode_referral_codes([user.id for user in users])):
+        user.referral_code = code
+    return users
@@ -0,0 +1,63 @@
+import logging
+import threading
+import time
+from flask import current_app
+from flask_jwt_extended import create_access_token, get_jwt, get_jwt_identity
+from sqlalchemy import select
+from app import db
+from app.models import User
+
+logger = logging.getLogger(__name__)
+
+
+def access_token_for(user):
+    """Access token carrying the admin role as a signed claim"""
+    return create_access_token(identity=str(user.id), additional_claims={'is_admin': bool(user.is_admin)})
+
+
+class RoleCache:
+    """Per-process ``user_id -> is_admin`` answers, each trusted for ``ttl`` seconds.
+
+    The JWT claim says what the role was at login; this cache is what
+    revokes it, locally at once via ``invalidate`` and on other workers
+    once their entry expires.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def is_admin(self, user_id):
+        entry = self._entries.get(user_id)
+        if entry and time.monotonic() < entry[1]:
+            return entry[0]
+        is_admin = bool(db.session.execute(select(User.is_admin).where(User.id == user_id)).scalar())
+        with self._lock:
+            self._entries[user_id] = (is_admin, time.monotonic() + self.ttl)
+        return is_admin
+
+    def invalidate(self, user_id=None):
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+
+
+def get_role_cache():
+    cache = current_app.extensions.get('role_cache')
+    if cache is None:
+        cache = current_app.extensions.setdefault('role_cache', RoleCache(current_app.config['ROLE_CACHE_TTL']))
+    return cache
+
+
+def current_user_is_admin():
+    """Admin check for the current JWT; non-admin tokens are refused without touching the database"""
+    if get_jwt().get('is_admin') is False:
+        return False
+    return get_role_cache().is_admin(int(get_jwt_identity()))
+
+
+def invalidate_role(user_id):
+    get_role_cache().invalidate(user_id)
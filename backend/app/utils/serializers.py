@@ -0,0 +1,52 @@
+from app import db
+from app.models import Miner, Payment, Payout, Referral, Rental, User
+
+
+class RowSchema:
+    """Column projection plus a precompiled row encoder for one listing.
+
+    ``query()`` selects only the schema's columns, so list endpoints get
+    plain row tuples back instead of ORM instances, and ``encode`` zips
+    each tuple onto the precomputed keys. Values are left as the driver
+    returns them; the orjson provider writes datetimes as the same ISO 8601
+    strings ``Model.to_dict`` produces.
+    """
+
+    def __init__(self, model, *columns, joins=()):
+        self.model = model
+        self.columns = tuple(getattr(model, column) if isinstance(column, str) else column for column in columns)
+        self.keys = tuple(column.key for column in self.columns)
+        self.joins = joins
+
+    def query(self):
+        query = db.session.query(*self.columns).select_from(self.model)
+        for target, onclause in self.joins:
+            query = query.outerjoin(target, onclause)
+        return query
+
+    def encode(self, rows):
+        keys = self.keys
+        return [dict(zip(keys, row)) for row in rows]
+
+
+USER_SCHEMA = RowSchema(User, 'id', 'email', 'referral_code', 'is_admin', 'created_at')
+
+MINER_SCHEMA = RowSchema(Miner, 'id', 'name', 'model', 'hashrate_th', 'price_usd', 'efficiency', 'power_watts',
+                         'available_units', 'description', 'image_url')
+
+RENTAL_SCHEMA = RowSchema(
+    Rental, 'id', 'user_id', 'miner_id', Miner.name.label('miner_name'), 'hashrate_allocated', 'duration_days',
+    'start_date', 'end_date', 'is_active', 'total_profit_btc', 'monthly_fee_usd', 'created_at',
+    joins=((Miner, Rental.miner_id == Miner.id),)
+)
+
+REFERRAL_SCHEMA = RowSchema(Referral, 'id', 'referrer_id', 'referred_id', 'commission_earned_usd', 'created_at')
+
+PAYMENT_SCHEMA = RowSchema(Payment, 'id', 'user_id', 'rental_id', 'amount_usd', 'crypto_type', 'tx_hash', 'status',
+                           'confirmed_at', 'created_at')
+
+PAYOUT_SCHEMA = RowSchema(Payout, 'id', 'user_id', 'referral_id', 'rental_id', 'amount_usd', 'payout_type', 'status',
+                          'processed_at', 'created_at')
+
+ADMIN_PAYOUT_SCHEMA = RowSchema(Payout, *PAYOUT_SCHEMA.columns, User.email.label('user_email'),
+                                joins=((User, Payout.user_id == User.id),))
@@ -0,0 +1,83 @@
+import logging
+import threading
+import time
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import select, update
+from app import db
+from app.models import SettingsVersion, SystemSettings
+
+logger = logging.getLogger(__name__)
+
+VERSION_ROW_ID = 1
+
+
+class SettingsCache:
+    """Every system setting held in memory, reloaded in one query when the shared version moves.
+
+    The version row is re-read at most once per ``ttl`` seconds, so reads in
+    between cost nothing and a write on another worker shows up within ``ttl``.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = None
+        self._version = None
+        self._checked_at = 0.0
+
+    def _fresh(self):
+        return self._entries is not None and time.monotonic() - self._checked_at < self.ttl
+
+    def entries(self):
+        if self._fresh():
+            return self._entries
+        with self._lock:
+            if self._fresh():
+                return self._entries
+            # Read the version before the rows: a concurrent write can then only cause an extra reload
+            version = db.session.execute(
+                select(SettingsVersion.version).where(SettingsVersion.id == VERSION_ROW_ID)
+            ).scalar() or 0
+            if self._entries is None or version != self._version:
+                rows = db.session.execute(
+                    select(SystemSettings.key, SystemSettings.value, SystemSettings.description,
+                           SystemSettings.updated_at)
+                ).all()
+                self._entries = {
+                    key: {
+                        'value': value,
+                        'description': description,
+                        'updated_at': updated_at.isoformat() if updated_at else None
+                    }
+                    for key, value, description, updated_at in rows
+                }
+                self._version = version
+                logger.debug(f'Loaded {len(rows)} settings at version {version}')
+            self._checked_at = time.monotonic()
+            return self._entries
+
+    def invalidate(self):
+        with self._lock:
+            self._entries = None
+
+
+def get_settings_cache():
+    cache = current_app.extensions.get('settings_cache')
+    if cache is None:
+        cache = current_app.extensions.setdefault(
+            'settings_cache', SettingsCache(current_app.config['SETTINGS_CACHE_TTL'])
+        )
+    return cache
+
+
+def bump_settings_version():
+    """Advance the shared version inside the caller's transaction"""
+    now = datetime.utcnow()
+    bumped = db.session.execute(
+        update(SettingsVersion)
+        .where(SettingsVersion.id == VERSION_ROW_ID)
+        .values(version=SettingsVersion.version + 1, updated_at=now)
+    ).rowcount
+    if not bumped:
+        db.session.add(SettingsVersion(id=VERSION_ROW_ID, version=1, updated_at=now))
@@ -0,0 +1,180 @@
+import logging
+import os
+import threading
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import delete, func, select, text, true, update
+from sqlalchemy.dialects import postgresql, sqlite
+from app import db
+from app.models import Miner, Payment, Payout, Referral, Rental, StatsRollup, User
+
+logger = logging.getLogger(__name__)
+
+TRACKED_PAYMENT_STATUSES = ('pending', 'confirmed', 'failed', 'refund_required')
+TRACKED_PAYOUT_STATUSES = ('pending', 'paid')
+
+
+def _aggregates():
+    """One FILTER-aggregate subquery per table, each read in a single pass"""
+    return [
+        (User, {
+            'users_total': func.count(),
+            'users_admins': func.count().filter(User.is_admin == True)
+        }),
+        (Miner, {
+            'miners_total': func.count()
+        }),
+        (Rental, {
+            'rentals_total': func.count(),
+            'rentals_active': func.count().filter(Rental.is_active == True),
+            'rentals_inactive': func.count().filter(Rental.is_active == False),
+            'rentals_active_hashrate_th': func.coalesce(
+                func.sum(Rental.hashrate_allocated).filter(Rental.is_active == True), 0.0)
+        }),
+        (Payment, {
+            'payments_total': func.count(),
+            'payments_pending': func.count().filter(Payment.status == 'pending'),
+            'payments_confirmed': func.count().filter(Payment.status == 'confirmed'),
+            'payments_failed': func.count().filter(Payment.status == 'failed'),
+            'payments_refund_required': func.count().filter(Payment.status == 'refund_required'),
+            'payments_confirmed_usd': func.coalesce(
+                func.sum(Payment.amount_usd).filter(Payment.status == 'confirmed'), 0.0)
+        }),
+        (Referral, {
+            'referrals_total': func.count(),
+            'referrals_commission_usd': func.coalesce(func.sum(Referral.commission_earned_usd), 0.0)
+        }),
+        (Payout, {
+            'payouts_total': func.count(),
+            'payouts_pending': func.count().filter(Payout.status == 'pending'),
+            'payouts_paid': func.count().filter(Payout.status == 'paid'),
+            'payouts_pending_usd': func.coalesce(
+                func.sum(Payout.amount_usd).filter(Payout.status == 'pending'), 0.0)
+        })
+    ]
+
+
+ROLLUP_KEYS = tuple(key for _, columns in _aggregates() for key in columns)
+
+
+def compute_rollup():
+    """Recompute every counter from the base tables in one statement"""
+    subqueries = [
+        select(*(expr.label(key) for key, expr in columns.items())).select_from(model).subquery()
+        for model, columns in _aggregates()
+    ]
+    # Every subquery yields exactly one row, so joining them ON true is a 1x1 cross join
+    joined = subqueries[0]
+    for subquery in subqueries[1:]:
+        joined = joined.join(subquery, true())
+    row = db.session.execute(select(*subqueries).select_from(joined)).mappings().one()
+    return {key: float(row[key] or 0) for key in ROLLUP_KEYS}
+
+
+def _shard():
+    """Shard written by this worker thread; stable, so one transaction's bumps touch one row per key"""
+    return hash((os.getpid(), threading.get_ident())) % current_app.config['STATS_ROLLUP_SHARDS']
+
+
+def _upsert(rows):
+    dialect = postgresql if db.session.get_bind().dialect.name == 'postgresql' else sqlite
+    statement = dialect.insert(StatsRollup)
+    statement = statement.on_conflict_do_update(
+        index_elements=[StatsRollup.key, StatsRollup.shard],
+        set_={'value': statement.excluded.value, 'updated_at': statement.excluded.updated_at}
+    )
+    db.session.execute(statement, rows)
+
+
+def refresh_rollup():
+    """Recount ``stats_rollup`` from the base tables; corrects any drift.
+
+    The table is locked against writes before counting, so bumps already in
+    flight commit first and are counted, and later ones wait and apply on
+    top of the new totals. The totals are upserted, so concurrent rebuilds
+    queue on the lock instead of colliding on the primary key.
+    """
+    shards = current_app.config['STATS_ROLLUP_SHARDS']
+    now = datetime.utcnow()
+    if db.session.get_bind().dialect.name == 'postgresql':
+        # Conflicts with the row locks taken by bump(); plain reads carry on
+        db.session.execute(text('LOCK TABLE stats_rollup IN EXCLUSIVE MODE'))
+    else:
+        # SQLite has a single writer: the first write takes the database lock
+        db.session.execute(update(StatsRollup).values(updated_at=now))
+    values = compute_rollup()
+    _upsert([
+        {'key': key, 'shard': shard, 'value': value if shard == 0 else 0.0, 'updated_at': now}
+        for key, value in values.items() for shard in range(shards)
+    ])
+    # Shards left over from a larger STATS_ROLLUP_SHARDS
+    db.session.execute(delete(StatsRollup).where(StatsRollup.key.in_(ROLLUP_KEYS), StatsRollup.shard >= shards))
+    db.session.commit()
+    logger.debug('Stats rollup refreshed')
+    return values
+
+
+def get_rollup():
+    """Read the counters (O(keys x shards)); rebuilds them first if missing or invalidated"""
+    shards = current_app.config['STATS_ROLLUP_SHARDS']
+    values = dict.fromkeys(ROLLUP_KEYS, 0.0)
+    present = set()
+    for key, shard, value in db.session.execute(select(StatsRollup.key, StatsRollup.shard, StatsRollup.value)):
+        if key in values and shard < shards:
+            values[key] += value
+            present.add((key, shard))
+    if len(present) < len(ROLLUP_KEYS) * shards:
+        return refresh_rollup()
+    return values
+
+
+def bump(**deltas):
+    """Apply counter deltas to this worker's shard inside the caller's transaction.
+
+    Missing rows are left alone; the next read rebuilds them from scratch.
+    """
+    now = datetime.utcnow()
+    shard = _shard()
+    # A fixed key order keeps two transactions from taking the same row locks in opposite orders
+    for key, delta in sorted(deltas.items()):
+        if not delta:
+            continue
+        db.session.execute(
+            update(StatsRollup)
+            .where(StatsRollup.key == key, StatsRollup.shard == shard)
+            .values(value=StatsRollup.value + delta, updated_at=now)
+        )
+
+
+def invalidate_rollup():
+    """Drop the counters inside the caller's transaction so the next read recomputes them.
+
+    Used by rare admin edits whose effect on the counters is not worth tracking by hand.
+    """
+    db.session.execute(delete(StatsRollup))
+
+
+def payment_status_deltas(old_status, new_status, amount_usd):
+    deltas = {}
+    if old_status == new_status:
+        return deltas
+    if old_status in TRACKED_PAYMENT_STATUSES:
+        deltas[f'payments_{old_status}'] = -1
+    if new_status in TRACKED_PAYMENT_STATUSES:
+        deltas[f'payments_{new_status}'] = 1
+    if old_status == 'confirmed':
+        deltas['payments_confirmed_usd'] = -amount_usd
+    elif new_status == 'confirmed':
+        deltas['payments_confirmed_usd'] = amount_usd
+    return deltas
+
+
+def rental_activation_deltas(rental):
+    """Deltas for flipping ``rental`` to active; call before changing ``is_active``"""
+    if rental.is_active:
+        return {}
+    return {
+        'rentals_active': 1,
+        'rentals_inactive': -1,
+        'rentals_active_hashrate_th': rental.hashrate_allocated
+    }
@@ -0,0 +1,48 @@
+"""Time the rental listing encoders: ORM + to_dict + stdlib json against row schema + orjson.
+
+Runs against an in-memory SQLite database: python benchmark_serializers.py [rows]
+"""
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from sqlalchemy.orm import joinedload
+from app import create_app, db
+from app.models import Miner, Rental, User
+from app.utils.serializers import RENTAL_SCHEMA
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+
+app = create_app('testing')
+
+with app.app_context():
+    db.create_all()
+    user = User(email='bench@example.com', referral_code='BENCH001', password_hash='x')
+    miner = Miner(name='M', model='M1', hashrate_th=100, price_usd=1000, efficiency=30, power_watts=3000)
+    db.session.add_all([user, miner])
+    db.session.flush()
+    now = datetime.utcnow()
+    db.session.execute(insert(Rental), [
+        {'user_id': user.id, 'miner_id': miner.id, 'hashrate_allocated': 10.0, 'duration_days': 30,
+         'monthly_fee_usd': 5.0, 'is_active': True, 'start_date': now, 'end_date': now + timedelta(days=30),
+         'total_profit_btc': 0.001 * i, 'created_at': now - timedelta(seconds=i)}
+        for i in range(ROWS)
+    ])
+    db.session.commit()
+
+    def to_dict_json():
+        db.session.expunge_all()
+        rentals = Rental.query.options(joinedload(Rental.miner)).all()
+        return json.dumps([rental.to_dict() for rental in rentals])
+
+    def schema_orjson():
+        return app.json.dumps(RENTAL_SCHEMA.encode(RENTAL_SCHEMA.query().all()))
+
+    timings = {}
+    for name, encode in (('to_dict + json', to_dict_json), ('row schema + orjson', schema_orjson)):
+        started = time.perf_counter()
+        encode()
+        timings[name] = time.perf_counter() - started
+        print(f'{ROWS} rentals, {name}: {timings[name] * 1000:.0f} ms')
+    print(f"Speed-up: {timings['to_dict + json'] / timings['row schema + orjson']:.1f}x")
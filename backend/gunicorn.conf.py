@@ -0,0 +1,13 @@
+# Loaded automatically by gunicorn when it is started from backend/ (see Procfile and render.yaml)
+
+
+def post_worker_init(worker):
+    """Start the market data refresher in each web worker.
+
+    Only web processes refresh in the background; release, import and job
+    processes build the same app but fetch market data on demand.
+    """
+    flask_app = worker.wsgi
+    if flask_app.config['MARKET_REFRESHER_ENABLED']:
+        from app.utils.market_refresher import start_market_refresher
+        start_market_refresher(flask_app)
@@ -0,0 +1,38 @@
+"""stats rollup shards
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18 04:02:17.305118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0011'
+down_revision = '0010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The counters are derived data: recreate the table and let the next read rebuild them
+    op.drop_table('stats_rollup')
+    op.create_table('stats_rollup',
+    sa.Column('key', sa.String(length=64), nullable=False),
+    sa.Column('shard', sa.Integer(), nullable=False),
+    sa.Column('value', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('key', 'shard')
+    )
+
+
+def downgrade():
+    op.drop_table('stats_rollup')
+    op.create_table('stats_rollup',
+    sa.Column('key', sa.String(length=64), nullable=False),
+    sa.Column('value', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('key')
+    )
@@ -3,18 +3,12 @@ import sys
 
 sys.path.insert(0, os.path.dirname(__file__))
 
-from sqlalchemy import inspect
 from app import create_app, db
-from app.models import User, Miner, Rental, Referral, Payment, Payout, SystemSettings
+from app.models import User, Miner, Rental, Referral, Payment, Payout
 
+# Migrations run in the release step (flask --app run release), not on import
 app = create_app()
 
-with app.app_context():
-    inspector = inspect(db.engine)
-    if not inspector.has_table("users"):
-        db.create_all()
-        SystemSettings.initialize_defaults()
-
 @app.shell_context_processor
 def make_shell_context():
     return {
@@ -28,5 +22,11 @@ def make_shell_context():
     }
 
 if __name__ == '__main__':
+    from app.release import migrate_database
+    with app.app_context():
+        migrate_database()
+    if app.config['MARKET_REFRESHER_ENABLED']:
+        from app.utils.market_refresher import start_market_refresher
+        start_market_refresher(app)
     port = int(os.environ.get('PORT', 3000))
     app.run(host='0.0.0.0', port=port, debug=True)
@@ -1,4 +1,5 @@
 import pytest
+from sqlalchemy import event
 from app import create_app, db
 from app.models import User
 
@@ -37,3 +38,15 @@ def admin_token(client, admin_user):
         'password': 'password'
     })
     return response.get_json()['access_token']
+
+@pytest.fixture
+def captured_sql(app):
+    """Record every (statement, parameters) pair executed while the test body runs."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    yield statements
+    event.remove(db.engine, 'before_cursor_execute', record)
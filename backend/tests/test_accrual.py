@@ -0,0 +1,216 @@
+from datetime import date, datetime, timedelta
+import pytest
+from flask_jwt_extended import create_access_token
+from app import db
+from app.jobs import accrual
+from app.models import AccrualRun, EarningsLedger, Miner, Rental, User
+from app.utils.profit_calculator import calculate_daily_btc
+
+DAY = date(2026, 1, 15)
+NETWORK_TH = 600_000_000.0
+
+@pytest.fixture
+def market(monkeypatch):
+    """Pin the market snapshot used by the accrual run."""
+    monkeypatch.setattr(accrual, 'get_network_hashrate', lambda: NETWORK_TH)
+    monkeypatch.setattr(accrual, 'get_btc_price', lambda: 60000.0)
+
+@pytest.fixture
+def rentals(app):
+    """Create four active rentals and one that was never paid for (no rental window)."""
+    user = User(email='miner@example.com', referral_code='MINER001')
+    user.set_password('password')
+    miner = Miner(name='Test Miner', model='T1', hashrate_th=100, price_usd=1000, efficiency=30, power_watts=3000)
+    db.session.add_all([user, miner])
+    db.session.commit()
+    start = datetime(2026, 1, 1)
+    created = []
+    for i, hashrate in enumerate([10, 20, 30, 40, 50]):
+        paid = i != 4
+        rental = Rental(user_id=user.id, miner_id=miner.id, hashrate_allocated=hashrate, duration_days=30,
+                        monthly_fee_usd=50, is_active=paid, start_date=start if paid else None,
+                        end_date=start + timedelta(days=30) if paid else None)
+        db.session.add(rental)
+        created.append(rental)
+    db.session.commit()
+    return created
+
+def _expected(hashrate):
+    return calculate_daily_btc(hashrate, NETWORK_TH) * (1 - 5.0 / 100)
+
+def test_accrual_credits_active_rentals(market, rentals):
+    """Test that one accrual pass credits each active rental once."""
+    run = accrual.accrue_daily_earnings(DAY, chunk_size=2)
+    assert run.status == 'completed'
+    assert run.rentals_processed == 4
+    for rental in rentals:
+        db.session.refresh(rental)
+    assert rentals[0].total_profit_btc == pytest.approx(_expected(10))
+    assert rentals[3].total_profit_btc == pytest.approx(_expected(40))
+    assert rentals[4].total_profit_btc == 0.0
+
+def test_accrual_is_idempotent_per_day(market, rentals):
+    """Test that re-running a completed day changes nothing."""
+    accrual.accrue_daily_earnings(DAY, chunk_size=2)
+    accrual.accrue_daily_earnings(DAY, chunk_size=2)
+    db.session.refresh(rentals[1])
+    assert rentals[1].total_profit_btc == pytest.approx(_expected(20))
+    assert AccrualRun.query.count() == 1
+
+def test_accrual_resumes_from_checkpoint(market, rentals, monkeypatch):
+    """Test that a run interrupted mid-way resumes without double crediting."""
+    original_update = accrual.update
+    calls = {'rental_updates': 0}
+
+    def failing_update(table):
+        if table is Rental:
+            calls['rental_updates'] += 1
+            if calls['rental_updates'] == 2:
+                raise RuntimeError('worker killed')
+        return original_update(table)
+
+    monkeypatch.setattr(accrual, 'update', failing_update)
+    with pytest.raises(RuntimeError):
+        accrual.accrue_daily_earnings(DAY, chunk_size=2)
+    db.session.rollback()
+    assert AccrualRun.query.one().last_rental_id == rentals[1].id
+
+    monkeypatch.setattr(accrual, 'update', original_update)
+    run = accrual.accrue_daily_earnings(DAY, chunk_size=2)
+    assert run.rentals_processed == 4
+    for rental, hashrate in zip(rentals[:4], [10, 20, 30, 40]):
+        db.session.refresh(rental)
+        assert rental.total_profit_btc == pytest.approx(_expected(hashrate))
+
+def test_accrual_skips_rentals_outside_day(market, rentals):
+    """Test that rentals not running on the accrual day are not credited."""
+    run = accrual.accrue_daily_earnings(date(2026, 3, 1))
+    assert run.rentals_processed == 0
+
+def test_accrual_credits_last_day_after_expiry_sweep(market, rentals):
+    """Test that a rental ending during the day is credited even once the sweeper has deactivated it."""
+    rental = rentals[0]
+    rental.end_date = datetime.combine(DAY, datetime.min.time()) + timedelta(hours=6)
+    rental.is_active = False
+    db.session.commit()
+    accrual.accrue_daily_earnings(DAY)
+    db.session.refresh(rental)
+    assert rental.total_profit_btc == pytest.approx(_expected(10) / 4)
+    assert accrual.accrue_daily_earnings(DAY + timedelta(days=1)).rentals_processed == 3
+
+def test_rental_accrues_exactly_its_duration(market, rentals):
+    """Test that a 30-day rental starting mid-morning is credited 30 days of BTC, split over 31 calendar days."""
+    rental = rentals[0]
+    rental.start_date = datetime(2026, 1, 1, 10)
+    rental.end_date = rental.start_date + timedelta(days=30)
+    db.session.commit()
+    for offset in range(32):
+        accrual.accrue_daily_earnings(date(2026, 1, 1) + timedelta(days=offset))
+    db.session.refresh(rental)
+    assert rental.total_profit_btc == pytest.approx(_expected(10) * 30)
+    days = EarningsLedger.query.filter_by(rental_id=rental.id).order_by(EarningsLedger.day).all()
+    assert len(days) == 31
+    assert days[0].btc == pytest.approx(_expected(10) * 14 / 24)
+    assert days[-1].btc == pytest.approx(_expected(10) * 10 / 24)
+
+def test_cancelled_rental_stops_accruing(client, admin_token, market, rentals):
+    """Test that an admin deactivating a rental early ends its accrual, including for open windows from before."""
+    rental = rentals[0]
+    rental.end_date = datetime.utcnow() + timedelta(days=10)
+    rentals[1].is_active = False
+    rentals[1].end_date = datetime.utcnow() + timedelta(days=10)
+    db.session.commit()
+    response = client.put(f'/api/admin/rentals/{rental.id}', headers={'Authorization': f'Bearer {admin_token}'},
+                          json={'is_active': False})
+    assert response.status_code == 200
+    db.session.refresh(rental)
+    assert rental.end_date <= datetime.utcnow()
+
+    today = datetime.utcnow().date()
+    accrual.accrue_daily_earnings(today + timedelta(days=1))
+    db.session.refresh(rentals[1])
+    assert rentals[1].total_profit_btc == 0.0
+    assert EarningsLedger.query.filter_by(rental_id=rental.id).count() == 0
+
+def test_pending_days_catch_up_after_downtime(market, rentals):
+    """Test that days missed since the newest run, and unfinished runs, are accrued in order."""
+    assert accrual.pending_accrual_days(DAY) == [DAY]
+    accrual.accrue_daily_earnings(DAY - timedelta(days=3))
+    db.session.add(AccrualRun(day=DAY - timedelta(days=5), status='running', last_rental_id=0, rentals_processed=0,
+                              network_hashrate_th=NETWORK_TH, btc_price_usd=60000.0, net_btc_per_th=1e-8))
+    db.session.commit()
+    assert accrual.pending_accrual_days(DAY) == [DAY - timedelta(days=d) for d in (5, 2, 1, 0)]
+    assert accrual.pending_accrual_days(DAY, max_days=2) == [DAY - timedelta(days=1), DAY]
+
+    runs = accrual.accrue_pending_days(DAY)
+    assert [run.day for run in runs] == [DAY - timedelta(days=d) for d in (5, 2, 1, 0)]
+    assert all(run.status == 'completed' for run in runs)
+    assert accrual.pending_accrual_days(DAY) == []
+
+def test_accrue_cli_command(app, market, rentals):
+    """Test running the accrual through the flask CLI."""
+    result = app.test_cli_runner().invoke(args=['jobs', 'accrue', '--day', '2026-01-15'])
+    assert result.exit_code == 0
+    assert '4 rentals credited' in result.output
+
+def test_accrual_appends_ledger_rows(market, rentals):
+    """Test that each credited rental gets exactly one ledger row for the day."""
+    accrual.accrue_daily_earnings(DAY, chunk_size=2)
+    accrual.accrue_daily_earnings(DAY, chunk_size=2)
+    entries = EarningsLedger.query.order_by(EarningsLedger.rental_id).all()
+    assert [e.rental_id for e in entries] == [r.id for r in rentals[:4]]
+    assert entries[0].day == DAY
+    assert entries[0].btc == pytest.approx(_expected(10))
+    assert entries[0].usd_at_price == pytest.approx(_expected(10) * 60000.0)
+    assert entries[0].network_hashrate_snapshot == NETWORK_TH
+
+def test_earnings_history_endpoints(client, market, rentals):
+    """Test that user earnings history is read back from the ledger."""
+    accrual.accrue_daily_earnings(DAY)
+    accrual.accrue_daily_earnings(DAY + timedelta(days=1))
+    token = create_access_token(identity=str(rentals[0].user_id))
+    headers = {'Authorization': f'Bearer {token}'}
+
+    response = client.get(f'/api/rentals/{rentals[0].id}/earnings?from=2026-01-16', headers=headers)
+    assert response.status_code == 200
+    json_data = response.get_json()
+    assert [e['day'] for e in json_data['entries']] == ['2026-01-16']
+    assert json_data['total_btc'] == pytest.approx(_expected(10))
+
+    response = client.get('/api/rentals/earnings/history', headers=headers)
+    json_data = response.get_json()
+    assert [d['day'] for d in json_data['daily']] == ['2026-01-15', '2026-01-16']
+    assert json_data['monthly'] == [{'month': '2026-01', 'btc': pytest.approx(2 * _expected(100)),
+                                     'usd': pytest.approx(2 * _expected(100) * 60000.0)}]
+
+    response = client.get('/api/rentals/earnings/history?from=2026-02-01&to=2026-01-01', headers=headers)
+    assert response.status_code == 400
+
+def test_admin_earnings_report(client, admin_token, market, rentals):
+    """Test that admins get network-wide totals from the ledger."""
+    accrual.accrue_daily_earnings(DAY)
+    headers = {'Authorization': f'Bearer {admin_token}'}
+    response = client.get('/api/admin/earnings?from=2026-01-01&to=2026-01-31', headers=headers)
+    assert response.status_code == 200
+    json_data = response.get_json()
+    assert json_data['daily'][0]['rentals'] == 4
+    assert json_data['total_btc'] == pytest.approx(_expected(100))
+
+    assert client.get('/api/admin/earnings?from=2025-01-01&to=2026-06-30', headers=headers).status_code == 400
+
+def test_admin_earnings_report_defaults_to_recent_window(client, admin_token):
+    """Test that a report without a range covers the last 90 days only."""
+    response = client.get('/api/admin/earnings', headers={'Authorization': f'Bearer {admin_token}'})
+    assert response.status_code == 200
+    today = datetime.utcnow().date()
+    assert response.get_json()['to'] == today.isoformat()
+    assert response.get_json()['from'] == (today - timedelta(days=89)).isoformat()
+
+def test_admin_delete_rental_removes_ledger_rows(client, admin_token, market, rentals):
+    """Test that deleting a rental also deletes its ledger history."""
+    accrual.accrue_daily_earnings(DAY)
+    response = client.delete(f'/api/admin/rentals/{rentals[0].id}',
+                             headers={'Authorization': f'Bearer {admin_token}'})
+    assert response.status_code == 200
+    assert EarningsLedger.query.filter_by(rental_id=rentals[0].id).count() == 0
+    assert EarningsLedger.query.count() == 3
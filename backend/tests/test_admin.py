@@ -22,7 +22,7 @@ def test_get_dashboard_stats(client, admin_token):
 
 def test_get_all_users(client, admin_token, test_user):
     """Test retrieving all users."""
-    response = client.get('/api/admin/users', headers={'Authorization': f'Bearer {admin_token}'})
+    response = client.get('/api/admin/users?include_total=1', headers={'Authorization': f'Bearer {admin_token}'})
     assert response.status_code == 200
     json_data = response.get_json()
     assert json_data['total'] == 2
@@ -64,7 +64,7 @@ def test_get_all_rentals_admin(client, admin_token, test_user):
     db.session.add(rental)
     db.session.commit()
 
-    response = client.get('/api/admin/rentals', headers={'Authorization': f'Bearer {admin_token}'})
+    response = client.get('/api/admin/rentals?include_total=1', headers={'Authorization': f'Bearer {admin_token}'})
     assert response.status_code == 200
     json_data = response.get_json()
     assert json_data['total'] == 1
@@ -75,7 +75,7 @@ def test_get_all_payments_admin(client, admin_token, test_user):
     db.session.add(payment)
     db.session.commit()
 
-    response = client.get('/api/admin/payments', headers={'Authorization': f'Bearer {admin_token}'})
+    response = client.get('/api/admin/payments?include_total=1', headers={'Authorization': f'Bearer {admin_token}'})
     assert response.status_code == 200
     json_data = response.get_json()
     assert json_data['total'] == 1
@@ -97,3 +97,11 @@ def test_update_settings(client, admin_token):
         'referral_percentage': '7.5'
     })
     assert response.status_code == 200
+
+def test_get_upstream_status(client, admin_token):
+    """Test retrieving circuit breaker and HTTP pool stats."""
+    response = client.get('/api/admin/system/upstream', headers={'Authorization': f'Bearer {admin_token}'})
+    assert response.status_code == 200
+    json_data = response.get_json()
+    assert 'coinbase' in json_data['circuit_breakers']
+    assert 'pools' in json_data['http_pool']
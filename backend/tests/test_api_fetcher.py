@@ -1,7 +1,9 @@
 import pytest
 import requests
+import threading
 import time
 from unittest.mock import MagicMock
+from app.utils import api_fetcher
 from app.utils.api_fetcher import get_btc_price, get_network_hashrate, get_mining_difficulty, CircuitBreaker, cache, circuit_breakers
 
 @pytest.fixture(autouse=True)
@@ -22,7 +24,7 @@ def test_get_btc_price_success_coinbase(monkeypatch):
     mock_response = MagicMock()
     mock_response.raise_for_status.return_value = None
     mock_response.json.return_value = {'data': {'amount': '51000.00'}}
-    monkeypatch.setattr(requests, 'get', lambda *args, **kwargs: mock_response)
+    monkeypatch.setattr(api_fetcher, 'http_get', lambda *args, **kwargs: mock_response)
 
     price = get_btc_price()
     assert price == 51000.00
@@ -41,7 +43,7 @@ def test_get_btc_price_fallback_to_binance(monkeypatch):
         else:
             raise requests.exceptions.RequestException("Other API failed")
 
-    monkeypatch.setattr(requests, 'get', mock_get)
+    monkeypatch.setattr(api_fetcher, 'http_get', mock_get)
 
     price = get_btc_price()
     assert price == 52000.00
@@ -50,7 +52,7 @@ def test_get_btc_price_all_fail_fallback(monkeypatch):
     """Test fallback to default value when all APIs fail."""
     def mock_get_fail(*args, **kwargs):
         raise requests.exceptions.RequestException("API failed")
-    monkeypatch.setattr(requests, 'get', mock_get_fail)
+    monkeypatch.setattr(api_fetcher, 'http_get', mock_get_fail)
 
     price = get_btc_price()
     assert price == 50000.0
@@ -60,7 +62,7 @@ def test_get_network_hashrate_success(monkeypatch):
     mock_response = MagicMock()
     mock_response.raise_for_status.return_value = None
     mock_response.text = '600000000'
-    monkeypatch.setattr(requests, 'get', lambda *args, **kwargs: mock_response)
+    monkeypatch.setattr(api_fetcher, 'http_get', lambda *args, **kwargs: mock_response)
 
     hashrate = get_network_hashrate()
     assert hashrate == 600000.0
@@ -69,7 +71,7 @@ def test_get_network_hashrate_fail_fallback(monkeypatch):
     """Test network hashrate fallback on failure."""
     def mock_get_fail(*args, **kwargs):
         raise requests.exceptions.RequestException("API Error")
-    monkeypatch.setattr(requests, 'get', mock_get_fail)
+    monkeypatch.setattr(api_fetcher, 'http_get', mock_get_fail)
     hashrate = get_network_hashrate()
     assert hashrate == 500_000_000.0
 
@@ -78,7 +80,7 @@ def test_get_mining_difficulty_success(monkeypatch):
     mock_response = MagicMock()
     mock_response.raise_for_status.return_value = None
     mock_response.json.return_value = {'currentDifficulty': 60e12, 'difficultyChange': 1.2}
-    monkeypatch.setattr(requests, 'get', lambda *args, **kwargs: mock_response)
+    monkeypatch.setattr(api_fetcher, 'http_get', lambda *args, **kwargs: mock_response)
 
     difficulty = get_mining_difficulty()
     assert difficulty['difficulty'] == 60e12
@@ -108,3 +110,46 @@ def test_circuit_breaker_half_open_and_close():
 
     cb.record_success()
     assert cb.state == 'CLOSED'
+
+def test_get_btc_price_hedges_slow_primary(monkeypatch):
+    """Test that a slow primary source is hedged by the secondary."""
+    release = threading.Event()
+    primary_done = threading.Event()
+
+    def slow_coinbase():
+        release.wait(5)
+        primary_done.set()
+        return 99999.0
+
+    monkeypatch.setattr(api_fetcher, 'PRICE_SOURCES', [
+        ('Coinbase', slow_coinbase), ('Binance', lambda: 53000.0), ('CoinGecko', lambda: None)
+    ])
+    monkeypatch.setattr(api_fetcher, 'PRICE_HEDGE_DELAY', 0.01)
+
+    price = get_btc_price()
+    # Binance answered while Coinbase was still blocked
+    assert price == 53000.00
+    assert not primary_done.is_set()
+    release.set()
+    assert primary_done.wait(5)
+
+def test_get_network_stats_fetches_metrics_concurrently(monkeypatch):
+    """Test that cold price, hashrate and difficulty fetches run in parallel."""
+    # Each fetch waits for the other two; run one after another they would break the barrier
+    barrier = threading.Barrier(3, timeout=5)
+
+    def blocking(value):
+        def fetch():
+            barrier.wait()
+            return value
+        return fetch
+
+    monkeypatch.setattr(api_fetcher, 'MARKET_DATA_SOURCES', {
+        'btc_price': blocking(60000.0),
+        'network_hashrate': blocking(600000.0),
+        'difficulty': blocking({'difficulty': 1e13, 'adjustment': 0})
+    })
+
+    stats = api_fetcher.get_network_stats()
+    assert stats['btc_price'] == 60000.0
+    assert stats['network_hashrate_th'] == 600000.0
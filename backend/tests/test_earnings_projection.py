@@ -0,0 +1,52 @@
+import time
+import pytest
+from app.config import Config
+from app.utils.earnings_projection import block_reward_at, build_yield_curve, project_earnings, project_earnings_batch
+from app.utils.profit_calculator import estimate_earnings
+
+NETWORK_TH = 600_000_000
+# Start of a retarget epoch, well away from the next halving
+HEIGHT = 2016 * 440
+
+def test_block_reward_at_halvings():
+    """Test the subsidy schedule across halvings."""
+    assert block_reward_at(0) == 50.0
+    assert block_reward_at(839_999) == 6.25
+    assert block_reward_at(840_000) == 3.125
+
+def test_flat_projection_matches_estimate():
+    """Test that zero growth and no halving reproduce the scalar estimate."""
+    projection = project_earnings(100, 30, NETWORK_TH, 50000, HEIGHT, 0.0)
+    expected = estimate_earnings(100, 30, NETWORK_TH, 50000)
+    assert projection['total_btc'] == pytest.approx(expected['total_btc'])
+    assert projection['halving_day'] is None
+    assert len(projection['curve']) == 30
+
+def test_difficulty_growth_reduces_later_epochs():
+    """Test that positive difficulty growth lowers yield after each retarget."""
+    curve = build_yield_curve(28, NETWORK_TH, HEIGHT, difficulty_growth_percent=10.0)
+    first_day = curve[0]
+    after_retarget = curve[27] - curve[26]
+    assert after_retarget == pytest.approx(first_day / 1.1)
+
+def test_halving_inside_horizon():
+    """Test that the subsidy halves at the next halving height."""
+    height = 1_050_000 - Config.BLOCKS_PER_DAY * 10
+    projection = project_earnings(100, 20, NETWORK_TH, 50000, height, 0.0)
+    assert projection['halving_day'] == 10
+    curve = build_yield_curve(20, NETWORK_TH, height, 0.0)
+    assert curve[19] - curve[18] == pytest.approx((curve[9] - curve[8]) / 2)
+
+def test_batch_projection_is_fast():
+    """Test that a year of projections for hundreds of rentals stays cheap."""
+    hashrates = [float(50 + i) for i in range(500)]
+    durations = [365 - (i % 300) for i in range(500)]
+
+    started = time.perf_counter()
+    results = project_earnings_batch(hashrates, durations, NETWORK_TH, 50000, HEIGHT, 2.0)
+    elapsed = time.perf_counter() - started
+
+    assert len(results) == 500
+    assert elapsed < 0.05
+    single = project_earnings(hashrates[3], durations[3], NETWORK_TH, 50000, HEIGHT, 2.0)
+    assert results[3]['total_btc'] == pytest.approx(single['total_btc'])
@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta
+from sqlalchemy import text
+from app import db
+from app.jobs.expiry import expire_rentals
+from app.models import Miner, Rental, User
+
+NOW = datetime(2026, 2, 1, 12, 0)
+
+def _setup():
+    user = User(email='miner@example.com', referral_code='MINER001')
+    user.set_password('password')
+    miners = [
+        Miner(name=f'Miner {i}', model='T1', hashrate_th=100, price_usd=1000, efficiency=30,
+              power_watts=3000, available_units=10)
+        for i in range(2)
+    ]
+    db.session.add_all([user, *miners])
+    db.session.commit()
+    return user, miners
+
+def _rental(user, miner, end_date, is_active=True):
+    return Rental(user_id=user.id, miner_id=miner.id, hashrate_allocated=10, duration_days=30,
+                  monthly_fee_usd=50, is_active=is_active, start_date=end_date - timedelta(days=30),
+                  end_date=end_date)
+
+def test_expire_rentals_frees_units(app):
+    """Test that expired rentals are deactivated and their units returned in batches."""
+    user, (miner_a, miner_b) = _setup()
+    past = NOW - timedelta(days=1)
+    rentals = [_rental(user, miner_a, past) for _ in range(3)]
+    rentals += [_rental(user, miner_b, past) for _ in range(2)]
+    live = _rental(user, miner_a, NOW + timedelta(days=5))
+    already_inactive = _rental(user, miner_b, past, is_active=False)
+    db.session.add_all([*rentals, live, already_inactive])
+    db.session.commit()
+
+    assert expire_rentals(now=NOW, batch_size=2) == 5
+    db.session.expire_all()
+    assert all(not r.is_active for r in rentals)
+    assert live.is_active
+    assert miner_a.available_units == 13
+    assert miner_b.available_units == 12
+
+    assert expire_rentals(now=NOW) == 0
+    db.session.expire_all()
+    assert miner_a.available_units == 13
+
+def test_admin_stats_drop_expired_rentals(client, admin_token):
+    """Test that active rental counts shrink once the sweeper runs."""
+    user, (miner, _) = _setup()
+    db.session.add(_rental(user, miner, datetime.utcnow() - timedelta(hours=1)))
+    db.session.commit()
+    headers = {'Authorization': f'Bearer {admin_token}'}
+    stats = client.get('/api/admin/stats', headers=headers).get_json()
+    assert stats['rentals']['active'] == 1
+    assert stats['hashrate']['total_active_th'] == 10
+
+    expire_rentals()
+    stats = client.get('/api/admin/stats', headers=headers).get_json()
+    assert stats['rentals']['active'] == 0
+    assert stats['hashrate']['total_active_th'] == 0
+
+def test_expiry_query_uses_index(app):
+    """Test that the expiry predicate is served by the (is_active, end_date) index."""
+    plan = db.session.execute(text(
+        'EXPLAIN QUERY PLAN SELECT id FROM rentals WHERE is_active = 1 AND end_date < :now'
+    ), {'now': NOW}).all()
+    assert any('ix_rentals_is_active_end_date' in row[-1] for row in plan)
@@ -0,0 +1,64 @@
+import csv
+import io
+import json
+from datetime import datetime
+import pytest
+from app import db
+from app.models import Payment, User
+from app.utils.export import build_export_query, generate_export
+
+@pytest.fixture
+def payments(app, admin_user):
+    """Three payments on different days with mixed statuses."""
+    user = User(email='payer@example.com', referral_code='PAYER001')
+    user.set_password('password')
+    db.session.add(user)
+    db.session.flush()
+    for day, status in ((1, 'pending'), (2, 'confirmed'), (3, 'pending')):
+        db.session.add(Payment(user_id=user.id, amount_usd=100 * day, status=status,
+                               tx_hash=f'tx{day}', created_at=datetime(2026, 3, day, 12, 0)))
+    db.session.commit()
+    return user
+
+def test_csv_export_streams_projected_columns(client, admin_token, payments):
+    """Test that the CSV export streams a header plus one row per payment, oldest first."""
+    response = client.get('/api/admin/export/payments', headers={'Authorization': f'Bearer {admin_token}'})
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.mimetype == 'text/csv'
+    assert 'attachment' in response.headers['Content-Disposition']
+
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert [r['tx_hash'] for r in rows] == ['tx1', 'tx2', 'tx3']
+    assert rows[0]['created_at'] == '2026-03-01T12:00:00'
+
+def test_ndjson_export_applies_filters(client, admin_token, payments):
+    """Test that status and date-range filters narrow the NDJSON export."""
+    response = client.get('/api/admin/export/payments?format=ndjson&status=pending&from=2026-03-02&to=2026-03-03',
+                          headers={'Authorization': f'Bearer {admin_token}'})
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [line['tx_hash'] for line in lines] == ['tx3']
+    assert lines[0]['amount_usd'] == 300
+
+def test_users_export_omits_password_hash(client, admin_token, payments):
+    """Test that the users export only carries the projected columns."""
+    response = client.get('/api/admin/export/users?format=ndjson', headers={'Authorization': f'Bearer {admin_token}'})
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert {line['email'] for line in lines} == {'admin@example.com', 'payer@example.com'}
+    assert all('password_hash' not in line for line in lines)
+
+def test_export_batches_rows(app, payments):
+    """Test that the generator yields one chunk per fetched batch rather than buffering everything."""
+    chunks = list(generate_export(db.session, 'payments', 'ndjson', build_export_query('payments'), batch_size=1))
+    assert len(chunks) == 3
+
+@pytest.mark.parametrize('url, status', [
+    ('/api/admin/export/miners', 404),
+    ('/api/admin/export/payments?format=xml', 400),
+    ('/api/admin/export/rentals?status=pending', 400),
+    ('/api/admin/export/payments?from=not-a-date', 400),
+])
+def test_export_rejects_bad_requests(client, admin_token, url, status):
+    """Test that unknown entities, formats and filters are rejected before streaming."""
+    assert client.get(url, headers={'Authorization': f'Bearer {admin_token}'}).status_code == status
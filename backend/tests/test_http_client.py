@@ -0,0 +1,100 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import requests
+from app.utils import http_client
+
+class _PriceHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = b'{"price": "50000.00"}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class _SlowHandler(_PriceHandler):
+    requests_seen = 0
+
+    def do_GET(self):
+        type(self).requests_seen += 1
+        time.sleep(0.5)
+        super().do_GET()
+
+def _serve(handler):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}'
+
+@pytest.fixture
+def local_server():
+    """Serve a tiny keep-alive JSON endpoint on localhost."""
+    server, url = _serve(_PriceHandler)
+    yield url
+    server.shutdown()
+
+@pytest.fixture
+def slow_server(monkeypatch):
+    """Serve the JSON endpoint after a half-second delay, counting requests."""
+    monkeypatch.setattr(_SlowHandler, 'requests_seen', 0)
+    server, url = _serve(_SlowHandler)
+    yield url
+    server.shutdown()
+
+@pytest.fixture(autouse=True)
+def fresh_sessions(monkeypatch):
+    """Start every test without a pooled session."""
+    monkeypatch.setattr(http_client, '_sessions', {})
+
+def test_session_is_reused_within_process():
+    """Test that every fetcher call shares one pooled session."""
+    assert http_client.get_session() is http_client.get_session()
+
+def test_adapter_pool_and_retry_configuration():
+    """Test the tuned adapter settings on the shared session."""
+    adapter = http_client.get_session().get_adapter('https://api.coinbase.com')
+    assert adapter._pool_maxsize == http_client.POOL_MAXSIZE
+    assert adapter._pool_block is True
+    assert adapter.max_retries.total == http_client.RETRY_TOTAL
+    assert adapter.max_retries.read is False
+    assert adapter.pool_timeout == http_client.POOL_TIMEOUT
+    assert 429 not in adapter.max_retries.status_forcelist
+
+def test_connections_are_kept_alive(local_server):
+    """Test that repeated requests to one host reuse a single connection."""
+    for _ in range(3):
+        response = http_client.http_get(f'{local_server}/ticker')
+        assert response.json()['price'] == '50000.00'
+
+    stats = http_client.get_pool_stats()
+    assert stats['session_active']
+    pool = next(p for p in stats['pools'] if p['host'] == '127.0.0.1')
+    assert pool['connections_opened'] == 1
+    assert pool['requests_sent'] == 3
+
+def test_read_timeout_is_not_retried(slow_server):
+    """Test that a read timeout reaches the caller after one attempt."""
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        http_client.http_get(f'{slow_server}/ticker', timeout=0.1)
+    assert _SlowHandler.requests_seen == 1
+
+def test_pool_wait_is_bounded(slow_server, monkeypatch):
+    """Test that a caller blocked on a full pool fails after pool_timeout instead of waiting forever."""
+    session = http_client.build_session(pool_maxsize=1, pool_timeout=0.1)
+    monkeypatch.setitem(http_client._sessions, http_client.os.getpid(), session)
+    holder = threading.Thread(target=http_client.http_get, args=(f'{slow_server}/ticker',))
+    holder.start()
+    time.sleep(0.1)
+
+    started = time.monotonic()
+    with pytest.raises(requests.exceptions.ConnectionError):
+        http_client.http_get(f'{slow_server}/ticker')
+    assert time.monotonic() - started < 0.4
+    holder.join()
@@ -0,0 +1,69 @@
+import io
+import json
+from sqlalchemy import inspect
+from app import db
+from app.models import Miner, Referral, Rental, User
+from app.utils.bulk_import import import_records, read_records
+from app.utils.referral_codes import decode_referral_code
+
+USERS_CSV = """email,password_hash,referral_code,is_admin,created_at,referrer_code
+late@example.com,pbkdf2:sha256:1000$salt$hash,,false,2026-02-01T10:00:00,LEGACY01
+legacy@example.com,pbkdf2:sha256:1000$salt$hash,LEGACY01,true,2026-01-01T10:00:00,
+orphan@example.com,pbkdf2:sha256:1000$salt$hash,,,,NOSUCHCODE
+"""
+
+def test_csv_users_import_links_referrers_in_second_pass(app):
+    """Test that referrer codes resolve even when the referrer appears later in the file."""
+    imported, linked = import_records('users', read_records(io.StringIO(USERS_CSV), 'csv'), batch_size=1)
+    assert (imported, linked) == (3, 1)
+
+    late = User.query.filter_by(email='late@example.com').one()
+    legacy = User.query.filter_by(email='legacy@example.com').one()
+    orphan = User.query.filter_by(email='orphan@example.com').one()
+    assert late.referred_by == legacy.id
+    assert orphan.referred_by is None
+    assert legacy.referral_code == 'LEGACY01' and legacy.is_admin
+    assert decode_referral_code(late.referral_code) == late.id
+    assert orphan.created_at is not None and orphan.is_admin is False
+    assert [(r.referrer_id, r.referred_id) for r in Referral.query.all()] == [(legacy.id, late.id)]
+
+def test_import_rebuilds_deferred_indexes(app):
+    """Test that the non-unique indexes dropped for the load exist again afterwards."""
+    before = {index['name'] for index in inspect(db.engine).get_indexes('users')}
+    import_records('users', read_records(io.StringIO(USERS_CSV), 'csv'), defer_indexes=True)
+    assert {index['name'] for index in inspect(db.engine).get_indexes('users')} == before
+
+def test_import_keeps_indexes_by_default(app, captured_sql):
+    """Test that indexes are only dropped when the caller opts in."""
+    import_records('users', read_records(io.StringIO(USERS_CSV), 'csv'))
+    assert not any('DROP INDEX' in statement.upper() for statement, _ in captured_sql)
+
+def test_ndjson_rentals_resolve_user_email(app):
+    """Test that NDJSON rentals may name their user by email and keep typed values."""
+    user = User(email='renter@example.com', referral_code='RENTER01')
+    user.set_password('password')
+    miner = Miner(name='M', model='M1', hashrate_th=100, price_usd=1000, efficiency=30, power_watts=3000)
+    db.session.add_all([user, miner])
+    db.session.commit()
+    lines = '\n'.join(json.dumps(record) for record in (
+        {'user_email': 'renter@example.com', 'miner_id': miner.id, 'hashrate_allocated': 50.0,
+         'duration_days': 30, 'monthly_fee_usd': 12.5, 'is_active': True, 'start_date': '2026-03-01T00:00:00'},
+        {'user_id': user.id, 'miner_id': miner.id, 'hashrate_allocated': 25, 'duration_days': 7, 'monthly_fee_usd': 3}
+    ))
+
+    imported, _ = import_records('rentals', read_records(io.StringIO(lines), 'ndjson'))
+    assert imported == 2
+    rentals = Rental.query.order_by(Rental.id).all()
+    assert [r.user_id for r in rentals] == [user.id, user.id]
+    assert rentals[0].is_active and rentals[0].start_date.day == 1
+    assert rentals[1].is_active is False and rentals[1].total_profit_btc == 0.0
+
+def test_import_command(app, tmp_path):
+    """Test the flask import command end to end."""
+    source = tmp_path / 'users.csv'
+    source.write_text(USERS_CSV)
+    result = app.test_cli_runner().invoke(args=['import', 'users', str(source)])
+    assert result.exit_code == 0, result.output
+    assert 'Imported 3 users' in result.output
+    assert 'Linked 1 users' in result.output
+    assert User.query.count() == 3
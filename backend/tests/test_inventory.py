@@ -0,0 +1,116 @@
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import pytest
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.config import TestingConfig
+from app.jobs.reservations import release_expired_reservations
+from app.models import InventoryReservation, Job, Miner, Payment, Rental, User
+from app.utils.stats_rollup import get_rollup
+
+def _buyer(email='buyer@example.com'):
+    user = User(email=email, referral_code=email[:8].upper())
+    user.set_password('password')
+    db.session.add(user)
+    db.session.commit()
+    return {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+
+def _miner(units):
+    miner = Miner(name='Test Miner', model='T1', hashrate_th=100, price_usd=1000, efficiency=30,
+                  power_watts=3000, available_units=units)
+    db.session.add(miner)
+    db.session.commit()
+    return miner
+
+def _checkout(client, headers, miner_id):
+    return client.post('/api/payments/checkout', headers=headers,
+                       json={'miner_id': miner_id, 'hashrate_allocated': 10, 'duration_days': 30})
+
+def test_checkout_reserves_and_confirm_commits(client):
+    """Test that checkout holds a unit, confirmation keeps it and a sold-out miner rejects checkout."""
+    headers = _buyer()
+    miner = _miner(units=1)
+
+    response = _checkout(client, headers, miner.id)
+    assert response.status_code == 201
+    db.session.expire_all()
+    assert miner.available_units == 0
+    reservation = db.session.get(InventoryReservation, response.get_json()['rental']['id'])
+    assert reservation.status == 'pending'
+
+    assert _checkout(client, headers, miner.id).status_code == 400
+    assert Rental.query.count() == 1
+
+    payment_id = response.get_json()['payment']['id']
+    assert client.put(f'/api/payments/{payment_id}/simulate-confirm', headers=headers).status_code == 200
+    db.session.expire_all()
+    assert reservation.status == 'committed'
+    assert miner.available_units == 0
+
+def test_admin_confirm_claims_reservation(client, admin_token):
+    """Test that an admin confirmation activates through the job, committing the hold and setting the window."""
+    headers = _buyer()
+    miner = _miner(units=1)
+    order = _checkout(client, headers, miner.id).get_json()
+
+    response = client.put(f"/api/admin/payments/{order['payment']['id']}/status",
+                          headers={'Authorization': f'Bearer {admin_token}'}, json={'status': 'confirmed'})
+    assert response.status_code == 200
+    db.session.expire_all()
+    rental = db.session.get(Rental, order['rental']['id'])
+    assert rental.is_active
+    assert rental.end_date - rental.start_date == timedelta(days=30)
+    assert db.session.get(InventoryReservation, rental.id).status == 'committed'
+    assert release_expired_reservations(now=datetime.utcnow() + timedelta(hours=1)) == 0
+    assert miner.available_units == 0
+
+def test_expired_reservations_are_released(client, admin_token):
+    """Test that the reaper returns abandoned holds and a late payment for a sold-out miner is flagged for refund."""
+    headers = _buyer()
+    miner = _miner(units=1)
+    order = _checkout(client, headers, miner.id).get_json()
+    payment_id = order['payment']['id']
+
+    assert release_expired_reservations() == 0
+    assert release_expired_reservations(now=datetime.utcnow() + timedelta(hours=1)) == 1
+    db.session.expire_all()
+    assert miner.available_units == 1
+
+    other = _buyer('other@example.com')
+    assert _checkout(client, other, miner.id).status_code == 201
+    assert client.put(f'/api/payments/{payment_id}/simulate-confirm', headers=headers).status_code == 200
+    db.session.expire_all()
+    assert miner.available_units == 0
+    assert Job.query.one().status == 'done'
+    assert not db.session.get(Rental, order['rental']['id']).is_active
+    assert db.session.get(Payment, payment_id).status == 'refund_required'
+    assert get_rollup()['payments_refund_required'] == 1
+    admin_payments = client.get('/api/admin/payments?status=refund_required&include_total=1',
+                                headers={'Authorization': f'Bearer {admin_token}'}).get_json()
+    assert [p['id'] for p in admin_payments['payments']] == [payment_id]
+
+@pytest.fixture
+def file_app(monkeypatch, tmp_path):
+    """An app on a SQLite file so concurrent requests use separate connections."""
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f'sqlite:///{tmp_path / "inventory.db"}')
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+def test_concurrent_checkouts_never_oversell(file_app):
+    """Test that 500 concurrent checkouts for 50 units sell exactly 50."""
+    headers = _buyer()
+    miner_id = _miner(units=50).id
+    client = file_app.test_client()
+
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        statuses = Counter(pool.map(lambda _: _checkout(client, headers, miner_id).status_code, range(500)))
+
+    assert statuses == {201: 50, 400: 450}
+    db.session.expire_all()
+    assert db.session.get(Miner, miner_id).available_units == 0
+    assert InventoryReservation.query.count() == Rental.query.count() == 50
@@ -0,0 +1,77 @@
+import json
+from app import db
+from app.jobs import queue
+from app.jobs.queue import enqueue, run_jobs, run_next_job
+from app.models import Job, Miner, Payout, Referral, Rental, User
+
+def _referred_order(client):
+    referrer = client.post('/api/auth/register', json={'email': 'ref@example.com', 'password': 'password'}).get_json()
+    client.post('/api/auth/register', json={
+        'email': 'buyer@example.com', 'password': 'password',
+        'referral_code': referrer['user']['referral_code']
+    })
+    token = client.post('/api/auth/login', json={
+        'email': 'buyer@example.com', 'password': 'password'
+    }).get_json()['access_token']
+    headers = {'Authorization': f'Bearer {token}'}
+    miner = Miner(name='Test Miner', model='T1', hashrate_th=100, price_usd=1000, efficiency=30, power_watts=3000)
+    db.session.add(miner)
+    db.session.commit()
+    order = client.post('/api/payments/checkout', headers=headers,
+                        json={'miner_id': miner.id, 'hashrate_allocated': 50, 'duration_days': 30}).get_json()
+    return headers, order
+
+def test_confirmation_only_queues_side_effects(app, client):
+    """Test that a worker, not the request, activates the rental and pays the referrer."""
+    app.config['JOB_QUEUE_INLINE'] = False
+    headers, order = _referred_order(client)
+
+    response = client.put(f'/api/payments/{order["payment"]["id"]}/simulate-confirm', headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()['payment']['status'] == 'confirmed'
+    rental = db.session.get(Rental, order['rental']['id'])
+    assert not rental.is_active
+    assert Payout.query.count() == 0
+    assert json.loads(Job.query.one().payload) == {'rental_id': rental.id, 'payment_id': order['payment']['id']}
+
+    assert run_jobs() == 1
+    db.session.expire_all()
+    assert rental.is_active and rental.end_date
+    assert Payout.query.one().amount_usd == Referral.query.one().commission_earned_usd
+    assert Job.query.one().status == 'done'
+
+def test_activation_job_is_idempotent(app, client):
+    """Test that activating twice credits the referrer once."""
+    headers, order = _referred_order(client)
+    client.put(f'/api/payments/{order["payment"]["id"]}/simulate-confirm', headers=headers)
+    response = client.put(f'/api/rentals/{order["rental"]["id"]}/activate', headers=headers)
+    assert response.status_code == 202
+    assert response.get_json()['rental']['is_active']
+    assert Payout.query.count() == 1
+    assert Job.query.filter_by(status='done').count() == 2
+
+def test_failing_job_retries_then_dead_letters(app, monkeypatch):
+    """Test that a failing job backs off between attempts and is parked after max_attempts."""
+    calls = []
+
+    def explode(**payload):
+        calls.append(payload)
+        db.session.add(User(email='ghost@example.com', password_hash='x', referral_code='GHOST001'))
+        raise ValueError('boom')
+
+    monkeypatch.setattr(queue, '_handlers', lambda: {'explode': explode})
+    app.config['JOB_RETRY_DELAY'] = 0
+    job = enqueue('explode', value=1)
+    job.max_attempts = 2
+    db.session.commit()
+
+    run_next_job()
+    db.session.expire_all()
+    assert (job.status, job.attempts, job.last_error) == ('pending', 1, 'ValueError: boom')
+    assert User.query.filter_by(email='ghost@example.com').count() == 0
+
+    assert run_jobs() == 1
+    db.session.expire_all()
+    assert (job.status, job.attempts) == ('dead', 2)
+    assert calls == [{'value': 1}, {'value': 1}]
+    assert run_jobs() == 0
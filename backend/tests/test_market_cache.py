@@ -0,0 +1,83 @@
+import threading
+import time
+from datetime import datetime, timedelta
+import pytest
+from app.utils import api_fetcher
+from app.utils.market_cache import MarketDataCache, MemoryCacheBackend, SQLiteCacheBackend
+
+@pytest.fixture
+def shared_backend(monkeypatch, tmp_path):
+    """Point the fetcher cache at a throwaway SQLite file for the test."""
+    backend = SQLiteCacheBackend(str(tmp_path / 'market.sqlite3'))
+    monkeypatch.setattr(api_fetcher.cache, 'backend', backend)
+    yield backend
+    backend.clear()
+
+def test_sqlite_backend_shared_between_instances(tmp_path):
+    """Test that two backends on the same file (two workers) see the same entries."""
+    path = str(tmp_path / 'market.sqlite3')
+    worker_a = MarketDataCache(SQLiteCacheBackend(path))
+    worker_b = MarketDataCache(SQLiteCacheBackend(path))
+
+    fetched_at = datetime.utcnow()
+    worker_a['difficulty'] = ({'difficulty': 1.5e13, 'adjustment': 2.1}, fetched_at)
+
+    data, cached_time = worker_b['difficulty']
+    assert data == {'difficulty': 1.5e13, 'adjustment': 2.1}
+    assert abs((cached_time - fetched_at).total_seconds()) < 0.001
+    assert 'btc_price' not in worker_b
+
+def test_sqlite_single_flight_is_exclusive(tmp_path):
+    """Test that only one worker at a time holds the refresh lock for a key."""
+    path = str(tmp_path / 'market.sqlite3')
+    worker_a = MarketDataCache(SQLiteCacheBackend(path))
+    worker_b = MarketDataCache(SQLiteCacheBackend(path))
+
+    with worker_a.single_flight('btc_price') as leader_a:
+        with worker_b.single_flight('btc_price') as leader_b:
+            assert leader_a
+            assert not leader_b
+
+    with worker_b.single_flight('btc_price') as leader_b:
+        assert leader_b
+
+def test_sqlite_expired_lock_is_reclaimed(tmp_path):
+    """Test that a lock left behind by a crashed worker expires."""
+    backend = SQLiteCacheBackend(str(tmp_path / 'market.sqlite3'))
+    assert backend.acquire('btc_price', ttl=0.05) is not None
+    assert backend.acquire('btc_price') is None
+    time.sleep(0.1)
+    assert backend.acquire('btc_price') is not None
+
+def test_get_cached_or_fetch_single_flight(shared_backend):
+    """Test that concurrent misses trigger a single upstream fetch."""
+    calls = []
+
+    def slow_fetch():
+        calls.append(1)
+        time.sleep(0.2)
+        return 42000.0
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(api_fetcher.get_cached_or_fetch('btc_price', slow_fetch)))
+        for _ in range(5)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert results == [42000.0] * 5
+
+def test_get_cached_or_fetch_serves_stale_during_refresh(monkeypatch):
+    """Test that a stale value is served while another caller is refreshing."""
+    backend = MemoryCacheBackend()
+    monkeypatch.setattr(api_fetcher.cache, 'backend', backend)
+    api_fetcher.cache['btc_price'] = (40000.0, datetime.utcnow() - timedelta(hours=1))
+
+    with api_fetcher.cache.single_flight('btc_price'):
+        price = api_fetcher.get_cached_or_fetch('btc_price', lambda: 99999.0)
+
+    assert price == 40000.0
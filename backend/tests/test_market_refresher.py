@@ -0,0 +1,88 @@
+import os
+import runpy
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+import pytest
+from app import create_app, db
+from app.config import TestingConfig
+from app.models import Miner
+from app.utils import api_fetcher
+from app.utils.market_cache import MemoryCacheBackend
+from app.utils import market_refresher
+from app.utils.market_refresher import MarketDataRefresher
+
+@pytest.fixture(autouse=True)
+def isolated_cache(monkeypatch):
+    """Give every test an empty in-memory market cache."""
+    monkeypatch.setattr(api_fetcher.cache, 'backend', MemoryCacheBackend())
+
+def _prime(key, value, age):
+    api_fetcher.cache[key] = (value, datetime.utcnow() - timedelta(seconds=age))
+
+def test_stale_value_returned_immediately_and_revalidated():
+    """Test that an expired entry is served at once and refreshed in the background."""
+    _prime('btc_price', 40000.0, age=api_fetcher.CACHE_DURATION.total_seconds() + 60)
+
+    def slow_fetch():
+        time.sleep(0.1)
+        return 45000.0
+
+    started = time.monotonic()
+    price, age = api_fetcher.get_cached_with_age('btc_price', slow_fetch)
+    assert time.monotonic() - started < 0.05
+    assert price == 40000.0
+    assert age > api_fetcher.CACHE_DURATION.total_seconds()
+
+    deadline = time.monotonic() + 2
+    while api_fetcher.cache['btc_price'][0] != 45000.0 and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert api_fetcher.cache['btc_price'][0] == 45000.0
+
+def test_refresher_only_refreshes_keys_near_expiry():
+    """Test that the refresher picks up missing and nearly expired keys."""
+    fresh_age = 10
+    due_age = api_fetcher.CACHE_DURATION.total_seconds() - 30
+    _prime('btc_price', 40000.0, age=fresh_age)
+    _prime('network_hashrate', 600000.0, age=due_age)
+
+    calls = []
+    sources = {
+        'btc_price': lambda: calls.append('btc_price') or 41000.0,
+        'network_hashrate': lambda: calls.append('network_hashrate') or 610000.0,
+        'difficulty': lambda: calls.append('difficulty') or {'difficulty': 1e13, 'adjustment': 0}
+    }
+    refresher = MarketDataRefresher(interval=60, sources=sources)
+
+    assert sorted(refresher.due_keys()) == ['difficulty', 'network_hashrate']
+    assert sorted(refresher.run_once()) == ['difficulty', 'network_hashrate']
+    assert sorted(calls) == ['difficulty', 'network_hashrate']
+    assert api_fetcher.cache['btc_price'][0] == 40000.0
+    assert api_fetcher.cache['network_hashrate'][0] == 610000.0
+
+def test_estimate_reports_market_data_age(client):
+    """Test that the estimate endpoint serves cached data together with its age."""
+    for key, value in (('btc_price', 60000.0), ('network_hashrate', 600000000.0),
+                       ('difficulty', {'difficulty': 1e13, 'adjustment': 0}), ('block_height', 870000)):
+        _prime(key, value, age=120)
+    miner = Miner(name='Test Miner', model='T1', hashrate_th=100, price_usd=1000, efficiency=30, power_watts=3000)
+    db.session.add(miner)
+    db.session.commit()
+
+    response = client.post(f'/api/miners/{miner.id}/estimate', json={'duration_days': 30})
+    assert response.status_code == 200
+    json_data = response.get_json()
+    assert json_data['btc_price'] == 60000.0
+    assert json_data['market_data_age_seconds'] >= 120
+
+def test_refresher_starts_only_in_web_workers(monkeypatch):
+    """Test that building the app (CLI, job processes) never starts the refresher but a gunicorn worker does."""
+    started = []
+    monkeypatch.setattr(market_refresher, 'start_market_refresher', started.append)
+    monkeypatch.setattr(TestingConfig, 'MARKET_REFRESHER_ENABLED', True)
+    app = create_app('testing')
+    assert started == []
+
+    hooks = runpy.run_path(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'gunicorn.conf.py'))
+    hooks['post_worker_init'](SimpleNamespace(wsgi=app))
+    assert started == [app]
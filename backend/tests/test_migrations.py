@@ -0,0 +1,76 @@
+import pytest
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from flask_migrate import downgrade, stamp, upgrade
+from sqlalchemy import inspect
+from app import create_app, db
+from app.config import TestingConfig
+
+@pytest.fixture
+def file_app(monkeypatch, tmp_path):
+    """An app bound to an empty SQLite file so migrations run on a real database."""
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f'sqlite:///{tmp_path / "migrations.db"}')
+    app = create_app('testing')
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+def _schema_diff():
+    with db.engine.connect() as connection:
+        return compare_metadata(MigrationContext.configure(connection), db.metadata)
+
+def test_migrations_match_models(file_app):
+    """Test that upgrading an empty database to head yields exactly the model schema."""
+    upgrade()
+    assert _schema_diff() == []
+
+def test_migrations_downgrade_to_base(file_app):
+    """Test that every migration can be rolled back."""
+    upgrade()
+    downgrade(revision='base')
+    assert inspect(db.engine).get_table_names() == ['alembic_version']
+
+def test_legacy_database_upgrades_from_baseline(file_app):
+    """Test that a database created by create_all before migrations can be stamped and upgraded."""
+    upgrade(revision='0001')
+    db.session.execute(db.text('DROP TABLE alembic_version'))
+    db.session.commit()
+
+    stamp(revision='0001')
+    upgrade()
+    index_names = {index['name'] for index in inspect(db.engine).get_indexes('payments')}
+    assert 'ix_payments_tx_hash' in index_names
+
+def test_duplicate_tx_hashes_are_suffixed_before_unique_index(file_app):
+    """Test that upgrading past 0003 keeps the earliest tx_hash and renames the duplicates."""
+    upgrade(revision='0002')
+    for payment_id in (1, 2):
+        db.session.execute(db.text(
+            "INSERT INTO payments (id, user_id, amount_usd, tx_hash, status) VALUES (:id, 1, 10, 'dup', 'pending')"
+        ), {'id': payment_id})
+    db.session.commit()
+
+    upgrade()
+    hashes = db.session.execute(db.text('SELECT id, tx_hash FROM payments ORDER BY id')).all()
+    assert [tuple(row) for row in hashes] == [(1, 'dup'), (2, 'dup-dup-2')]
+
+def test_release_command_migrates_and_seeds(file_app):
+    """Test that the release step creates a fresh database and is safe to re-run."""
+    runner = file_app.test_cli_runner()
+    result = runner.invoke(args=['release'])
+    assert result.exit_code == 0, result.output
+    assert 'created and seeded' in result.output
+    assert _schema_diff() == []
+    assert 'Database migrated' in runner.invoke(args=['release']).output
+
+def test_null_created_at_is_backfilled(file_app):
+    """Test that rows without created_at get a sortable value before the column becomes NOT NULL."""
+    upgrade(revision='0009')
+    db.session.execute(db.text(
+        "INSERT INTO users (id, email, password_hash, referral_code, created_at) VALUES (1, 'a@b.c', 'x', 'A1', NULL)"
+    ))
+    db.session.commit()
+
+    upgrade()
+    assert db.session.execute(db.text('SELECT created_at FROM users')).scalar() == '1970-01-01 00:00:00'
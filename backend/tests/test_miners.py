@@ -29,3 +29,116 @@ def test_get_miners(client, admin_token):
     json_data = response.get_json()
     assert len(json_data) == 1
     assert json_data[0]['name'] == 'Test Miner'
+
+def test_estimate_batch_whole_catalogue(client, admin_token):
+    """Test pricing every miner in one batch request."""
+    from datetime import datetime
+    from app.models import Miner
+    from app.utils import api_fetcher
+    now = datetime.utcnow()
+    api_fetcher.cache['btc_price'] = (60000.0, now)
+    api_fetcher.cache['network_hashrate'] = (600000000.0, now)
+    api_fetcher.cache['difficulty'] = ({'difficulty': 1e13, 'adjustment': 0}, now)
+    api_fetcher.cache['block_height'] = (870000, now)
+    for name, hashrate in (('Small', 50), ('Large', 200)):
+        client.post('/api/miners/', headers={'Authorization': f'Bearer {admin_token}'}, json={
+            'name': name, 'model': 'Model X', 'hashrate_th': hashrate,
+            'price_usd': 1000, 'efficiency': 30, 'power_watts': 3000
+        })
+
+    response = client.post('/api/miners/estimate/batch', json={'duration_days': 60})
+    api_fetcher.cache.clear()
+    assert response.status_code == 200
+    estimates = response.get_json()['estimates']
+    small, large = (Miner.query.filter_by(name=name).one() for name in ('Small', 'Large'))
+    assert [e['miner_id'] for e in estimates] == [small.id, large.id]
+    assert estimates[1]['daily_btc'] == pytest.approx(estimates[0]['daily_btc'] * 4)
+    assert all(e['duration_days'] == 60 for e in estimates)
+
+def test_single_estimate_matches_batch(client, admin_token):
+    """Test that the single-miner and batch estimates agree and reject non-positive durations."""
+    from datetime import datetime
+    from app.utils import api_fetcher
+    now = datetime.utcnow()
+    api_fetcher.cache['btc_price'] = (60000.0, now)
+    api_fetcher.cache['network_hashrate'] = (600000000.0, now)
+    api_fetcher.cache['difficulty'] = ({'difficulty': 1e13, 'adjustment': 0}, now)
+    api_fetcher.cache['block_height'] = (870000, now)
+    miner_id = client.post('/api/miners/', headers={'Authorization': f'Bearer {admin_token}'}, json={
+        'name': 'Test Miner', 'model': 'Model X', 'hashrate_th': 100,
+        'price_usd': 1000, 'efficiency': 30, 'power_watts': 3000
+    }).get_json()['id']
+
+    single = client.post(f'/api/miners/{miner_id}/estimate', json={'duration_days': 60}).get_json()
+    [batch] = client.post('/api/miners/estimate/batch', json={'duration_days': 60}).get_json()['estimates']
+    rejected = [
+        client.post('/api/miners/estimate/batch', json={'duration_days': 0}).status_code,
+        client.post('/api/miners/estimate/batch', json={'scenarios': [{'miner_id': miner_id, 'duration_days': -5}]}).status_code,
+        client.post(f'/api/miners/{miner_id}/estimate', json={'duration_days': 0}).status_code,
+        client.post(f'/api/miners/{miner_id}/estimate', json={'hashrate': -1}).status_code,
+    ]
+    api_fetcher.cache.clear()
+    for key in ('daily_btc', 'monthly_btc', 'monthly_usd', 'total_btc', 'total_usd', 'roi_days'):
+        assert single[key] == pytest.approx(batch[key]), key
+    assert rejected == [400, 400, 400, 400]
+
+def test_estimate_batch_unknown_miner(client):
+    """Test that scenarios referencing unknown miners are rejected."""
+    response = client.post('/api/miners/estimate/batch', json={'scenarios': [{'miner_id': 999}]})
+    assert response.status_code == 404
+
+def test_projection_endpoint(client, admin_token):
+    """Test projecting cumulative earnings for a miner."""
+    from datetime import datetime
+    from app.utils import api_fetcher
+    now = datetime.utcnow()
+    api_fetcher.cache['btc_price'] = (60000.0, now)
+    api_fetcher.cache['network_hashrate'] = (600000000.0, now)
+    api_fetcher.cache['difficulty'] = ({'difficulty': 1e13, 'adjustment': 1.5}, now)
+    api_fetcher.cache['block_height'] = (870000, now)
+    create_response = client.post('/api/miners/', headers={'Authorization': f'Bearer {admin_token}'}, json={
+        'name': 'Test Miner', 'model': 'Model X', 'hashrate_th': 100,
+        'price_usd': 1000, 'efficiency': 30, 'power_watts': 3000
+    })
+    miner_id = create_response.get_json()['id']
+
+    response = client.post(f'/api/miners/{miner_id}/projection', json={'duration_days': 90})
+    rejected = [
+        client.post(f'/api/miners/{miner_id}/projection', json=body).status_code
+        for body in ({'difficulty_growth_percent': -100}, {'difficulty_growth_percent': -150},
+                     {'hashrate': 0}, {'hashrate': 'fast'})
+    ]
+    api_fetcher.cache.clear()
+    assert rejected == [400, 400, 400, 400]
+    assert response.status_code == 200
+    json_data = response.get_json()
+    assert json_data['difficulty_growth_percent'] == 1.5
+    assert len(json_data['curve']) == 90
+    assert json_data['curve'][-1]['usd'] == pytest.approx(json_data['total_usd'])
+
+def test_simulate_endpoint(client, admin_token):
+    """Test Monte Carlo percentile bands for a miner."""
+    from datetime import datetime
+    from app.utils import api_fetcher
+    now = datetime.utcnow()
+    api_fetcher.cache['btc_price'] = (60000.0, now)
+    api_fetcher.cache['network_hashrate'] = (600000000.0, now)
+    api_fetcher.cache['difficulty'] = ({'difficulty': 1e13, 'adjustment': 1.5}, now)
+    api_fetcher.cache['block_height'] = (870000, now)
+    create_response = client.post('/api/miners/', headers={'Authorization': f'Bearer {admin_token}'}, json={
+        'name': 'Test Miner', 'model': 'Model X', 'hashrate_th': 100,
+        'price_usd': 1000, 'efficiency': 30, 'power_watts': 3000
+    })
+    miner_id = create_response.get_json()['id']
+
+    response = client.post(f'/api/miners/{miner_id}/simulate', json={'duration_days': 90, 'paths': 1000})
+    rejected = [
+        client.post(f'/api/miners/{miner_id}/simulate', json=body).status_code
+        for body in ({'price_volatility': -0.1}, {'hashrate_growth_percent': -100},
+                     {'price_volatility': 'high'}, {'paths': 20_000, 'duration_days': 3650})
+    ]
+    api_fetcher.cache.clear()
+    assert rejected == [400, 400, 400, 400]
+    assert response.status_code == 200
+    bands = response.get_json()['total_usd']
+    assert bands['p5'] <= bands['p50'] <= bands['p95']
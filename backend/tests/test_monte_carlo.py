@@ -0,0 +1,44 @@
+import time
+import pytest
+from app.utils.earnings_projection import project_earnings
+from app.utils.monte_carlo import simulate_profitability, simulate_profitability_cached
+
+NETWORK_TH = 600_000_000
+HEIGHT = 2016 * 440
+
+def test_percentile_bands_are_ordered():
+    """Test that p5 <= p50 <= p95 for every reported metric."""
+    result = simulate_profitability(100, 180, 1000, 50000, NETWORK_TH, HEIGHT, paths=2000, seed=1)
+    for metric in ('total_usd', 'total_btc'):
+        bands = result[metric]
+        assert bands['p5'] <= bands['p50'] <= bands['p95']
+    assert 0.0 <= result['roi_probability'] <= 1.0
+
+def test_zero_volatility_matches_projection():
+    """Test that removing all randomness reproduces the deterministic projection."""
+    result = simulate_profitability(100, 60, 1000, 50000, NETWORK_TH, HEIGHT, paths=200,
+                                    price_volatility=0.0, hashrate_volatility=0.0, seed=1)
+    expected = project_earnings(100, 60, NETWORK_TH, 50000, HEIGHT, 0.0)
+    assert result['total_usd']['p50'] == pytest.approx(expected['total_usd'], rel=1e-4)
+    assert result['total_usd']['p5'] == pytest.approx(result['total_usd']['p95'], rel=1e-4)
+
+def test_unreachable_roi_reports_zero_probability():
+    """Test that paths which never break even are excluded from ROI bands."""
+    result = simulate_profitability(1, 30, 1_000_000, 50000, NETWORK_TH, HEIGHT, paths=500, seed=1)
+    assert result['roi_probability'] == 0.0
+    assert result['roi_days']['p50'] is None
+
+def test_ten_thousand_paths_for_a_year_is_fast():
+    """Test that 10k paths x 365 days runs well under a second."""
+    started = time.perf_counter()
+    simulate_profitability(100, 365, 1000, 50000, NETWORK_TH, HEIGHT, paths=10_000, seed=1)
+    assert time.perf_counter() - started < 1.0
+
+def test_cached_simulation_reuses_result():
+    """Test that repeated calls for the same market snapshot hit the cache."""
+    simulate_profitability_cached.cache_clear()
+    args = (1, 100.0, 30, 1000.0, (50000.0, float(NETWORK_TH), HEIGHT), 500, 0.6, 0.0)
+    first = simulate_profitability_cached(*args)
+    second = simulate_profitability_cached(*args)
+    assert first is second
+    assert simulate_profitability_cached.cache_info().hits == 1
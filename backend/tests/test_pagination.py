@@ -0,0 +1,72 @@
+from datetime import datetime
+import pytest
+from flask_jwt_extended import create_access_token
+from app import db
+from app.models import Miner, Payment, Rental, User
+from app.utils.pagination import decode_cursor, encode_cursor
+
+@pytest.fixture
+def owner(app):
+    """A user with five rentals and payments sharing one created_at, so ids break the ties."""
+    user = User(email='owner@example.com', referral_code='OWNER001')
+    user.set_password('password')
+    miner = Miner(name='Test Miner', model='T1', hashrate_th=100, price_usd=1000, efficiency=30, power_watts=3000)
+    db.session.add_all([user, miner])
+    db.session.flush()
+    created_at = datetime(2026, 1, 1, 12, 0)
+    for _ in range(5):
+        rental = Rental(user_id=user.id, miner_id=miner.id, hashrate_allocated=10, duration_days=30,
+                        monthly_fee_usd=50, created_at=created_at)
+        db.session.add(rental)
+        db.session.flush()
+        db.session.add(Payment(user_id=user.id, rental_id=rental.id, amount_usd=100, created_at=created_at))
+    db.session.commit()
+    return user
+
+def test_cursor_round_trip():
+    """Test that cursors decode to the key they were built from and reject garbage."""
+    row = Rental(id=42, created_at=datetime(2026, 1, 2, 3, 4, 5, 678))
+    assert decode_cursor(encode_cursor(row)) == (row.created_at, 42)
+    with pytest.raises(ValueError):
+        decode_cursor('not-a-cursor')
+
+def test_admin_rentals_walk_all_pages(client, admin_token, owner, captured_sql):
+    """Test that following next_cursor visits every rental once, newest first, without a COUNT per page."""
+    headers = {'Authorization': f'Bearer {admin_token}'}
+    seen = []
+    url = '/api/admin/rentals?limit=2'
+    while url:
+        captured_sql.clear()
+        json_data = client.get(url, headers=headers).get_json()
+        assert not any('count(' in statement.lower() for statement, _ in captured_sql)
+        seen.extend(r['id'] for r in json_data['rentals'])
+        assert 'total' not in json_data
+        url = f'/api/admin/rentals?limit=2&cursor={json_data["next_cursor"]}' if json_data['next_cursor'] else None
+
+    assert seen == sorted(seen, reverse=True)
+    assert len(seen) == 5
+
+def test_admin_list_opt_in_total(client, admin_token, owner):
+    """Test that totals are only computed when asked for."""
+    headers = {'Authorization': f'Bearer {admin_token}'}
+    json_data = client.get('/api/admin/payments?limit=2&include_total=1', headers=headers).get_json()
+    assert len(json_data['payments']) == 2
+    assert json_data['total'] == 5
+
+def test_invalid_cursor_rejected(client, admin_token):
+    """Test that a malformed cursor is a client error."""
+    response = client.get('/api/admin/users?cursor=bogus', headers={'Authorization': f'Bearer {admin_token}'})
+    assert response.status_code == 400
+
+def test_user_list_uses_cursor_header(client, owner):
+    """Test that user lists stay JSON arrays and page through X-Next-Cursor."""
+    headers = {'Authorization': f'Bearer {create_access_token(identity=str(owner.id))}'}
+    first = client.get('/api/payments/user?limit=3', headers=headers)
+    assert len(first.get_json()) == 3
+    cursor = first.headers['X-Next-Cursor']
+
+    second = client.get(f'/api/payments/user?limit=3&cursor={cursor}', headers=headers)
+    assert len(second.get_json()) == 2
+    assert 'X-Next-Cursor' not in second.headers
+    ids = [p['id'] for p in first.get_json() + second.get_json()]
+    assert len(set(ids)) == 5
@@ -0,0 +1,58 @@
+import pytest
+from app import db
+from app.models import User
+from app.utils.password_hasher import HashSlots, HasherBusy
+
+@pytest.fixture
+def slot_dir(app, tmp_path):
+    """Point the hashing slots at a private directory with a single slot."""
+    app.config.update(PASSWORD_HASH_SLOT_DIR=str(tmp_path), PASSWORD_HASH_CONCURRENCY=1,
+                      PASSWORD_HASH_QUEUE_TIMEOUT=0.05)
+    return str(tmp_path)
+
+def _user(email='member@example.com', password='password'):
+    user = User(email=email, referral_code='MEMBER01')
+    user.set_password(password)
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+def test_slots_are_shared_between_workers(tmp_path):
+    """Test that two workers' slot sets on one directory share the same cap."""
+    worker_a = HashSlots(str(tmp_path), 1)
+    worker_b = HashSlots(str(tmp_path), 1)
+    with worker_a.acquire(timeout=0):
+        with pytest.raises(HasherBusy):
+            with worker_b.acquire(timeout=0.02):
+                pass
+    with worker_b.acquire(timeout=0):
+        pass
+
+def test_login_rejected_with_retry_after_when_saturated(client, slot_dir):
+    """Test that a login arriving while every slot is busy gets 503 instead of queueing."""
+    _user()
+    with HashSlots(slot_dir, 1).acquire(timeout=0):
+        response = client.post('/api/auth/login', json={'email': 'member@example.com', 'password': 'password'})
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '2'
+        register = client.post('/api/auth/register', json={'email': 'new@example.com', 'password': 'password'})
+        assert register.status_code == 503
+    assert client.post('/api/auth/login', json={
+        'email': 'member@example.com', 'password': 'password'
+    }).status_code == 200
+    assert User.query.filter_by(email='new@example.com').count() == 0
+
+def test_login_upgrades_outdated_hash(app, client, slot_dir):
+    """Test that a correct login rehashes with the new parameters and a wrong one does not."""
+    user = _user()
+    assert user.password_hash.startswith('pbkdf2:sha256:1000$')
+    app.config['PASSWORD_HASH_METHOD'] = 'pbkdf2:sha256:2000'
+
+    assert client.post('/api/auth/login', json={'email': 'member@example.com', 'password': 'nope'}).status_code == 401
+    db.session.expire_all()
+    assert user.password_hash.startswith('pbkdf2:sha256:1000$')
+
+    assert client.post('/api/auth/login', json={'email': 'member@example.com', 'password': 'password'}).status_code == 200
+    db.session.expire_all()
+    assert user.password_hash.startswith('pbkdf2:sha256:2000$')
+    assert user.check_password('password')
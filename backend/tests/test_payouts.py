@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from app import db
+from app.jobs.payouts import process_pending_payouts
+from app.models import Payout, User
+from app.utils.stats_rollup import compute_rollup, get_rollup, refresh_rollup
+
+def _payouts(statuses):
+    user = User(email='earner@example.com', referral_code='EARNER01')
+    user.set_password('password')
+    db.session.add(user)
+    db.session.flush()
+    created_at = datetime(2026, 1, 1)
+    payouts = [
+        Payout(user_id=user.id, amount_usd=10.0 * (i + 1), status=status, created_at=created_at + timedelta(hours=i))
+        for i, status in enumerate(statuses)
+    ]
+    db.session.add_all(payouts)
+    db.session.commit()
+    return payouts
+
+def test_process_pending_payouts_in_chunks(app):
+    """Test that pending payouts are paid chunk by chunk with running totals and counters kept in step."""
+    payouts = _payouts(['pending'] * 5 + ['paid'])
+    refresh_rollup()
+    progress = []
+
+    count, total = process_pending_payouts(batch_size=2, on_progress=lambda *args: progress.append(args))
+    assert (count, total) == (5, 150.0)
+    assert progress == [(2, 30.0), (4, 100.0), (5, 150.0)]
+
+    db.session.expire_all()
+    assert all(p.status == 'paid' and p.processed_at for p in payouts[:5])
+    assert payouts[5].processed_at is None
+    assert get_rollup() == compute_rollup()
+    assert process_pending_payouts() == (0, 0.0)
+
+def test_claim_query_skips_locked_rows(app, monkeypatch):
+    """Test that the chunk claim renders FOR UPDATE SKIP LOCKED so parallel workers never block each other."""
+    statements = []
+    original_execute = db.session.execute
+
+    def recording_execute(statement, *args, **kwargs):
+        statements.append(statement)
+        return original_execute(statement, *args, **kwargs)
+
+    _payouts(['pending'])
+    monkeypatch.setattr(db.session, 'execute', recording_execute)
+    process_pending_payouts()
+    claim = next(s for s in statements if s.is_select)
+    assert 'FOR UPDATE SKIP LOCKED' in str(claim.compile(dialect=postgresql.dialect()))
@@ -1,5 +1,5 @@
 import pytest
-from app.utils.profit_calculator import calculate_daily_btc, calculate_monthly_profit, calculate_roi_days, estimate_earnings
+from app.utils.profit_calculator import calculate_daily_btc, calculate_monthly_profit, calculate_roi_days, estimate_earnings, estimate_earnings_batch
 
 def test_calculate_daily_btc():
     """Test the calculation of daily BTC earnings."""
@@ -31,3 +31,27 @@ def test_calculate_roi_days_zero_daily_profit():
     """Test ROI calculation with zero daily profit."""
     roi_days = calculate_roi_days(1000, 0, 500000000, 50000)
     assert roi_days == 0
+
+def test_estimate_earnings_batch_matches_scalar():
+    """Test that the batch API agrees with the scalar functions."""
+    results = estimate_earnings_batch([100, 250], [30, 90], [1000, 2500], 500000000, 50000)
+    assert len(results) == 2
+    for result, (hashrate, duration, investment) in zip(results, [(100, 30, 1000), (250, 90, 2500)]):
+        scalar = estimate_earnings(hashrate, duration, 500000000, 50000)
+        assert result['daily_btc'] == pytest.approx(scalar['daily_btc'])
+        assert result['total_btc'] == pytest.approx(scalar['total_btc'])
+        assert result['total_usd'] == pytest.approx(scalar['total_usd'])
+        assert result['monthly_usd'] == pytest.approx(calculate_monthly_profit(hashrate, 500000000, 50000))
+        assert result['roi_days'] == calculate_roi_days(investment, hashrate, 500000000, 50000)
+
+def test_estimate_earnings_batch_is_net_of_fees():
+    """Test that a 30-day batch total equals the net monthly profit, not the gross yield."""
+    [result] = estimate_earnings_batch([100], [30], [1000], 500000000, 50000)
+    assert result['total_usd'] == pytest.approx(calculate_monthly_profit(100, 500000000, 50000))
+    assert result['total_usd'] == pytest.approx(result['monthly_usd'])
+    assert result['total_btc'] < calculate_daily_btc(100, 500000000) * 30
+
+def test_estimate_earnings_batch_length_mismatch():
+    """Test that mismatched input lengths are rejected."""
+    with pytest.raises(ValueError):
+        estimate_earnings_batch([100], [30, 60], [1000], 500000000, 50000)
@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta
+from flask_jwt_extended import create_access_token
+from app import db
+from app.models import Miner, Payment, Payout, Referral, Rental, User
+from app.utils.stats_rollup import refresh_rollup
+
+def _add_rows(referrer, first, count):
+    """Give ``referrer`` ``count`` more referred users, each with a miner, rental, payment and payout."""
+    start = datetime.utcnow()
+    for i in range(first, first + count):
+        miner = Miner(name=f'Miner {i}', model='T1', hashrate_th=100, price_usd=1000, efficiency=30, power_watts=3000)
+        user = User(email=f'user{i}@example.com', referral_code=f'USER{i:04d}', referred_by=referrer.id)
+        user.password_hash = 'x'
+        db.session.add_all([miner, user])
+        db.session.flush()
+        rental = Rental(user_id=referrer.id, miner_id=miner.id, hashrate_allocated=10, duration_days=30,
+                        monthly_fee_usd=50, is_active=True, start_date=start, end_date=start + timedelta(days=30))
+        referral = Referral(referrer_id=referrer.id, referred_id=user.id)
+        db.session.add_all([rental, referral])
+        db.session.flush()
+        db.session.add_all([
+            Payment(user_id=user.id, rental_id=rental.id, amount_usd=100),
+            Payout(user_id=user.id, referral_id=referral.id, rental_id=rental.id, amount_usd=3.0)
+        ])
+    db.session.commit()
+    # Rows were inserted behind the routes' back, so recount the dashboard counters
+    refresh_rollup()
+
+LIST_ENDPOINTS = [
+    ('/api/rentals/user', 'user'),
+    ('/api/referrals/', 'user'),
+    ('/api/referrals/payouts', 'user'),
+    ('/api/payments/user', 'user'),
+    ('/api/miners/', 'user'),
+    ('/api/admin/stats', 'admin'),
+    ('/api/admin/users?per_page=50', 'admin'),
+    ('/api/admin/miners', 'admin'),
+    ('/api/admin/rentals?per_page=50', 'admin'),
+    ('/api/admin/payments?per_page=50', 'admin'),
+    ('/api/admin/payouts?per_page=50', 'admin'),
+]
+
+def _statement_counts(client, headers, captured_sql):
+    counts = {}
+    for url, role in LIST_ENDPOINTS:
+        captured_sql.clear()
+        response = client.get(url, headers=headers[role])
+        assert response.status_code == 200, url
+        counts[url] = len(captured_sql)
+    return counts
+
+def test_list_endpoints_run_constant_queries(client, admin_token, captured_sql):
+    """Test that list endpoints issue the same number of statements for 2 and 12 rows."""
+    referrer = User(email='referrer@example.com', referral_code='REFER001')
+    referrer.set_password('password')
+    db.session.add(referrer)
+    db.session.commit()
+    headers = {
+        'user': {'Authorization': f'Bearer {create_access_token(identity=str(referrer.id))}'},
+        'admin': {'Authorization': f'Bearer {admin_token}'}
+    }
+
+    _add_rows(referrer, 0, 2)
+    # Warm the per-process role cache so both passes authorise the same way
+    client.get('/api/admin/stats', headers=headers['admin'])
+    small_counts = _statement_counts(client, headers, captured_sql)
+    _add_rows(referrer, 2, 10)
+    large_counts = _statement_counts(client, headers, captured_sql)
+    assert large_counts == small_counts
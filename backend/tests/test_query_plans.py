@@ -0,0 +1,110 @@
+import re
+from datetime import date, datetime, timedelta
+import pytest
+from flask_jwt_extended import create_access_token
+from app import db
+from app.models import EarningsLedger, Miner, Payment, Payout, Referral, Rental, User
+from app.utils.pagination import encode_cursor
+
+# Statements that cannot use a b-tree index by design (substring search, anti-joins)
+UNINDEXABLE = (' LIKE ', ' NOT IN ')
+
+@pytest.fixture
+def seeded(app, admin_user):
+    """Populate every table the routes read from."""
+    referrer = User(email='referrer@example.com', referral_code='REFER001')
+    referrer.set_password('password')
+    db.session.add(referrer)
+    db.session.flush()
+    user = User(email='user@example.com', referral_code='USER0001', referred_by=referrer.id)
+    user.set_password('password')
+    miner = Miner(name='Test Miner', model='T1', hashrate_th=100, price_usd=1000, efficiency=30, power_watts=3000)
+    db.session.add_all([user, miner])
+    db.session.flush()
+    start = datetime.utcnow() - timedelta(days=2)
+    rental = Rental(user_id=user.id, miner_id=miner.id, hashrate_allocated=10, duration_days=30, monthly_fee_usd=50,
+                    is_active=True, start_date=start, end_date=start + timedelta(days=30))
+    referral = Referral(referrer_id=referrer.id, referred_id=user.id, commission_earned_usd=3.0)
+    db.session.add_all([rental, referral])
+    db.session.flush()
+    payment = Payment(user_id=user.id, rental_id=rental.id, amount_usd=100, tx_hash='abc123', status='pending')
+    payout = Payout(user_id=referrer.id, referral_id=referral.id, rental_id=rental.id, amount_usd=3.0)
+    ledger = EarningsLedger(rental_id=rental.id, day=date.today() - timedelta(days=1), btc=1e-6,
+                            usd_at_price=0.06, network_hashrate_snapshot=6e8)
+    db.session.add_all([payment, payout, ledger])
+    db.session.commit()
+    return {'user': user, 'referrer': referrer, 'rental': rental, 'payment': payment}
+
+def _sequential_scans(statement, parameters):
+    """Return the tables SQLite would read with a full table scan for this statement."""
+    plan = db.session.connection().exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).all()
+    scans = []
+    for row in plan:
+        match = re.fullmatch(r'SCAN (\w+)', row[-1])
+        if match and match.group(1) in db.metadata.tables:
+            scans.append(match.group(1))
+    return scans
+
+def _route_statements(statements):
+    for statement, parameters in statements:
+        normalized = ' '.join(statement.split()).upper()
+        if not normalized.startswith(('SELECT', 'UPDATE', 'DELETE')):
+            continue
+        # Unfiltered, unordered reads (catalogue listings, table totals) are full reads by design
+        if ' WHERE ' not in normalized and ' ORDER BY ' not in normalized:
+            continue
+        if any(marker in normalized for marker in UNINDEXABLE):
+            continue
+        yield statement, parameters
+
+def test_route_queries_use_indexes(client, admin_token, seeded, captured_sql):
+    """Test that no route query falls back to a sequential scan of a table."""
+    user_headers = {'Authorization': f'Bearer {create_access_token(identity=str(seeded["user"].id))}'}
+    referrer_headers = {'Authorization': f'Bearer {create_access_token(identity=str(seeded["referrer"].id))}'}
+    admin_headers = {'Authorization': f'Bearer {admin_token}'}
+    rental_id = seeded['rental'].id
+    user_id = seeded['user'].id
+    payment_id = seeded['payment'].id
+    cursor = encode_cursor(seeded['rental'])
+
+    requests = [
+        ('get', '/api/auth/profile', user_headers, None),
+        ('get', '/api/rentals/user', user_headers, None),
+        ('get', f'/api/rentals/{rental_id}', user_headers, None),
+        ('get', f'/api/rentals/{rental_id}/earnings', user_headers, None),
+        ('get', '/api/rentals/earnings/history', user_headers, None),
+        ('get', '/api/payments/user', user_headers, None),
+        ('get', f'/api/payments/{payment_id}', user_headers, None),
+        ('get', '/api/referrals/', referrer_headers, None),
+        ('get', '/api/referrals/stats', referrer_headers, None),
+        ('get', '/api/referrals/payouts', referrer_headers, None),
+        ('get', '/api/admin/stats', admin_headers, None),
+        ('get', '/api/admin/users', admin_headers, None),
+        ('get', f'/api/admin/users/{user_id}', admin_headers, None),
+        ('get', '/api/admin/miners', admin_headers, None),
+        ('get', '/api/admin/rentals?status=active', admin_headers, None),
+        ('get', f'/api/admin/rentals?cursor={cursor}', admin_headers, None),
+        ('get', f'/api/rentals/user?cursor={cursor}', user_headers, None),
+        ('get', '/api/admin/payments?status=pending', admin_headers, None),
+        ('get', '/api/admin/payouts?status=pending', admin_headers, None),
+        ('get', '/api/admin/database/stats', admin_headers, None),
+        ('get', '/api/admin/earnings', admin_headers, None),
+        ('get', '/api/admin/export/users', admin_headers, None),
+        ('get', '/api/admin/export/rentals?status=active&from=2020-01-01', admin_headers, None),
+        ('get', '/api/admin/export/payments?status=pending&format=ndjson', admin_headers, None),
+        ('get', '/api/admin/export/payouts?from=2020-01-01&to=2099-12-31', admin_headers, None),
+        ('post', '/api/payments/webhook', {}, {'tx_hash': 'abc123', 'status': 'confirmed'}),
+        ('put', '/api/admin/payouts/process-all', admin_headers, None),
+        ('post', '/api/admin/database/cleanup', admin_headers, {'type': 'all'}),
+    ]
+    for method, url, headers, body in requests:
+        response = getattr(client, method)(url, headers=headers, json=body)
+        assert response.status_code == 200, url
+        response.get_data()
+
+    offenders = {}
+    for statement, parameters in _route_statements(list(captured_sql)):
+        scans = _sequential_scans(statement, parameters)
+        if scans:
+            offenders[' '.join(statement.split())] = scans
+    assert offenders == {}
@@ -0,0 +1,33 @@
+import pytest
+from app import db
+from app.models import User
+from app.utils.referral_codes import ALPHABET, DOMAIN, assign_referral_codes, decode_referral_code, encode_referral_code
+
+def test_codes_are_a_keyed_bijection(app):
+    """Test that codes are 8 alphabet characters, unique per id, reversible and key dependent."""
+    codes = [encode_referral_code(user_id) for user_id in range(1, 20001)]
+    assert len(set(codes)) == len(codes)
+    assert all(len(code) == 8 and set(code) <= set(ALPHABET) for code in codes)
+    assert [decode_referral_code(code) for code in codes[:100]] == list(range(1, 101))
+    assert decode_referral_code(encode_referral_code(DOMAIN - 1)) == DOMAIN - 1
+    assert encode_referral_code(1, b'another-key') != codes[0]
+    with pytest.raises(ValueError):
+        encode_referral_code(DOMAIN)
+    with pytest.raises(ValueError):
+        decode_referral_code('lower123')
+
+def test_register_does_not_probe_for_codes(client, captured_sql):
+    """Test that registration derives the code from the new id without looking codes up."""
+    captured_sql.clear()
+    response = client.post('/api/auth/register', json={'email': 'new@example.com', 'password': 'password'})
+    assert response.status_code == 201
+    user = response.get_json()['user']
+    assert user['referral_code'] == encode_referral_code(user['id'])
+    assert not any('referral_code =' in statement for statement, _ in captured_sql)
+
+def test_bulk_assignment(app):
+    """Test that a batch of new users gets codes in one pass."""
+    users = [User(email=f'bulk{i}@example.com', password_hash='x') for i in range(50)]
+    assign_referral_codes(users)
+    db.session.commit()
+    assert {u.referral_code for u in User.query} == {encode_referral_code(u.id) for u in users}
@@ -0,0 +1,60 @@
+import time
+from flask_jwt_extended import decode_token
+from app import db
+from app.models import User
+from app.utils.roles import access_token_for, get_role_cache
+
+def _member(email='member@example.com'):
+    user = User(email=email, referral_code=email[:8].upper())
+    user.set_password('password')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+def test_login_token_carries_admin_claim(client, admin_token):
+    """Test that the admin role is embedded in the signed token."""
+    assert decode_token(admin_token)['is_admin'] is True
+    _member()
+    token = client.post('/api/auth/login', json={'email': 'member@example.com', 'password': 'password'}).get_json()
+    assert decode_token(token['access_token'])['is_admin'] is False
+
+def test_polled_admin_endpoints_skip_user_lookup(client, admin_token, captured_sql):
+    """Test that repeated admin requests authorise from the claim and role cache alone."""
+    headers = {'Authorization': f'Bearer {admin_token}'}
+    client.get('/api/admin/stats', headers=headers)
+    captured_sql.clear()
+    for _ in range(3):
+        assert client.get('/api/admin/stats', headers=headers).status_code == 200
+    assert not any('WHERE users.id' in statement for statement, _ in captured_sql)
+
+def test_non_admin_claim_rejected_without_query(client, captured_sql):
+    """Test that a token without the admin role is refused before any database access."""
+    headers = {'Authorization': f'Bearer {access_token_for(_member())}'}
+    captured_sql.clear()
+    assert client.get('/api/admin/stats', headers=headers).status_code == 403
+    assert client.post('/api/miners/', headers=headers, json={}).status_code == 403
+    assert captured_sql == []
+
+def test_toggle_admin_revokes_cached_role(client, admin_token):
+    """Test that demoting an admin takes effect at once even though their token still claims the role."""
+    headers = {'Authorization': f'Bearer {admin_token}'}
+    other = _member('second@example.com')
+    other.is_admin = True
+    db.session.commit()
+    other_headers = {'Authorization': f'Bearer {access_token_for(other)}'}
+    assert client.get('/api/admin/stats', headers=other_headers).status_code == 200
+
+    assert client.put(f'/api/admin/users/{other.id}/toggle-admin', headers=headers).status_code == 200
+    assert client.get('/api/admin/stats', headers=other_headers).status_code == 403
+
+def test_role_cache_expires(app):
+    """Test that another worker's change is seen once the cached entry expires."""
+    user = _member()
+    cache = get_role_cache()
+    cache.ttl = 0.05
+    assert cache.is_admin(user.id) is False
+    User.query.filter_by(id=user.id).update({'is_admin': True})
+    db.session.commit()
+    assert cache.is_admin(user.id) is False
+    time.sleep(0.06)
+    assert cache.is_admin(user.id) is True
@@ -0,0 +1,74 @@
+import json
+from datetime import datetime, timedelta
+from decimal import Decimal
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.orm import joinedload
+from app import db
+from app.models import Miner, Payment, Payout, Referral, Rental, User
+from app.utils.serializers import (
+    ADMIN_PAYOUT_SCHEMA, MINER_SCHEMA, PAYMENT_SCHEMA, PAYOUT_SCHEMA, REFERRAL_SCHEMA, RENTAL_SCHEMA, USER_SCHEMA
+)
+
+@pytest.fixture
+def rows(app):
+    """One row per serialised model, with set and unset optional datetimes."""
+    user = User(email='rows@example.com', referral_code='ROWS0001')
+    user.set_password('password')
+    miner = Miner(name='M', model='M1', hashrate_th=100, price_usd=1000, efficiency=30, power_watts=3000)
+    db.session.add_all([user, miner])
+    db.session.flush()
+    start = datetime(2026, 3, 1, 12, 30, 15, 250000)
+    rental = Rental(user_id=user.id, miner_id=miner.id, hashrate_allocated=10, duration_days=30, monthly_fee_usd=5,
+                    is_active=True, start_date=start, end_date=start + timedelta(days=30))
+    referral = Referral(referrer_id=user.id, referred_id=user.id, commission_earned_usd=1.5)
+    db.session.add_all([rental, referral, Payment(user_id=user.id, amount_usd=10, status='confirmed', confirmed_at=start)])
+    db.session.flush()
+    db.session.add(Payout(user_id=user.id, referral_id=referral.id, amount_usd=1.5))
+    db.session.commit()
+
+def _through_json(value):
+    return json.loads(json.dumps(value))
+
+@pytest.mark.parametrize('schema', [USER_SCHEMA, MINER_SCHEMA, RENTAL_SCHEMA, REFERRAL_SCHEMA, PAYMENT_SCHEMA,
+                                    PAYOUT_SCHEMA])
+def test_schema_output_matches_to_dict(app, rows, schema):
+    """Test that a schema-encoded row serialises to the same JSON as the model's to_dict."""
+    expected = [_through_json(obj.to_dict()) for obj in schema.model.query.order_by(schema.model.id)]
+    encoded = schema.encode(schema.query().order_by(schema.model.id).all())
+    assert json.loads(app.json.dumps(encoded)) == expected
+
+def test_admin_payout_schema_adds_user_email(app, rows):
+    """Test that the admin payout listing carries the payee's email from the join."""
+    [payout] = ADMIN_PAYOUT_SCHEMA.encode(ADMIN_PAYOUT_SCHEMA.query().all())
+    assert payout['user_email'] == 'rows@example.com'
+
+def test_provider_handles_non_json_types(app):
+    """Test that the orjson provider writes datetimes as ISO 8601 and accepts int keys and Decimals."""
+    body = app.json.dumps({'at': datetime(2026, 1, 2, 3, 4, 5), 1: Decimal('1.10')})
+    assert json.loads(body) == {'at': '2026-01-02T03:04:05', '1': '1.10'}
+    with app.test_request_context():
+        response = app.json.response([1, 2])
+    assert response.mimetype == 'application/json'
+    assert response.get_data() == b'[1,2]\n'
+
+def test_bulk_rental_listing_matches_to_dict(app):
+    """Test that a large rental listing encodes to the same JSON through both paths."""
+    user = User(email='bulk@example.com', referral_code='BULK0001')
+    user.set_password('password')
+    miner = Miner(name='M', model='M1', hashrate_th=100, price_usd=1000, efficiency=30, power_watts=3000)
+    db.session.add_all([user, miner])
+    db.session.flush()
+    now = datetime.utcnow()
+    db.session.execute(insert(Rental), [
+        {'user_id': user.id, 'miner_id': miner.id, 'hashrate_allocated': 10.0, 'duration_days': 30,
+         'monthly_fee_usd': 5.0, 'is_active': i % 2 == 0, 'start_date': now, 'end_date': now + timedelta(days=30),
+         'total_profit_btc': 0.001 * i, 'created_at': now - timedelta(seconds=i)}
+        for i in range(1000)
+    ])
+    db.session.commit()
+
+    rentals = Rental.query.options(joinedload(Rental.miner)).order_by(Rental.id).all()
+    expected = _through_json([rental.to_dict() for rental in rentals])
+    encoded = RENTAL_SCHEMA.encode(RENTAL_SCHEMA.query().order_by(Rental.id).all())
+    assert json.loads(app.json.dumps(encoded)) == expected
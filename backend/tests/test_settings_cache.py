@@ -0,0 +1,44 @@
+from app import db
+from app.models import SettingsVersion, SystemSettings
+from app.utils.settings_cache import get_settings_cache
+
+def test_reads_are_served_from_memory(app, captured_sql):
+    """Test that repeated reads inside the TTL issue no queries."""
+    SystemSettings.initialize_defaults()
+    assert SystemSettings.get_setting('referral_percentage') == '5.0'
+    captured_sql.clear()
+    for _ in range(10):
+        assert SystemSettings.get_setting('btc_mining_reward') == '0.00001'
+        assert SystemSettings.get_setting('missing', 'fallback') == 'fallback'
+    assert captured_sql == []
+
+def test_writes_on_another_worker_reload_after_ttl(app, captured_sql):
+    """Test that a version bump from elsewhere is picked up at the next check."""
+    SystemSettings.initialize_defaults()
+    cache = get_settings_cache()
+    assert cache.entries()['min_withdrawal']['value'] == '50.0'
+
+    # Simulate another worker's write: new value plus version bump, no local invalidation
+    SystemSettings.query.filter_by(key='min_withdrawal').update({'value': '75.0'})
+    SettingsVersion.query.filter_by(id=1).update({'version': SettingsVersion.version + 1})
+    db.session.commit()
+    assert SystemSettings.get_setting('min_withdrawal') == '50.0'
+
+    cache.ttl = 0
+    captured_sql.clear()
+    assert SystemSettings.get_setting('min_withdrawal') == '75.0'
+    assert len(captured_sql) == 2
+
+    captured_sql.clear()
+    assert SystemSettings.get_setting('min_withdrawal') == '75.0'
+    assert len(captured_sql) == 1
+
+def test_admin_update_is_visible_immediately(client, admin_token):
+    """Test that the writing worker sees its own update without waiting for the TTL."""
+    headers = {'Authorization': f'Bearer {admin_token}'}
+    client.put('/api/admin/settings', headers=headers, json={'referral_percentage': '7.5'})
+    client.put('/api/admin/settings/min_withdrawal', headers=headers, json={'value': '20'})
+    settings = client.get('/api/admin/settings', headers=headers).get_json()
+    assert settings['referral_percentage']['value'] == '7.5'
+    assert settings['min_withdrawal']['value'] == '20'
+    assert SettingsVersion.query.one().version == 2
@@ -0,0 +1,110 @@
+from datetime import datetime, timedelta
+import pytest
+from app import db
+from app.jobs.expiry import expire_rentals
+from app.models import Miner, Rental, StatsRollup
+from app.utils import stats_rollup
+from app.utils.stats_rollup import ROLLUP_KEYS, bump, compute_rollup, get_rollup, invalidate_rollup, refresh_rollup
+
+@pytest.fixture
+def miner(app):
+    """A miner with spare units."""
+    miner = Miner(name='Test Miner', model='T1', hashrate_th=100, price_usd=1000, efficiency=30, power_watts=3000)
+    db.session.add(miner)
+    db.session.commit()
+    return miner
+
+def _assert_rollup_matches_tables():
+    rollup = get_rollup()
+    expected = compute_rollup()
+    assert rollup == {key: pytest.approx(value) for key, value in expected.items()}
+
+def test_rollup_tracks_checkout_confirmation_and_payouts(client, admin_token, miner):
+    """Test that incremental deltas keep the counters equal to a full recount."""
+    refresh_rollup()
+    referrer = client.post('/api/auth/register', json={'email': 'ref@example.com', 'password': 'password'}).get_json()
+    client.post('/api/auth/register', json={
+        'email': 'buyer@example.com', 'password': 'password',
+        'referral_code': referrer['user']['referral_code']
+    })
+    buyer_token = client.post('/api/auth/login', json={
+        'email': 'buyer@example.com', 'password': 'password'
+    }).get_json()['access_token']
+    buyer_headers = {'Authorization': f'Bearer {buyer_token}'}
+    admin_headers = {'Authorization': f'Bearer {admin_token}'}
+
+    checkout = client.post('/api/payments/checkout', headers=buyer_headers,
+                           json={'miner_id': miner.id, 'hashrate_allocated': 50, 'duration_days': 30}).get_json()
+    _assert_rollup_matches_tables()
+
+    client.put(f'/api/payments/{checkout["payment"]["id"]}/simulate-confirm', headers=buyer_headers)
+    _assert_rollup_matches_tables()
+    assert get_rollup()['payouts_pending'] == 1
+    assert get_rollup()['rentals_active_hashrate_th'] == 50
+    pending_usd = get_rollup()['payouts_pending_usd']
+    assert pending_usd > 0
+    payouts_page = client.get('/api/admin/payouts', headers=admin_headers).get_json()
+    assert payouts_page['pending_total'] == pytest.approx(pending_usd)
+
+    assert client.put('/api/admin/payouts/process-all', headers=admin_headers).status_code == 200
+    _assert_rollup_matches_tables()
+    assert get_rollup()['payouts_pending_usd'] == 0
+
+    db.session.query(Rental).update({'end_date': datetime.utcnow() - timedelta(minutes=1)})
+    db.session.commit()
+    expire_rentals()
+    _assert_rollup_matches_tables()
+    assert get_rollup()['rentals_active'] == 0
+
+def test_admin_edits_invalidate_rollup(client, admin_token, miner):
+    """Test that untracked admin edits force a recount on the next read."""
+    headers = {'Authorization': f'Bearer {admin_token}'}
+    assert client.get('/api/admin/database/stats', headers=headers).get_json()['miners']['total'] == 1
+
+    response = client.delete(f'/api/admin/miners/{miner.id}', headers=headers)
+    assert response.status_code == 200
+    assert client.get('/api/admin/database/stats', headers=headers).get_json()['miners']['total'] == 0
+
+    invalidate_rollup()
+    db.session.commit()
+    assert StatsRollup.query.count() == 0
+    assert client.get('/api/admin/stats', headers=headers).get_json()['users']['total'] == 1
+
+def test_dashboard_reads_only_the_rollup(client, admin_token, miner, captured_sql):
+    """Test that a warm dashboard request does not aggregate the base tables."""
+    headers = {'Authorization': f'Bearer {admin_token}'}
+    client.get('/api/admin/database/stats', headers=headers)
+
+    captured_sql.clear()
+    assert client.get('/api/admin/database/stats', headers=headers).status_code == 200
+    assert not any('count(' in statement.lower() for statement, _ in captured_sql)
+
+def test_bumps_on_different_shards_sum(app, monkeypatch):
+    """Test that deltas written to separate shards add up in the counter read back."""
+    refresh_rollup()
+    assert StatsRollup.query.count() == len(ROLLUP_KEYS) * app.config['STATS_ROLLUP_SHARDS']
+    for shard in (1, 3):
+        monkeypatch.setattr(stats_rollup, '_shard', lambda: shard)
+        bump(miners_total=2)
+        db.session.commit()
+    assert get_rollup()['miners_total'] == 4
+
+def test_refresh_upserts_over_existing_counters(app, monkeypatch):
+    """Test that a recount overwrites existing rows, keeps no stale shards and survives a repeat."""
+    refresh_rollup()
+    monkeypatch.setattr(stats_rollup, '_shard', lambda: 5)
+    bump(miners_total=7)
+    db.session.commit()
+
+    monkeypatch.setitem(app.config, 'STATS_ROLLUP_SHARDS', 4)
+    refresh_rollup()
+    refresh_rollup()
+    assert StatsRollup.query.count() == len(ROLLUP_KEYS) * 4
+    assert get_rollup() == {key: pytest.approx(value) for key, value in compute_rollup().items()}
+
+def test_rollup_rebuilds_when_shards_are_added(app):
+    """Test that raising STATS_ROLLUP_SHARDS makes the next read recreate the missing rows."""
+    refresh_rollup()
+    app.config['STATS_ROLLUP_SHARDS'] += 2
+    _assert_rollup_matches_tables()
+    assert StatsRollup.query.count() == len(ROLLUP_KEYS) * app.config['STATS_ROLLUP_SHARDS']
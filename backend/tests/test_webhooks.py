@@ -0,0 +1,80 @@
+from datetime import timedelta
+from app import db
+from app.jobs.webhooks import process_webhook_inbox
+from app.models import InventoryReservation, Miner, Payment, Payout, Rental, User, WebhookEvent
+from app.utils.stats_rollup import compute_rollup, get_rollup, refresh_rollup
+
+def _pending_order(tx_hash):
+    user = User(email=f'{tx_hash}@example.com', referral_code=tx_hash.upper())
+    user.set_password('password')
+    miner = Miner(name='Test Miner', model='T1', hashrate_th=100, price_usd=1000, efficiency=30,
+                  power_watts=3000, available_units=5)
+    db.session.add_all([user, miner])
+    db.session.flush()
+    rental = Rental(user_id=user.id, miner_id=miner.id, hashrate_allocated=10, duration_days=30,
+                    monthly_fee_usd=50, is_active=False)
+    db.session.add(rental)
+    db.session.flush()
+    payment = Payment(user_id=user.id, rental_id=rental.id, amount_usd=100, tx_hash=tx_hash, status='pending')
+    db.session.add(payment)
+    db.session.commit()
+    return payment, rental, miner
+
+def test_webhook_only_records_event(client):
+    """Test that the endpoint appends to the inbox without touching the payment."""
+    payment, _, _ = _pending_order('tx1')
+    response = client.post('/api/payments/webhook', json={'tx_hash': 'tx1', 'status': 'confirmed'})
+    assert response.status_code == 200
+    db.session.expire_all()
+    assert payment.status == 'pending'
+    event = WebhookEvent.query.one()
+    assert (event.event_id, event.processed_at) == ('tx1:confirmed', None)
+
+def test_webhook_retries_are_deduplicated(client):
+    """Test that a retried event id is accepted but stored once."""
+    body = {'event_id': 'evt_1', 'tx_hash': 'tx1', 'status': 'confirmed'}
+    assert client.post('/api/payments/webhook', json=body).get_json() == {'message': 'Webhook received'}
+    assert client.post('/api/payments/webhook', json=body).get_json()['duplicate'] is True
+    assert WebhookEvent.query.count() == 1
+
+def test_webhook_rejects_malformed_payload(client):
+    """Test that events without a tx_hash and status are refused up front."""
+    assert client.post('/api/payments/webhook', json={'status': 'confirmed'}).status_code == 400
+    assert client.post('/api/payments/webhook', data='not json').status_code == 400
+    assert WebhookEvent.query.count() == 0
+
+def test_inbox_worker_confirms_in_batches(client):
+    """Test that draining the inbox confirms payments, activates rentals and consumes every event once."""
+    orders = [_pending_order(f'tx{i}') for i in range(3)]
+    refresh_rollup()
+    for i in range(3):
+        client.post('/api/payments/webhook', json={'tx_hash': f'tx{i}', 'status': 'confirmed'})
+    client.post('/api/payments/webhook', json={'tx_hash': 'tx0', 'status': 'failed'})
+    client.post('/api/payments/webhook', json={'tx_hash': 'unknown', 'status': 'confirmed'})
+
+    assert process_webhook_inbox(batch_size=2) == 5
+    db.session.expire_all()
+    for payment, rental, miner in orders:
+        assert payment.status == 'confirmed'
+        assert rental.is_active
+        assert rental.end_date - rental.start_date == timedelta(days=30)
+        assert miner.available_units == 4
+        assert db.session.get(InventoryReservation, rental.id).status == 'committed'
+    assert WebhookEvent.query.filter(WebhookEvent.processed_at.is_(None)).count() == 0
+    assert get_rollup() == compute_rollup()
+    assert process_webhook_inbox() == 0
+
+def test_webhook_confirmation_credits_referrer(client):
+    """Test that a webhook-confirmed payment goes through the activation job and pays the referrer."""
+    referrer = User(email='referrer@example.com', referral_code='REFER001')
+    referrer.set_password('password')
+    db.session.add(referrer)
+    db.session.commit()
+    payment, rental, _ = _pending_order('tx9')
+    db.session.get(User, rental.user_id).referred_by = referrer.id
+    db.session.commit()
+
+    client.post('/api/payments/webhook', json={'tx_hash': 'tx9', 'status': 'confirmed'})
+    assert process_webhook_inbox() == 1
+    payout = Payout.query.one()
+    assert (payout.user_id, payout.rental_id, payout.amount_usd) == (referrer.id, rental.id, 3.0)
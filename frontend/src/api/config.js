@@ -31,4 +31,16 @@ api.interceptors.response.use(
   }
 )
 
+// User list endpoints return one page per request; follow X-Next-Cursor to the last page
+export const getAllPages = async (url, params = {}) => {
+  const items = []
+  let cursor
+  do {
+    const response = await api.get(url, { params: { limit: 500, ...params, cursor } })
+    items.push(...(response.data || []))
+    cursor = response.headers['x-next-cursor']
+  } while (cursor)
+  return items
+}
+
 export default api
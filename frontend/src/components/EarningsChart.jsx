@@ -1,28 +1,26 @@
 import { BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer, Line, ComposedChart } from 'recharts'
 
-const EarningsChart = ({ rentals, btcPrice = 50000 }) => {
-  const generateEarningsData = () => {
-    const months = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun']
-    const currentMonth = new Date().getMonth()
-    
-    return months.map((month, index) => {
-      const targetMonth = (currentMonth - 5 + index + 12) % 12
-      const monthNames = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
-      const displayMonth = monthNames[targetMonth]
-      
-      const totalHashrate = rentals.reduce((sum, r) => sum + (r.is_active ? r.hashrate_allocated : 0), 0)
-      const baseBtc = (totalHashrate * 0.00000005 * 30) * (0.7 + Math.random() * 0.6)
-      const btcEarned = index === 5 ? rentals.reduce((sum, r) => sum + r.total_profit_btc, 0) : baseBtc
-      
+const MONTH_NAMES = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+const EarningsChart = ({ history = [] }) => {
+  const buildEarningsData = () => {
+    const byMonth = Object.fromEntries(history.map((entry) => [entry.month, entry]))
+    const now = new Date()
+
+    return Array.from({ length: 6 }, (_, index) => {
+      const date = new Date(now.getFullYear(), now.getMonth() - 5 + index, 1)
+      const key = `${date.getFullYear()}-${String(date.getMonth() + 1).padStart(2, '0')}`
+      const entry = byMonth[key]
+
       return {
-        month: displayMonth,
-        btc: btcEarned,
-        usd: btcEarned * btcPrice
+        month: MONTH_NAMES[date.getMonth()],
+        btc: entry ? entry.btc : 0,
+        usd: entry ? entry.usd : 0
       }
     })
   }
 
-  const data = generateEarningsData()
+  const data = buildEarningsData()
 
   const CustomTooltip = ({ active, payload, label }) => {
     if (active && payload && payload.length) {
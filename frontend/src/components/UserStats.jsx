@@ -1,5 +1,5 @@
 import { useState, useEffect } from 'react'
-import api from '../api/config'
+import api, { getAllPages } from '../api/config'
 import { FaServer, FaBitcoin, FaFileContract, FaChartLine } from 'react-icons/fa'
 
 const UserStats = ({ user }) => {
@@ -14,8 +14,7 @@ const UserStats = ({ user }) => {
 
   const fetchUserStats = async () => {
     try {
-      const response = await api.get('/api/rentals/user')
-      const rentals = response.data || []
+      const rentals = await getAllPages('/api/rentals/user')
       
       const activeRentals = rentals.filter(r => r.is_active)
       const totalHashrate = activeRentals.reduce((sum, r) => sum + r.hashrate_allocated, 0)
@@ -107,7 +107,8 @@ const AdminDatabase = () => {
           details={[
             { label: 'Pending', value: stats?.payments?.pending || 0, color: 'yellow' },
             { label: 'Confirmed', value: stats?.payments?.confirmed || 0, color: 'green' },
-            { label: 'Failed', value: stats?.payments?.failed || 0, color: 'red' }
+            { label: 'Failed', value: stats?.payments?.failed || 0, color: 'red' },
+            { label: 'Refund needed', value: stats?.payments?.refund_required || 0, color: 'red' }
           ]}
           color="green"
         />
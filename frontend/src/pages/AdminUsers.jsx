@@ -7,23 +7,25 @@ const AdminUsers = () => {
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState(null)
   const [search, setSearch] = useState('')
-  const [currentPage, setCurrentPage] = useState(1)
-  const [totalPages, setTotalPages] = useState(1)
+  // cursors[i] is the cursor that loads page i; page 0 needs none
+  const [cursors, setCursors] = useState([null])
+  const [pageIndex, setPageIndex] = useState(0)
+  const [nextCursor, setNextCursor] = useState(null)
   const [selectedUser, setSelectedUser] = useState(null)
   const [userDetails, setUserDetails] = useState(null)
 
   useEffect(() => {
     fetchUsers()
-  }, [currentPage, search])
+  }, [pageIndex, search])
 
   const fetchUsers = async () => {
     try {
       setLoading(true)
       const response = await api.get('/api/admin/users', {
-        params: { page: currentPage, search, per_page: 15 }
+        params: { cursor: cursors[pageIndex] || undefined, search, limit: 15 }
       })
       setUsers(response.data.users)
-      setTotalPages(response.data.pages)
+      setNextCursor(response.data.next_cursor)
       setError(null)
     } catch (err) {
       setError('Failed to load users')
@@ -59,7 +61,8 @@ const AdminUsers = () => {
 
   const handleSearch = (e) => {
     e.preventDefault()
-    setCurrentPage(1)
+    setCursors([null])
+    setPageIndex(0)
     fetchUsers()
   }
 
@@ -157,21 +160,24 @@ const AdminUsers = () => {
                 </div>
               )}
 
-              {totalPages > 1 && (
+              {(pageIndex > 0 || nextCursor) && (
                 <div className="flex items-center justify-between p-4 border-t border-gray-800">
                   <button
-                    onClick={() => setCurrentPage(p => Math.max(1, p - 1))}
-                    disabled={currentPage === 1}
+                    onClick={() => setPageIndex(p => Math.max(0, p - 1))}
+                    disabled={pageIndex === 0}
                     className="flex items-center gap-1 text-sm text-gray-400 hover:text-white disabled:opacity-50"
                   >
                     <FaChevronLeft /> Previous
                   </button>
                   <span className="text-sm text-gray-400">
-                    Page {currentPage} of {totalPages}
+                    Page {pageIndex + 1}
                   </span>
                   <button
-                    onClick={() => setCurrentPage(p => Math.min(totalPages, p + 1))}
-                    disabled={currentPage === totalPages}
+                    onClick={() => {
+                      setCursors(c => [...c.slice(0, pageIndex + 1), nextCursor])
+                      setPageIndex(p => p + 1)
+                    }}
+                    disabled={!nextCursor}
                     className="flex items-center gap-1 text-sm text-gray-400 hover:text-white disabled:opacity-50"
                   >
                     Next <FaChevronRight />
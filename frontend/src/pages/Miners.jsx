@@ -12,6 +12,7 @@ const Miners = () => {
   const [loading, setLoading] = useState(true)
   const [selectedMiner, setSelectedMiner] = useState(null)
   const [estimate, setEstimate] = useState(null)
+  const [estimates, setEstimates] = useState({})
   
   const [filters, setFilters] = useState({
     duration: 30,
@@ -30,6 +31,12 @@ const Miners = () => {
     applyFilters()
   }, [miners, filters])
 
+  useEffect(() => {
+    if (miners.length > 0) {
+      fetchEstimates()
+    }
+  }, [miners, filters.duration])
+
   const fetchMiners = async () => {
     try {
       const response = await api.get('/api/miners/')
@@ -70,6 +77,22 @@ const Miners = () => {
     setFilteredMiners(result)
   }
 
+  const fetchEstimates = async () => {
+    try {
+      const response = await api.post('/api/miners/estimate/batch', {
+        duration_days: filters.duration
+      })
+      const { estimates: results, ...market } = response.data
+      const byMiner = {}
+      results.forEach(result => {
+        byMiner[result.miner_id] = { ...market, ...result }
+      })
+      setEstimates(byMiner)
+    } catch (error) {
+      console.error('Failed to fetch estimates:', error)
+    }
+  }
+
   const fetchEstimate = async (minerId, hashrate) => {
     try {
       const response = await api.post(`/api/miners/${minerId}/estimate`, {
@@ -84,7 +107,11 @@ const Miners = () => {
 
   const handleMinerClick = (miner) => {
     setSelectedMiner(miner)
-    fetchEstimate(miner.id, miner.hashrate_th)
+    if (estimates[miner.id]) {
+      setEstimate(estimates[miner.id])
+    } else {
+      fetchEstimate(miner.id, miner.hashrate_th)
+    }
   }
 
   const toggleSortOrder = () => {
@@ -1,5 +1,5 @@
 import { useState, useEffect } from 'react'
-import api from '../api/config'
+import api, { getAllPages } from '../api/config'
 import { useAuth } from '../context/AuthContext'
 import { useNavigate } from 'react-router-dom'
 import { FaServer, FaCheckCircle, FaClock } from 'react-icons/fa'
@@ -10,6 +10,7 @@ const MyRentals = () => {
   const [rentals, setRentals] = useState([])
   const [loading, setLoading] = useState(true)
   const [btcPrice, setBtcPrice] = useState(50000)
+  const [earningsHistory, setEarningsHistory] = useState([])
   const { user } = useAuth()
   const navigate = useNavigate()
 
@@ -20,12 +21,12 @@ const MyRentals = () => {
     }
     fetchRentals()
     fetchBtcPrice()
+    fetchEarningsHistory()
   }, [user])
 
   const fetchRentals = async () => {
     try {
-      const response = await api.get('/api/rentals/user')
-      setRentals(response.data)
+      setRentals(await getAllPages('/api/rentals/user'))
       setLoading(false)
     } catch (error) {
       console.error('Failed to fetch rentals:', error)
@@ -42,6 +43,15 @@ const MyRentals = () => {
     }
   }
 
+  const fetchEarningsHistory = async () => {
+    try {
+      const response = await api.get('/api/rentals/earnings/history')
+      setEarningsHistory(response.data?.monthly || [])
+    } catch (error) {
+      console.error('Failed to fetch earnings history:', error)
+    }
+  }
+
   if (loading) {
     return (
       <div className="flex items-center justify-center h-64">
@@ -97,7 +107,7 @@ const MyRentals = () => {
         </div>
       </div>
 
-      <EarningsChart rentals={rentals} btcPrice={btcPrice} />
+      <EarningsChart history={earningsHistory} />
 
       <div className="space-y-4">
         <h2 className="text-xl font-bold">Your Contracts</h2>
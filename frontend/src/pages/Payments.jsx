@@ -1,5 +1,5 @@
 import { useState, useEffect } from 'react';
-import api from '../api/config';
+import { getAllPages } from '../api/config';
 import { FaBitcoin, FaEthereum, FaCheck, FaClock, FaTimes, FaExternalLinkAlt } from 'react-icons/fa';
 import { format } from 'date-fns';
 
@@ -13,8 +13,7 @@ const Payments = () => {
 
   const fetchPayments = async () => {
     try {
-      const response = await api.get('/api/payments/user');
-      setPayments(response.data);
+      setPayments(await getAllPages('/api/payments/user'));
     } catch (error) {
       console.error('Failed to fetch payments:', error);
     } finally {
@@ -29,6 +28,7 @@ const Payments = () => {
       case 'pending':
         return <FaClock className="text-yellow-400" />;
       case 'failed':
+      case 'refund_required':
         return <FaTimes className="text-red-400" />;
       default:
         return <FaClock className="text-gray-400" />;
@@ -39,7 +39,8 @@ const Payments = () => {
     const classes = {
       confirmed: 'bg-green-500/20 text-green-400 border-green-500/50',
       pending: 'bg-yellow-500/20 text-yellow-400 border-yellow-500/50',
-      failed: 'bg-red-500/20 text-red-400 border-red-500/50'
+      failed: 'bg-red-500/20 text-red-400 border-red-500/50',
+      refund_required: 'bg-red-500/20 text-red-400 border-red-500/50'
     };
     return classes[status] || 'bg-gray-500/20 text-gray-400 border-gray-500/50';
   };
@@ -133,7 +134,7 @@ const Payments = () => {
                     <td className="px-6 py-4">
                       <span className={`inline-flex items-center gap-2 px-3 py-1 rounded-full text-xs border ${getStatusBadge(payment.status)}`}>
                         {getStatusIcon(payment.status)}
-                        {payment.status.charAt(0).toUpperCase() + payment.status.slice(1)}
+                        {(payment.status.charAt(0).toUpperCase() + payment.status.slice(1)).replace('_', ' ')}
                       </span>
                     </td>
                     <td className="px-6 py-4">